@@ -1,12 +1,14 @@
 import argparse
 
 from snake.game import Game, GameConf, GameMode
+from snake.util.profiling import DIR_PROFILE
 
 
 def main():
     dict_solver = {
         "greedy": "GreedySolver",
         "hamilton": "HamiltonSolver",
+        "mcts": "MCTSSolver",
         "dqn": "DQNSolver",
     }
 
@@ -19,11 +21,20 @@ def main():
 
     dict_algorithms = {
         "bfs": "bfs",
+        "bibfs": "bibfs",
+        "field": "field",
         "astar": "astar",
         "dfs": "dfs",
         "dijkstra": "dijkstra",
     }
 
+    # Base searches of the longest path, extended afterwards
+    dict_long_algorithms = {
+        "bfs": "bfs",
+        "astar": "astar",
+        "dfs": "dfs",
+    }
+
     parser = argparse.ArgumentParser(description="Run snake game agent.")
     parser.add_argument(
         "-s",
@@ -46,9 +57,71 @@ def main():
     parser.add_argument(
         "--longalgr",
         default="bfs",
-        choices=dict_algorithms.keys(),
+        choices=dict_long_algorithms.keys(),
         help="algorithm for finding longest path (default: bfs)",
     )
+    parser.add_argument(
+        "--shortcuts",
+        default="path",
+        choices=["path", "index", "none"],
+        help="how the hamilton solver cuts across its cycle: first step of a "
+        "shortest path, cycle indices only, or never (default: path)",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="let the hamilton solver re-route its cycle towards each food",
+    )
+    parser.add_argument(
+        "--plan-commit",
+        action="store_true",
+        help="let the greedy solver follow its last safe path to the food "
+        "until the food moves or the path is blocked",
+    )
+    parser.add_argument(
+        "--table-size",
+        type=int,
+        default=0,
+        metavar="N",
+        help="let the greedy solver remember its decisions in up to N states "
+        "(default: 0, off)",
+    )
+    parser.add_argument(
+        "--endgame",
+        type=int,
+        default=0,
+        metavar="N",
+        help="let the greedy solver search move sequences exactly for a safe "
+        "route to the food once N cells or fewer are free (default: 0, off)",
+    )
+    parser.add_argument(
+        "--playouts",
+        type=int,
+        default=200,
+        metavar="N",
+        help="playouts per move of the mcts solver, 0 for no limit (default: 200)",
+    )
+    parser.add_argument(
+        "--move-time",
+        type=float,
+        metavar="SEC",
+        help="seconds of search per move of the mcts solver (default: no limit)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="worker processes running the mcts solver's playouts "
+        "(default: 0, search in-process)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SEC",
+        help="time budget per move: the solvers return their best safe "
+        "direction so far when it runs out (default: no limit)",
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -71,8 +144,41 @@ def main():
         default=10,
         help="number of episodes to run per solver for CLI statistics (default: 10)",
     )
+    parser.add_argument(
+        "--latency-dump",
+        metavar="FILE",
+        help="write per-phase latency summaries and histograms of benchmark "
+        "runs to a JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DIR_PROFILE,
+        metavar="DIR",
+        help="profile the benchmark episode loop and write .pstats and "
+        f"collapsed-stack files (default dir: {DIR_PROFILE})",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=15,
+        metavar="N",
+        help="number of hot functions to print per profile (default: 15)",
+    )
+    parser.add_argument(
+        "--cycle-cache",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="keep the Hamilton cycles built by the solvers as files, so later "
+        "runs skip building them (default dir: logs/cycles)",
+    )
     args = parser.parse_args()
 
+    if args.cycle_cache is not None:
+        from snake.solver import hamilton
+        hamilton.enable_disk_cache(args.cycle_cache or hamilton.DIR_CYCLES)
+
     if args.stats:
         from snake.stats_gui import SolverStatsWindow
         window = SolverStatsWindow()
@@ -86,14 +192,27 @@ def main():
             print(f"Testing all algorithm combinations across solvers ({episodes} episodes each)")
             print("="*90)
             print("\nProgress:")
-            results = run_pathfinder_benchmarks(episodes=episodes)
+            results = run_pathfinder_benchmarks(
+                episodes=episodes,
+                latency_dump=args.latency_dump,
+                profile_dir=args.profile,
+                profile_top=args.profile_top,
+            )
             display_pathfinder_table(results)
             print(f"\n{'='*90}")
             print("Benchmark Complete!")
             print("="*90)
         else:
             print(f"Running benchmarks with {args.episodes} episodes per solver...\n")
-            stats = run_benchmarks(episodes=args.episodes)
+            stats = run_benchmarks(
+                episodes=args.episodes,
+                latency_dump=args.latency_dump,
+                profile_dir=args.profile,
+                profile_top=args.profile_top,
+                table_size=args.table_size,
+                move_deadline=args.deadline,
+                endgame=args.endgame,
+            )
             print("\n" + "="*60)
             print("SNAKE SOLVER STATISTICS")
             print("="*60)
@@ -103,7 +222,19 @@ def main():
         conf.solver_name = dict_solver[args.s]
         conf.mode = dict_mode[args.m]
         conf.short_algr = dict_algorithms[args.shortalgr]
-        conf.long_algr = dict_algorithms[args.longalgr]
+        conf.long_algr = dict_long_algorithms[args.longalgr]
+        conf.shortcuts = args.shortcuts
+        conf.cycle_repair = args.repair
+        conf.plan_commit = args.plan_commit
+        conf.table_size = args.table_size
+        conf.endgame = args.endgame
+        conf.mcts_playouts = args.playouts or None
+        conf.mcts_time = args.move_time
+        conf.mcts_workers = args.workers
+        conf.move_deadline = args.deadline
+        conf.latency_dump = args.latency_dump
+        conf.profile_dir = args.profile
+        conf.profile_top = args.profile_top
         print(f"Solver: {conf.solver_name}   Mode: {conf.mode}")
         print(f"Short algorithm: {conf.short_algr}   Long algorithm: {conf.long_algr}")
 
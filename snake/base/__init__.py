@@ -1,5 +1,7 @@
+from snake.base.bitboard import Bitboard
 from snake.base.direc import Direc
 from snake.base.map import Map
+from snake.base.path import Path
 from snake.base.point import Point, PointType
 from snake.base.pos import Pos
 from snake.base.snake import Snake
@@ -0,0 +1,135 @@
+from snake.base.point import PointType
+from snake.base.pos import Pos
+
+
+class Bitboard:
+    """Free space of a map as a Python int, one bit per cell.
+
+    Bit x * num_cols + y is set when the cell is empty or holds the food.
+    Shifting by 1 or by num_cols moves a whole set of cells one step left,
+    right, up or down at once, so a flood fill costs a few big-int
+    operations per ring instead of Python work per cell. The map's wall
+    border is never free, which keeps shifted bits from wrapping around a
+    row once they are masked with the free space.
+
+    A view attached with Map.enable_bitboard() is kept current by the
+    snake's moves; any other edit of the map's cells needs load(). A
+    standalone one is built with from_map() and kept current with move()
+    or set_free().
+    """
+
+    def __init__(self, num_rows, num_cols, free=0):
+        self._num_rows = num_rows
+        self._num_cols = num_cols
+        self._free = free
+
+    @classmethod
+    def from_map(cls, game_map):
+        bitboard = cls(game_map.num_rows, game_map.num_cols)
+        bitboard.load(game_map)
+        return bitboard
+
+    def load(self, game_map):
+        """Read the free space of game_map, a map of this view's size."""
+        num_cols = self._num_cols
+        free = 0
+        for i in range(1, self._num_rows - 1):
+            for j in range(1, num_cols - 1):
+                t = game_map.point(Pos(i, j)).type
+                if t == PointType.EMPTY or t == PointType.FOOD:
+                    free |= 1 << (i * num_cols + j)
+        self._free = free
+
+    def copy(self):
+        return Bitboard(self._num_rows, self._num_cols, self._free)
+
+    def copy_into(self, scratch):
+        """Overwrite scratch, a view of a map of the same size."""
+        scratch._free = self._free
+        return scratch
+
+    @property
+    def num_rows(self):
+        return self._num_rows
+
+    @property
+    def num_cols(self):
+        return self._num_cols
+
+    @property
+    def free(self):
+        return self._free
+
+    def bit(self, pos):
+        return 1 << (pos.x * self._num_cols + pos.y)
+
+    def is_free(self, pos):
+        return bool(self._free & self.bit(pos))
+
+    def set_free(self, pos, free=True):
+        if free:
+            self._free |= self.bit(pos)
+        else:
+            self._free &= ~self.bit(pos)
+
+    def move(self, entered, left=None):
+        """Record a move: the head entered a cell and, unless the snake just
+        ate (left is None), the tail left one."""
+        self._free &= ~self.bit(entered)
+        if left is not None:
+            self._free |= self.bit(left)
+
+    def neighbors(self, mask):
+        """Return the cells next to any cell of mask, whatever they hold."""
+        n = self._num_cols
+        return (mask << 1) | (mask >> 1) | (mask << n) | (mask >> n)
+
+    def flood_fill(self, seeds, passable=None):
+        """Return the cells reachable from the seeds through passable cells.
+
+        Args:
+            seeds (int): Mask of the start cells, which need not be passable.
+            passable (int): Mask of the cells that can be entered, the free
+                space by default.
+
+        Returns:
+            A mask of the seeds and all the cells reached.
+        """
+        if passable is None:
+            passable = self._free
+        reached = frontier = seeds
+        while frontier:
+            frontier = self.neighbors(frontier) & passable & ~reached
+            reached |= frontier
+        return reached
+
+    def component_size(self, pos):
+        """Return the number of free cells reachable from pos.
+
+        pos itself is counted only if it is free, so for the head this is
+        the room left around it.
+        """
+        return count(self.flood_fill(self.bit(pos)) & self._free)
+
+    def can_reach(self, src, des):
+        """Check whether des can be reached from src through free cells.
+
+        Either cell may be occupied, e.g. by the head and the tail.
+        """
+        seed, goal = self.bit(src), self.bit(des)
+        passable = self._free | goal
+        reached = frontier = seed
+        while frontier:
+            if reached & goal:
+                return True
+            frontier = self.neighbors(frontier) & passable & ~reached
+            reached |= frontier
+        return bool(reached & goal)
+
+    def head_can_reach_tail(self, snake):
+        return self.can_reach(snake.head(), snake.tail())
+
+
+def count(mask):
+    """Return the number of cells in a mask."""
+    return bin(mask).count("1")
@@ -0,0 +1,186 @@
+from snake.base.point import PointType
+from snake.base.pos import Pos
+
+
+class Connectivity:
+    """Connected components of a map's free space (empty and food cells).
+
+    A union-find over the free cells, kept up to date by Snake.move():
+    the cell freed by the tail is merged with its free neighbors at once.
+    Union-find cannot split a set, so a cell taken by the head only leaves
+    its set; if its free neighbors may no longer be connected around it,
+    the components are rebuilt lazily at the next query. A cell freed again
+    gets a new node, since other nodes may still link through its old one.
+
+    Any other edit of the map's cells (besides food) needs invalidate().
+    """
+
+    # The 8 neighbors clockwise from the top; even indices are orthogonal
+    _RING = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+    def __init__(self, game_map):
+        self._map = game_map
+        num_cols = game_map.num_cols
+        self._ring = tuple(dx * num_cols + dy for dx, dy in Connectivity._RING)
+        self._orth = self._ring[0::2]
+        self._num_cols = num_cols
+        self._node = []  # Cell -> union-find node, -1 if not free
+        self._parent = []
+        self._size = []  # Free cells of the set, valid at roots
+        self._dirty = True
+        self.num_rebuilds = 0
+
+    def copy(self, game_map):
+        """Return a copy following game_map, a copy of this oracle's map."""
+        self._ensure()
+        c = Connectivity(game_map)
+        c._node = self._node[:]
+        c._parent = self._parent[:]
+        c._size = self._size[:]
+        c._dirty = False
+        return c
+
+    def copy_into(self, scratch):
+        """Overwrite scratch, the oracle of a copy of this oracle's map,
+        with this oracle's state, reusing its lists."""
+        self._ensure()
+        scratch._node[:] = self._node
+        scratch._parent[:] = self._parent
+        scratch._size[:] = self._size
+        scratch._dirty = False
+        return scratch
+
+    def invalidate(self):
+        self._dirty = True
+
+    def occupy(self, pos):
+        """A free cell was taken (e.g. by the head)."""
+        if self._dirty:
+            return
+        idx = pos.x * self._num_cols + pos.y
+        node = self._node[idx]
+        if node < 0:
+            return
+        self._node[idx] = -1
+        self._size[self._find(node)] -= 1
+        if self._may_split(idx):
+            self._dirty = True
+
+    def release(self, pos):
+        """A cell became free (e.g. left by the tail)."""
+        if self._dirty:
+            return
+        idx = pos.x * self._num_cols + pos.y
+        if self._node[idx] >= 0:
+            return
+        if len(self._parent) > 2 * len(self._node):
+            self._dirty = True  # Too many dead nodes, compact
+            return
+        node = self._new_node(idx)
+        for off in self._orth:
+            if self._node[idx + off] >= 0:
+                self._union(node, self._node[idx + off])
+
+    def same_component(self, a, b):
+        """Check whether two free cells are connected."""
+        ra, rb = self._root(a), self._root(b)
+        return ra is not None and ra == rb
+
+    def component_size(self, pos):
+        """Return the number of free cells connected to pos.
+
+        For an occupied cell (e.g. the head), this is the number of free
+        cells connected to any of its neighbors.
+        """
+        return sum(self._size[r] for r in self._roots_around(pos))
+
+    def can_reach(self, src, des):
+        """Check whether des can be reached from src through free cells.
+
+        Either cell may be occupied, e.g. by the head and the tail.
+        """
+        if Pos.manhattan_dist(src, des) == 1:
+            return True
+        return not self._roots_around(src).isdisjoint(self._roots_around(des))
+
+    def _root(self, pos):
+        self._ensure()
+        node = self._node[pos.x * self._num_cols + pos.y]
+        return self._find(node) if node >= 0 else None
+
+    def _roots_around(self, pos):
+        """Return the roots of pos if free, or else of its free neighbors."""
+        self._ensure()
+        idx = pos.x * self._num_cols + pos.y
+        node = self._node[idx]
+        if node >= 0:
+            return {self._find(node)}
+        roots = set()
+        for off in self._orth:
+            nxt = idx + off
+            if 0 <= nxt < len(self._node) and self._node[nxt] >= 0:
+                roots.add(self._find(self._node[nxt]))
+        return roots
+
+    def _ensure(self):
+        if self._dirty:
+            self._rebuild()
+
+    def _rebuild(self):
+        game_map, num_cols = self._map, self._num_cols
+        node = self._node = [-1] * (game_map.num_rows * num_cols)
+        parent = self._parent = []
+        size = self._size = []
+        free_types = (PointType.EMPTY, PointType.FOOD)
+        for i in range(1, game_map.num_rows - 1):
+            for j in range(1, num_cols - 1):
+                if game_map.point(Pos(i, j)).type not in free_types:
+                    continue
+                idx = i * num_cols + j
+                left, up = node[idx - 1], node[idx - num_cols]
+                if left < 0 and up < 0:
+                    self._new_node(idx)
+                    continue
+                # Join a neighbor's set directly under its root
+                root = self._find(left if left >= 0 else up)
+                node[idx] = len(parent)
+                parent.append(root)
+                size.append(0)
+                size[root] += 1
+                if left >= 0 and up >= 0:
+                    self._union(root, up)
+        self._dirty = False
+        self.num_rebuilds += 1
+
+    def _new_node(self, idx):
+        node = len(self._parent)
+        self._parent.append(node)
+        self._size.append(1)
+        self._node[idx] = node
+        return node
+
+    def _find(self, node):
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # Path halving
+            node = parent[node]
+        return node
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        if self._size[ra] < self._size[rb]:
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        self._size[ra] += self._size[rb]
+
+    def _may_split(self, idx):
+        """Check whether the free neighbors of an occupied cell may have
+        been split, i.e. they are not all linked around it."""
+        free = [self._node[idx + off] >= 0 for off in self._ring]
+        orth = free[0::2]
+        links = sum(
+            1 for i in range(4) if orth[i] and orth[(i + 1) % 4] and free[2 * i + 1]
+        )
+        return orth.count(True) - links > 1
@@ -20,3 +20,14 @@ class Direc(Enum):
         if direc == Direc.DOWN:
             return Direc.UP
         return Direc.NONE
+
+
+# Order in which to try the neighbors after moving in a direction:
+# straight ahead first, then the others.
+STRAIGHT_FIRST = {
+    direc: ((direc,) if direc != Direc.NONE else ())
+    + tuple(
+        d for d in (Direc.LEFT, Direc.UP, Direc.RIGHT, Direc.DOWN) if d != direc
+    )
+    for direc in Direc
+}
@@ -1,5 +1,7 @@
 import random
 
+from snake.base.bitboard import Bitboard
+from snake.base.connectivity import Connectivity
 from snake.base.point import Point, PointType
 from snake.base.pos import Pos
 
@@ -17,11 +19,20 @@ class Map:
         self._num_rows = num_rows
         self._num_cols = num_cols
         self._capacity = (num_rows - 2) * (num_cols - 2)
-        self._content = [[Point() for _ in range(num_cols)] for _ in range(num_rows)]
+        # Cell types by flat index (x * num_cols + y), viewed through points
+        self._types = [PointType.EMPTY] * (num_rows * num_cols)
+        self._content = [
+            [Point(self._types, i * num_cols + j) for j in range(num_cols)]
+            for i in range(num_rows)
+        ]
+        self._connectivity = None
+        self._bitboard = None
         self.reset()
 
     def reset(self):
         self._food = None
+        if self._connectivity is not None:
+            self._connectivity.invalidate()
         for i in range(self._num_rows):
             for j in range(self._num_cols):
                 if (
@@ -33,13 +44,45 @@ class Map:
                     self._content[i][j].type = PointType.WALL
                 else:
                     self._content[i][j].type = PointType.EMPTY
+        if self._bitboard is not None:
+            self._bitboard.load(self)
 
-    def copy(self):
-        m_copy = Map(self._num_rows, self._num_cols)
-        for i in range(self._num_rows):
-            for j in range(self._num_cols):
-                m_copy._content[i][j].type = self._content[i][j].type
-        return m_copy
+    def copy(self, connectivity=True):
+        return self.copy_into(Map(self._num_rows, self._num_cols), connectivity)
+
+    def copy_into(self, scratch, connectivity=True):
+        """Overwrite scratch, a map of the same size, with this map's state.
+
+        Reusing one scratch map for lookahead avoids allocating a map's
+        worth of points on every copy.
+
+        Args:
+            scratch (Map): The map to overwrite.
+            connectivity (bool): Copy the connectivity oracle too. A copy
+                without it never brings this map's oracle up to date, and
+                the scratch's oracle is dropped.
+
+        Returns:
+            The scratch map.
+
+        """
+        if scratch._num_rows != self._num_rows or scratch._num_cols != self._num_cols:
+            raise ValueError("scratch map must have the same size")
+        scratch._types[:] = self._types
+        scratch._food = self._food
+        if self._connectivity is None or not connectivity:
+            scratch._connectivity = None
+        elif scratch._connectivity is None:
+            scratch._connectivity = self._connectivity.copy(scratch)
+        else:
+            self._connectivity.copy_into(scratch._connectivity)
+        if self._bitboard is None:
+            scratch._bitboard = None
+        elif scratch._bitboard is None:
+            scratch._bitboard = self._bitboard.copy()
+        else:
+            self._bitboard.copy_into(scratch._bitboard)
+        return scratch
 
     @property
     def num_rows(self):
@@ -57,6 +100,30 @@ class Map:
     def food(self):
         return self._food
 
+    @property
+    def connectivity(self):
+        """The free-space connectivity oracle, None unless enabled."""
+        return self._connectivity
+
+    def enable_connectivity(self):
+        """Attach a free-space connectivity oracle kept up to date by the
+        snake's moves (see base.connectivity.Connectivity)."""
+        if self._connectivity is None:
+            self._connectivity = Connectivity(self)
+        return self._connectivity
+
+    @property
+    def bitboard(self):
+        """The bitboard view of the free space, None unless enabled."""
+        return self._bitboard
+
+    def enable_bitboard(self):
+        """Attach a bitboard view of the free space kept up to date by the
+        snake's moves (see base.bitboard.Bitboard)."""
+        if self._bitboard is None:
+            self._bitboard = Bitboard.from_map(self)
+        return self._bitboard
+
     def point(self, pos):
         """Return a point on the map.
 
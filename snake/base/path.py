@@ -0,0 +1,107 @@
+from array import array
+from collections import deque
+
+from snake.base.direc import Direc
+
+# Direc members indexed by value
+_DIRECS = tuple(Direc)
+
+
+class Path:
+    """Sequence of moves stored as the byte values of snake.base.direc.Direc.
+
+    The moves are kept in two arrays: the front half reversed, so that moves
+    can be added or removed at both ends in amortized O(1), and the back half
+    in order. When one end runs out, it takes half of the other, so pops
+    alternating between the ends stay amortized O(1) too. Indexing and iteration give Direc members, so a Path can be read
+    like the deque of Direc it replaces (len, bool, path[0], for direc in path).
+    """
+
+    __slots__ = ("_front", "_back")
+
+    def __init__(self, direcs=()):
+        self._front = array("b")
+        self._back = array("b", (d.value for d in direcs))
+
+    def __len__(self):
+        return len(self._front) + len(self._back)
+
+    def __iter__(self):
+        for i in range(len(self._front) - 1, -1, -1):
+            yield _DIRECS[self._front[i]]
+        for v in self._back:
+            yield _DIRECS[v]
+
+    def __getitem__(self, idx):
+        n_front = len(self._front)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("path index out of range")
+        if idx < n_front:
+            return _DIRECS[self._front[n_front - 1 - idx]]
+        return _DIRECS[self._back[idx - n_front]]
+
+    def __eq__(self, other):
+        if isinstance(other, (Path, deque, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return f"Path({[d.name for d in self]})"
+
+    __repr__ = __str__
+
+    def append(self, direc):
+        self._back.append(direc.value)
+
+    def appendleft(self, direc):
+        self._front.append(direc.value)
+
+    def extend(self, direcs):
+        self._back.extend(d.value for d in direcs)
+
+    def pop(self):
+        if not self._back:
+            self._front, self._back = _split(self._front)
+        return _DIRECS[self._back.pop()]
+
+    def popleft(self):
+        if not self._front:
+            self._back, self._front = _split(self._back)
+        return _DIRECS[self._front.pop()]
+
+    def clear(self):
+        del self._front[:]
+        del self._back[:]
+
+    def values(self):
+        """Return the moves as a bytes object of Direc values, in order."""
+        front = array("b", self._front)
+        front.reverse()
+        return front.tobytes() + self._back.tobytes()
+
+    def cells(self, head, num_cols):
+        """Return the flat indices (x * num_cols + y) of the cells entered
+        along the path from head, in order."""
+        steps = (0, -1, -num_cols, 1, num_cols)  # By Direc value
+        cur = head.x * num_cols + head.y
+        result = []
+        for v in self.values():
+            cur += steps[v]
+            result.append(cur)
+        return result
+
+    def to_deque(self):
+        return deque(self)
+
+
+def _split(stack):
+    """Split one half of a Path into (rest, taken): the moves furthest from
+    its end, at least one if any, are taken and reversed for the other half."""
+    k = (len(stack) + 1) // 2
+    taken = stack[:k]
+    taken.reverse()
+    return stack[k:], taken
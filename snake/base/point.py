@@ -21,15 +21,25 @@ class PointType(Enum):
 
 
 class Point:
-    """Point on the game map."""
+    """Point on the game map.
 
-    def __init__(self):
-        self._type = PointType.EMPTY
+    A map's points are views of the map's flat list of cell types, so a
+    whole map can be copied with one slice assignment. A point made
+    without a list holds its own type.
+    """
+
+    __slots__ = ("_types", "_idx")
+
+    def __init__(self, types=None, idx=0):
+        if types is None:
+            types = [PointType.EMPTY]
+        self._types = types
+        self._idx = idx
 
     @property
     def type(self):
-        return self._type
+        return self._types[self._idx]
 
     @type.setter
     def type(self, val):
-        self._type = val
+        self._types[self._idx] = val
@@ -2,6 +2,7 @@ import random
 from collections import deque
 
 from snake.base.direc import Direc
+from snake.base.map import Map
 from snake.base.point import PointType
 from snake.base.pos import Pos
 
@@ -62,19 +63,35 @@ class Snake:
             self._map.reset()
         for i, pos in enumerate(self._init_bodies):
             self._map.point(pos).type = self._init_types[i]
+        if self._map.connectivity is not None:
+            self._map.connectivity.invalidate()
+        if self._map.bitboard is not None:
+            self._map.bitboard.load(self._map)
 
         if rand_init:
             self._init_direc = self._init_bodies = self._init_types = None
 
-    def copy(self):
-        m_copy = self._map.copy()
+    def copy(self, connectivity=True):
+        m_copy = Map(self._map.num_rows, self._map.num_cols)
         s_copy = Snake(m_copy, Direc.NONE, [], [])
-        s_copy._steps = self._steps
-        s_copy._dead = self._dead
-        s_copy._direc = self._direc
-        s_copy._direc_next = self._direc_next
-        s_copy._bodies = deque(self._bodies)
-        return s_copy, m_copy
+        return self.copy_into(s_copy, connectivity)
+
+    def copy_into(self, scratch, connectivity=True):
+        """Overwrite scratch, a snake on a map of the same size, and its map
+        with the state of this snake and its map (see Map.copy_into()).
+
+        Returns:
+            (scratch, scratch.map), like copy().
+
+        """
+        self._map.copy_into(scratch._map, connectivity)
+        scratch._steps = self._steps
+        scratch._dead = self._dead
+        scratch._direc = self._direc
+        scratch._direc_next = self._direc_next
+        scratch._bodies.clear()
+        scratch._bodies.extend(self._bodies)
+        return scratch, scratch._map
 
     @property
     def map(self):
@@ -150,11 +167,19 @@ class Snake:
             self._rm_tail()
 
         self._map.point(new_head).type = new_head_type
+        if self._map.connectivity is not None:
+            self._map.connectivity.occupy(new_head)
+        if self._map.bitboard is not None:
+            self._map.bitboard.set_free(new_head, False)
         self._direc = self._direc_next
         self._steps += 1
 
     def _rm_tail(self):
         self._map.point(self.tail()).type = PointType.EMPTY
+        if self._map.connectivity is not None:
+            self._map.connectivity.release(self.tail())
+        if self._map.bitboard is not None:
+            self._map.bitboard.set_free(self.tail())
         self._bodies.pop()
 
     def _new_types(self):
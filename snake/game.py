@@ -1,13 +1,13 @@
+import contextlib
 import errno
 import os
 import traceback
 from enum import Enum, unique
 
+from snake import solver
 from snake.base import Direc, Map, PointType, Pos, Snake
-from snake.gui import GameWindow
-
-# Add solver names to globals()
-from snake.solver import DQNSolver, GreedySolver, HamiltonSolver
+from snake.util.profiling import EpisodeProfiler
+from snake.util.timing import PhaseTimer, format_counters, format_summary
 
 @unique
 class GameMode(Enum):
@@ -26,8 +26,22 @@ class GameConf:
 
         # Solver
         self.solver_name = "HamiltonSolver"  # Class name of the solver
-        self.short_algr = "bfs"  # Algorithm for shortest path (bfs, astar, dfs)
+        self.short_algr = "bfs"  # Algorithm for shortest path (bfs, bibfs, field, astar, dfs, dijkstra)
         self.long_algr = "bfs"  # Algorithm for longest path (bfs, astar, dfs)
+        self.shortcuts = "path"  # Shortcuts of HamiltonSolver (path, index, none)
+        self.cycle_repair = False  # Re-route HamiltonSolver's cycle for each food
+        self.plan_commit = False  # Let GreedySolver follow its last safe path to the food
+        self.table_size = 0  # States whose GreedySolver decision is remembered (0: off)
+        self.endgame = 0  # Free cells below which GreedySolver searches exactly (0: off)
+        self.mcts_playouts = 200  # MCTSSolver playouts per move (None: no limit)
+        self.mcts_time = None  # MCTSSolver seconds of search per move (None: no limit)
+        self.mcts_workers = 0  # MCTSSolver worker processes (0: search in-process)
+        self.move_deadline = None  # Seconds per move of the solver (None: no limit)
+
+        # Benchmark
+        self.latency_dump = None  # JSON file to append latency histograms to
+        self.profile_dir = None  # Directory for .pstats/.collapsed profiles
+        self.profile_top = 15  # Hot functions to print per profile
 
         # Size
         self.map_rows = 8
@@ -86,12 +100,39 @@ class Game:
             self._map, conf.init_direc, conf.init_bodies, conf.init_types
         )
         self._pause = False
+        # Per-call latencies of food placement, next_direc and move
+        self._timer = PhaseTimer() if conf.mode == GameMode.BENCHMARK else None
         # Create solver with algorithm parameters
-        solver_class = globals()[self._conf.solver_name]
-        if self._conf.solver_name in ["GreedySolver", "HamiltonSolver"]:
-            self._solver = solver_class(self._snake, conf.short_algr, conf.long_algr)
+        solver_class = solver.get(self._conf.solver_name)
+        if self._conf.solver_name == "HamiltonSolver":
+            self._solver = solver_class(
+                self._snake,
+                conf.short_algr,
+                conf.long_algr,
+                conf.shortcuts,
+                conf.cycle_repair,
+                deadline=conf.move_deadline,
+            )
+        elif self._conf.solver_name == "GreedySolver":
+            self._solver = solver_class(
+                self._snake,
+                conf.short_algr,
+                conf.long_algr,
+                conf.plan_commit,
+                conf.table_size,
+                deadline=conf.move_deadline,
+                endgame=conf.endgame,
+            )
+        elif self._conf.solver_name == "MCTSSolver":
+            self._solver = solver_class(
+                self._snake,
+                conf.mcts_playouts,
+                conf.mcts_time,
+                conf.mcts_workers,
+                deadline=conf.move_deadline,
+            )
         else:
-            self._solver = solver_class(self._snake)
+            self._solver = solver_class(self._snake, deadline=conf.move_deadline)
         self._episode = 1
         self._init_log_file()
 
@@ -103,6 +144,24 @@ class Game:
     def episode(self):
         return self._episode
 
+    @property
+    def timer(self):
+        return self._timer
+
+    @property
+    def solver(self):
+        return self._solver
+
+    def solver_counters(self):
+        """Return the solver's counters, plus the moves that took longer
+        than the deadline if one is set (benchmark mode only)."""
+        counters = self._solver.counters()
+        if self._conf.move_deadline is not None and self._timer is not None:
+            counters["deadline_misses"] = self._timer.count_over(
+                "next_direc", self._conf.move_deadline
+            )
+        return counters
+
     def run(self):
         if self._conf.mode == GameMode.BENCHMARK:
             self._run_benchmarks()
@@ -110,6 +169,9 @@ class Game:
             self._run_dqn_train()
             self._plot_history()
         else:
+            # Tkinter is only needed (and only imported) for the GUI modes
+            from snake.gui import GameWindow
+
             window = GameWindow(
                 "Snake",
                 self._conf,
@@ -140,35 +202,51 @@ class Game:
 
         tot_len, tot_steps = 0, 0
 
-        for _ in range(num_episodes):
-            print(f"Episode {self._episode} - ", end="")
-            while True:
-                self._game_main_normal()
-                if self._map.is_full():
-                    print(
-                        f"FULL (len: {self._snake.len()} | steps: {self._snake.steps})"
-                    )
-                    break
-                if self._snake.dead:
-                    print(
-                        f"DEAD (len: {self._snake.len()} | steps: {self._snake.steps})"
-                    )
-                    break
-                if self._snake.steps >= steps_limit:
-                    print(
-                        f"STEP LIMIT (len: {self._snake.len()} | steps: {self._snake.steps})"
-                    )
-                    self._write_logs()  # Write the last step
-                    break
-            tot_len += self._snake.len()
-            tot_steps += self._snake.steps
-            self._reset()
+        profiler = EpisodeProfiler() if self._conf.profile_dir else None
+        with profiler or contextlib.nullcontext():
+            for _ in range(num_episodes):
+                print(f"Episode {self._episode} - ", end="")
+                while True:
+                    self._game_main_normal()
+                    if self._map.is_full():
+                        print(
+                            f"FULL (len: {self._snake.len()} | steps: {self._snake.steps})"
+                        )
+                        break
+                    if self._snake.dead:
+                        print(
+                            f"DEAD (len: {self._snake.len()} | steps: {self._snake.steps})"
+                        )
+                        break
+                    if self._snake.steps >= steps_limit:
+                        print(
+                            f"STEP LIMIT (len: {self._snake.len()} | steps: {self._snake.steps})"
+                        )
+                        self._write_logs()  # Write the last step
+                        break
+                tot_len += self._snake.len()
+                tot_steps += self._snake.steps
+                self._reset()
 
         avg_len = tot_len / num_episodes
         avg_steps = tot_steps / num_episodes
         print(
             f"\n[Summary]\nAverage Length: {avg_len:.2f}\nAverage Steps: {avg_steps:.2f}\n"
         )
+        print("[Latency]")
+        print("\n".join(format_summary(self._timer.summary())) + "\n")
+        counters = self.solver_counters()
+        if counters:
+            print("[Solver]")
+            print("\n".join(format_counters(counters)) + "\n")
+        if self._conf.latency_dump:
+            label = f"{self._conf.solver_name}|{self._conf.short_algr}|{self._conf.long_algr}"
+            self._timer.dump(self._conf.latency_dump, label)
+        if profiler is not None:
+            label = f"{self._conf.solver_name}-{self._conf.short_algr}-{self._conf.long_algr}"
+            paths = profiler.save(self._conf.profile_dir, label)
+            print(f"[Profile] {label} (saved to {', '.join(paths)})")
+            print("\n".join(profiler.format_top(self._conf.profile_top)) + "\n")
 
         self._on_exit()
 
@@ -199,21 +277,31 @@ class Game:
 
     def _game_main_normal(self):
         if not self._map.has_food():
+            t = PhaseTimer.start()
             self._map.create_rand_food()
+            self._record("food", t)
 
         if self._pause or self._is_episode_end():
             return
 
+        t = PhaseTimer.start()
         self._update_direc(self._solver.next_direc())
+        self._record("next_direc", t)
 
         if self._conf.mode == GameMode.NORMAL and self._snake.direc_next != Direc.NONE:
             self._write_logs()
 
+        t = PhaseTimer.start()
         self._snake.move()
+        self._record("move", t)
 
         if self._is_episode_end():
             self._write_logs()  # Write the last step
 
+    def _record(self, phase, start_ns):
+        if self._timer is not None:
+            self._timer.stop(phase, start_ns)
+
     def _plot_history(self):
         self._solver.plot()
 
@@ -282,15 +370,3 @@ class Game:
             f"[ last/next direc: {self._snake.direc}/{self._snake.direc_next} ]\n"
         )
         self._log_file.write("\n")
-def create_solver(self):
-    if self._conf.solver_name == "GreedySolver":
-        from snake.solver.greedy import GreedySolver
-        return GreedySolver(self._snake)
-    elif self._conf.solver_name == "HamiltonSolver":
-        from snake.solver.hamilton import HamiltonSolver
-        return HamiltonSolver(self._snake)
-    elif self._conf.solver_name == "DQNSolver":
-        from snake.solver.dqn import DQNSolver
-        return DQNSolver(self._snake)
-    else:
-        raise ValueError(f"Unknown solver name: {self._conf.solver_name}")
@@ -1,4 +1,56 @@
-from snake.solver.dqn import DQNSolver
-from snake.solver.greedy import GreedySolver
-from snake.solver.hamilton import HamiltonSolver
-from snake.solver.path import PathSolver
+"""Solvers, resolved lazily by class name.
+
+Importing this package is cheap: a solver module (and its dependencies, e.g.
+TensorFlow for DQNSolver) is only imported the first time the solver is
+requested, either via get() or as an attribute of this package.
+"""
+
+import importlib
+
+# Class name -> module that defines the class
+_REGISTRY = {
+    "DQNSolver": "snake.solver.dqn",
+    "GreedySolver": "snake.solver.greedy",
+    "HamiltonSolver": "snake.solver.hamilton",
+    "MCTSSolver": "snake.solver.mcts",
+    "PathSolver": "snake.solver.path",
+}
+
+
+def register(name, module):
+    """Register a solver class defined in a module.
+
+    Args:
+        name (str): Class name of the solver.
+        module (str): Dotted path of the module defining the class.
+
+    """
+    _REGISTRY[name] = module
+
+
+def names():
+    """Return the class names of all the registered solvers."""
+    return list(_REGISTRY)
+
+
+def get(name):
+    """Return the solver class registered under the given name.
+
+    Args:
+        name (str): Class name of the solver, e.g. "GreedySolver".
+
+    Raises:
+        ValueError: If no solver is registered under that name.
+
+    """
+    if name not in _REGISTRY:
+        raise ValueError(
+            f"Unknown solver name: {name}. Use one of: {', '.join(_REGISTRY)}."
+        )
+    return getattr(importlib.import_module(_REGISTRY[name]), name)
+
+
+def __getattr__(name):
+    if name in _REGISTRY:
+        return get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,62 @@
+from time import perf_counter
+
+
+class Deadline:
+    """Time budget of one move, shared by a solver and its searches.
+
+    The solver calls start() when a move begins; searches poll expired() and
+    return the best result they have when it turns True. It turns True once
+    1 - RESERVE of the budget is spent, leaving the rest for the solver's
+    fallback. With seconds None, it never expires.
+    """
+
+    RESERVE = 0.2
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.tripped = False  # Whether the current move ran out of time
+        self.num_tripped = 0  # Moves that ran out of time
+        self._expires = None
+
+    def start(self):
+        self.tripped = False
+        if self.seconds is None:
+            self._expires = None
+        else:
+            self._expires = perf_counter() + self.seconds * (1 - Deadline.RESERVE)
+
+    def expired(self):
+        if self.tripped:
+            return True
+        if self._expires is None or perf_counter() < self._expires:
+            return False
+        self.tripped = True
+        self.num_tripped += 1
+        return True
+
+    def remaining(self):
+        """Return the seconds left before expired() turns True, None if it
+        never does."""
+        if self._expires is None:
+            return None
+        return max(self._expires - perf_counter(), 0.0)
+
+
 class BaseSolver:
     """Super class of all the solvers."""
 
-    def __init__(self, snake):
+    def __init__(self, snake, deadline=None):
+        """Initialize a solver.
+
+        Args:
+            snake (snake.base.snake.Snake): The snake to direct.
+            deadline (float): Seconds per move, None for no limit. Solvers
+                that support it return their best safe direction so far when
+                the time is up.
+        """
         self._snake = snake
         self._map = snake.map
+        self.deadline = Deadline(deadline)
 
     @property
     def map(self):
@@ -22,5 +75,12 @@ class BaseSolver:
         """Generate the next direction of the snake."""
         return NotImplemented
 
+    def counters(self):
+        """Return the solver's event counts (e.g. cache hits) by name, for
+        benchmark output."""
+        if self.deadline.seconds is None:
+            return {}
+        return {"deadline_cuts": self.deadline.num_tripped}
+
     def close(self):
         """Release resources."""
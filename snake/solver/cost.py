@@ -0,0 +1,54 @@
+"""Per-cell cost models for PathSolver's dijkstra search.
+
+A cost model is a callable (game_map, pos) -> int giving the cost of moving
+into pos, with an integer max_cost attribute bounding the result. Costs must
+be integers in [1, max_cost] so that the search can use a bucket queue.
+"""
+
+from snake.base import Pos
+
+
+class UnitCost:
+    """Every move costs 1 (plain shortest paths)."""
+
+    max_cost = 1
+
+    def __call__(self, game_map, pos):
+        return 1
+
+
+class SafetyCost:
+    """Prefer cells that keep the snake out of tight spots.
+
+    Moving into a cell costs 1, plus:
+        adjacent_weight for every neighbor that is a wall or a body, so paths
+            keep away from walls and the snake itself when they can;
+        split_weight if the cell is a local cut of the free space, i.e. its
+            free neighbors do not touch each other around it, so occupying
+            it would likely split the free space in two.
+    """
+
+    def __init__(self, adjacent_weight=1, split_weight=3):
+        self.adjacent_weight = adjacent_weight
+        self.split_weight = split_weight
+        self.max_cost = 1 + 4 * adjacent_weight + split_weight
+
+    def __call__(self, game_map, pos):
+        x, y = pos.x, pos.y
+        ring = [game_map.is_safe(Pos(x + dx, y + dy)) for dx, dy in _RING]
+        orth = ring[0::2]
+        cost = 1 + self.adjacent_weight * orth.count(False)
+
+        # Free orthogonal neighbors form one group with the next one around
+        # the ring when the diagonal cell between them is free too.
+        num_free = orth.count(True)
+        links = sum(
+            1 for i in range(4) if orth[i] and orth[(i + 1) % 4] and ring[2 * i + 1]
+        )
+        if num_free - links > 1:
+            cost += self.split_weight
+        return cost
+
+
+# The 8 neighbors clockwise from the top; even indices are orthogonal
+_RING = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
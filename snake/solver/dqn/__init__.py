@@ -81,8 +81,10 @@ class DQNSolver(BaseSolver):
     PATH_VAR = os.path.join(_DIR_LOG, "solver-var-%d.json")
     PATH_NET = os.path.join(_DIR_LOG, "solver-net-%d")
 
-    def __init__(self, snake):
-        super().__init__(snake)
+    def __init__(self, snake, deadline=None):
+        # A move is one forward pass with nothing to cut short, so the
+        # deadline is only reported against (deadline_misses in benchmarks)
+        super().__init__(snake, deadline)
 
         self._use_relative = True  # Whether to use relative actions
         self._use_visual_only = False  # Whether to use visual state only
@@ -4,12 +4,28 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from snake.solver.dqn.logger import log
+from snake.util import downsample
 
 _DIR_LOG = "logs"
 
 
 class History:
     PATH_DATA = os.path.join(_DIR_LOG, "history-%s-%d-%d.npy")
+    FILE_PLOT = "history-%s-%d.png"
+
+    # (file name, attribute) of every saved series
+    _SERIES = (
+        ("loss", "_history_loss"),
+        ("avg-reward", "_history_avg_reward"),
+        ("min-reward", "_history_min_reward"),
+        ("max-reward", "_history_max_reward"),
+        ("avg-len", "_history_avg_len"),
+        ("min-len", "_history_min_len"),
+        ("max-len", "_history_max_len"),
+        ("avg-step", "_history_avg_step"),
+        ("min-step", "_history_min_step"),
+        ("max-step", "_history_max_step"),
+    )
 
     def __init__(self, num_avg):
         self._num_avg = num_avg
@@ -86,13 +102,29 @@ class History:
 
         return avg_reward, avg_len, avg_steps, new_max_avg_len
 
-    def plot(self, beg_step):
+    def plot(self, beg_step, max_points=2000, out_dir=None):
+        """Plot the history.
+
+        Every series is reduced to about max_points points before drawing, so
+        plotting cost does not depend on the length of the run.
+
+        Args:
+            beg_step (int): Learning step of the first history entry.
+            max_points (int): Points per line after downsampling
+                (0 disables downsampling).
+            out_dir (str): If given, figures are written to PNG files in this
+                directory instead of being shown.
+
+        """
         title = "Loss"
-        plt.figure(num=title)
-        steps = np.arange(len(self._history_loss)) + beg_step
-        plt.plot(steps, self._history_loss)
+        fig = plt.figure(num=title)
+        loss = np.asarray(self._history_loss)
+        steps = np.arange(len(loss)) + beg_step
+        steps, loss = downsample.minmax(steps, loss, max_points // 2)
+        plt.plot(steps, loss)
         plt.xlabel("Learning Step")
         plt.ylabel("Loss")
+        self._save_fig(fig, title, beg_step, out_dir)
 
         self._plot_avg(
             beg_step,
@@ -101,6 +133,8 @@ class History:
             self._history_avg_reward,
             self._history_min_reward,
             self._history_max_reward,
+            max_points,
+            out_dir,
         )
 
         self._plot_avg(
@@ -110,6 +144,8 @@ class History:
             self._history_avg_len,
             self._history_min_len,
             self._history_max_len,
+            max_points,
+            out_dir,
         )
 
         self._plot_avg(
@@ -119,9 +155,12 @@ class History:
             self._history_avg_step,
             self._history_min_step,
             self._history_max_step,
+            max_points,
+            out_dir,
         )
 
-        plt.show()
+        if out_dir is None:
+            plt.show()
 
     def save(self, beg_step, end_step):
         log("Saving history...")
@@ -157,45 +196,48 @@ class History:
             History.PATH_DATA % ("max-step", beg_step, end_step), self._history_max_step
         )
 
-    def load(self, beg_step, end_step):
-        log("Loading history...")
-        self._history_loss = np.load(History.PATH_DATA % ("loss", beg_step, end_step)).tolist()
-        self._history_avg_reward = np.load(
-            History.PATH_DATA % ("avg-reward", beg_step, end_step)
-        ).tolist()
-        self._history_min_reward = np.load(
-            History.PATH_DATA % ("min-reward", beg_step, end_step)
-        ).tolist()
-        self._history_max_reward = np.load(
-            History.PATH_DATA % ("max-reward", beg_step, end_step)
-        ).tolist()
-        self._history_avg_len = np.load(
-            History.PATH_DATA % ("avg-len", beg_step, end_step)
-        ).tolist()
-        self._history_min_len = np.load(
-            History.PATH_DATA % ("min-len", beg_step, end_step)
-        ).tolist()
-        self._history_max_len = np.load(
-            History.PATH_DATA % ("max-len", beg_step, end_step)
-        ).tolist()
-        self._history_avg_step = np.load(
-            History.PATH_DATA % ("avg-step", beg_step, end_step)
-        ).tolist()
-        self._history_min_step = np.load(
-            History.PATH_DATA % ("min-step", beg_step, end_step)
-        ).tolist()
-        self._history_max_step = np.load(
-            History.PATH_DATA % ("max-step", beg_step, end_step)
-        ).tolist()
-
-    def _plot_avg(self, learn_step_beg, name, color, data_avg, data_min, data_max):
-        plt.figure(num=name)
+    def load(self, beg_step, end_step, mmap_mode=None):
+        """Load saved history data.
+
+        Args:
+            beg_step (int): Starting learning step of the history data.
+            end_step (int): Ending learning step of the history data.
+            mmap_mode (str): If given (e.g. "r"), the arrays are memory-mapped
+                instead of read into lists. Use it for plotting only, since
+                the mapped history cannot be appended to.
 
+        """
+        log("Loading history...")
+        for name, attr in History._SERIES:
+            data = np.load(
+                History.PATH_DATA % (name, beg_step, end_step), mmap_mode=mmap_mode
+            )
+            setattr(self, attr, data if mmap_mode else data.tolist())
+
+    def _plot_avg(
+        self,
+        learn_step_beg,
+        name,
+        color,
+        data_avg,
+        data_min,
+        data_max,
+        max_points=0,
+        out_dir=None,
+    ):
+        fig = plt.figure(num=name)
+
+        data_avg = np.asarray(data_avg)
+        data_min = np.asarray(data_min)
+        data_max = np.asarray(data_max)
         steps = (np.arange(len(data_avg)) + learn_step_beg) * self._x_scale
+
+        idx, band_min, band_max = downsample.envelope(data_min, data_max, max_points)
         plt.fill_between(
-            steps, data_min, data_max, color=self._color_fill, label="Min/Max"
+            steps[idx], band_min, band_max, color=self._color_fill, label="Min/Max"
         )
-        plt.plot(steps, data_avg, "-", color=color, linewidth=0.5, label="Average")
+        x_avg, y_avg = downsample.lttb(steps, data_avg, max_points)
+        plt.plot(x_avg, y_avg, "-", color=color, linewidth=0.5, label="Average")
 
         plt.xlabel("Learning Step (1e4)")
         plt.ylabel(name)
@@ -223,3 +265,15 @@ class History:
                 textcoords="offset points",
                 arrowprops={"facecolor": "black", "arrowstyle": "->"},
             )
+
+        self._save_fig(fig, name, learn_step_beg, out_dir)
+
+    def _save_fig(self, fig, name, beg_step, out_dir):
+        if out_dir is None:
+            return
+        os.makedirs(out_dir, exist_ok=True)
+        file_name = History.FILE_PLOT % (name.lower().replace(" ", "-"), beg_step)
+        path = os.path.join(out_dir, file_name)
+        fig.savefig(path)
+        plt.close(fig)
+        log(f"Plot saved to {path}")
@@ -0,0 +1,175 @@
+from heapq import heappop, heappush
+
+from snake.base import Path
+from snake.base.direc import STRAIGHT_FIRST
+from snake.solver.field import INF, MoveTracker, free_cells, offsets
+
+
+class DStarLite(MoveTracker):
+    """Incremental A* (D* Lite) from the snake's head to a fixed target.
+
+    g/rhs values are computed backwards from the target, so they stay valid
+    while the head moves. A move only changes the passability of the cell
+    entered by the head and of the cell left by the tail, so only the
+    vertices around those two cells are re-queued and repaired; the priority
+    queue and all the other values are kept across calls. Keys use the
+    Manhattan distance to the head plus the usual km offset for the moving
+    start.
+
+    Moving into a cell costs 1 if the cell is free (empty or food) and is
+    impossible otherwise. Cells are addressed by flat index x * num_cols + y.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._num_cols = 0
+        self._offsets = {}
+        self._free = bytearray()
+        self._g = []
+        self._rhs = []
+        self._queue = []
+        self._queued = {}
+        self._goal = 0
+        self._start = 0
+        self._km = 0
+        self.num_expanded = 0
+
+    def path_from(self, head, direc):
+        """Return a shortest path from the head to the target.
+
+        Call sync() first so that head is the snake's current head.
+
+        Args:
+            head (snake.base.pos.Pos): The snake's head.
+            direc (snake.base.direc.Direc): Current moving direction, used to
+                prefer going straight among equally short paths.
+
+        Returns:
+            A snake.base.path.Path, empty if the
+            target cannot be reached.
+        """
+        self._start = head.x * self._num_cols + head.y
+        self._compute_shortest_path()
+
+        g, free, offs = self._g, self._free, self._offsets
+        path = Path()
+        if self._rhs[self._start] == INF:
+            return path
+
+        # Follow the successors minimizing c + g, as in D* Lite
+        cur = self._start
+        for _ in range(len(g)):
+            best, best_direc = INF, None
+            for d in STRAIGHT_FIRST[direc]:
+                nxt = cur + offs[d]
+                if free[nxt] and g[nxt] < best:
+                    best, best_direc = g[nxt], d
+            if best_direc is None:
+                return Path()
+            cur += offs[best_direc]
+            path.append(best_direc)
+            direc = best_direc
+            if cur == self._goal:
+                return path
+        return Path()
+
+    def _rebuild(self, snake, target):
+        num_rows, num_cols = snake.map.num_rows, snake.map.num_cols
+        self._num_cols = num_cols
+        self._offsets = offsets(num_cols)
+        self._free = free_cells(snake.map)
+        self._g = [INF] * (num_rows * num_cols)
+        self._rhs = [INF] * (num_rows * num_cols)
+        self._queue = []
+        self._queued = {}
+        self._km = 0
+        self._start = snake.head().x * num_cols + snake.head().y
+        self._goal = target.x * num_cols + target.y
+        if self._free[self._goal]:
+            self._rhs[self._goal] = 0
+            self._push(self._goal)
+
+    def _on_move(self, entered, left):
+        free = self._free
+        steps = self._offsets.values()
+        new_start = entered.x * self._num_cols + entered.y
+        self._km += self._h(self._start, new_start)
+        self._start = new_start
+
+        # Edges into the entered cell are cut
+        free[new_start] = 0
+        for s in steps:
+            self._update_pred(new_start + s)
+
+        # Edges into the cell left by the tail come back
+        tail = left.x * self._num_cols + left.y
+        free[tail] = 1
+        self._update_vertex(tail)
+        for s in steps:
+            self._update_pred(tail + s)
+
+    def _update_pred(self, u):
+        """Update a vertex whose outgoing edges changed, if it can move."""
+        if self._free[u] or u == self._start:
+            self._update_vertex(u)
+
+    def _update_vertex(self, u):
+        g, rhs, free = self._g, self._rhs, self._free
+        if u != self._goal:
+            best = INF
+            for s in self._offsets.values():
+                v = u + s
+                if free[v] and g[v] < best:
+                    best = g[v]
+            rhs[u] = INF if best == INF else best + 1
+        if g[u] != rhs[u]:
+            self._push(u)
+        else:
+            self._queued.pop(u, None)
+
+    def _compute_shortest_path(self):
+        g, rhs, queue, queued = self._g, self._rhs, self._queue, self._queued
+        start = self._start
+        steps = self._offsets.values()
+        while queue:
+            k_old, u = queue[0]
+            if queued.get(u) != k_old:
+                heappop(queue)  # Stale entry
+                continue
+            if not (k_old < self._key(start) or rhs[start] != g[start]):
+                break
+            heappop(queue)
+            del queued[u]
+            self.num_expanded += 1
+
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                if self._free[u]:
+                    for s in steps:
+                        self._update_pred(u + s)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                if self._free[u]:
+                    for s in steps:
+                        self._update_pred(u + s)
+
+    def _push(self, u, key=None):
+        if key is None:
+            key = self._key(u)
+        self._queued[u] = key
+        heappush(self._queue, (key, u))
+
+    def _key(self, u):
+        m = min(self._g[u], self._rhs[u])
+        if m == INF:
+            return (INF, INF)
+        return (m + self._h(self._start, u) + self._km, m)
+
+    def _h(self, a, b):
+        ax, ay = divmod(a, self._num_cols)
+        bx, by = divmod(b, self._num_cols)
+        return abs(ax - bx) + abs(ay - by)
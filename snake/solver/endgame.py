@@ -0,0 +1,233 @@
+"""Exact search for the last foods of a nearly full board.
+
+With only a few free cells, the greedy steps often find no safe path to the
+food even though one exists: the body moves while the snake travels, so a
+route can go through cells that are still body when it starts. The search
+here tries move sequences, not paths over the current free space.
+
+Each cell gets the move during which the body leaves it (0 when free), so a
+move is legal if it enters a cell left during an earlier move, and the
+state is updated and restored in O(1) per move. Iterative deepening A*
+walks the sequences, bounded by the earliest arrival at the food when the
+body is ignored except for the time it takes to leave each cell. A
+transposition table drops sequences that reach a state (the body, hashed
+incrementally) already seen with fewer moves.
+"""
+
+import heapq
+
+from snake.base import Direc, Path, PointType, Pos
+
+_WALL = 1 << 30  # Leave time of the walls
+_MOD = (1 << 61) - 1  # Modulus and base of the body hash
+_BASE = 1_000_003
+
+
+class EndgameSearch:
+    """Find a move sequence to the food after which the snake is safe.
+
+    Safe is the test of GreedySolver's step 3, made exact: once the food is
+    eaten the map is full, or the head can reach the tail by a path of at
+    least two moves through free cells.
+    """
+
+    def __init__(self, max_nodes=5000):
+        """Initialize an EndgameSearch.
+
+        Args:
+            max_nodes (int): Moves tried per search before giving up. This
+                is a heuristic cut-off: a search that hits it has not shown
+                that there is no route.
+        """
+        self.max_nodes = max_nodes
+        self.num_nodes = 0  # Moves tried, over all the searches
+
+    def route(self, snake, expired=None):
+        """Search for a route to the food after which the snake is safe.
+
+        Args:
+            snake (snake.base.snake.Snake): The snake, on its map.
+            expired (callable): Polled during the search, which gives up
+                when it returns True (e.g. Deadline.expired).
+
+        Returns:
+            (path, exhausted): the Path, or None if none was found. With no
+            path, exhausted tells whether every move sequence was tried, so
+            that there is no route, or the search gave up (max_nodes or
+            expired) and there may be one.
+        """
+        if snake.map.food is None:
+            return None, True
+        if expired is not None and expired():
+            return None, False
+        state = _State(snake, expired)
+        limit = state.bound()
+        nodes_left = [self.max_nodes]
+        try:
+            while limit is not None:
+                moves = []
+                limit = state.search(0, limit, moves, {}, nodes_left)
+                if limit == 0:
+                    return Path(Direc(d) for d in moves), True
+        except _OutOfNodes:
+            return None, False
+        finally:
+            self.num_nodes += self.max_nodes - max(nodes_left[0], 0)
+        return None, True
+
+
+class _State:
+    """Snake and free space as flat arrays, updated move by move."""
+
+    def __init__(self, snake, expired=None):
+        self.expired = expired
+        game_map = snake.map
+        num_rows, num_cols = game_map.num_rows, game_map.num_cols
+        self.num_cols = num_cols
+        self.steps = (0, -1, -num_cols, 1, num_cols)  # By direction value
+        self.capacity = game_map.capacity
+        food = game_map.food
+        self.food = food.x * num_cols + food.y
+        self.fx, self.fy = food.x, food.y
+
+        # Move during which the body leaves each cell, the tail first
+        self.leave = [0] * (num_rows * num_cols)
+        for i in range(num_rows):
+            for j in range(num_cols):
+                if game_map.point(Pos(i, j)).type == PointType.WALL:
+                    self.leave[i * num_cols + j] = _WALL
+        bodies = snake.bodies
+        self.body = [p.x * num_cols + p.y for p in reversed(bodies)]  # Tail first
+        length = len(self.body)
+        for k, cell in enumerate(self.body):
+            self.leave[cell] = k + 1
+        self.length = length
+        self.t = 0  # Moves made
+        self.direc = snake.direc.value
+
+        # Polynomial hash of the body, the tail at the highest power
+        self.power = pow(_BASE, length - 1, _MOD)
+        self.hash = 0
+        for cell in self.body:
+            self.hash = (self.hash * _BASE + cell) % _MOD
+
+    def head(self):
+        return self.body[self.t + self.length - 1]
+
+    def tail(self):
+        return self.body[self.t]
+
+    def bound(self):
+        """Return the fewest moves to the food if the body left its cells
+        without getting in the way again, None if it cannot be reached."""
+        leave, steps, t = self.leave, self.steps[1:], self.t
+        src, food = self.head(), self.food
+        arrival = {src: 0}
+        heap = [(0, src)]
+        while heap:
+            d, cur = heapq.heappop(heap)
+            if cur == food:
+                return d
+            if d > arrival[cur]:
+                continue
+            for step in steps:
+                nxt = cur + step
+                if leave[nxt] == _WALL:
+                    continue
+                # Entered by move t + nd, after the move during which it is left
+                nd = max(d + 1, leave[nxt] - t + 1)
+                if nd < arrival.get(nxt, _WALL):
+                    arrival[nxt] = nd
+                    heapq.heappush(heap, (nd, nxt))
+        return None
+
+    def search(self, g, limit, moves, seen, nodes_left):
+        """Depth-first search below limit moves.
+
+        Returns:
+            0 if moves now leads to the food safely, else the smallest
+            f = g + h over the limit met (None if none), the next limit.
+        """
+        head = self.head()
+        hx, hy = divmod(head, self.num_cols)
+        h = abs(hx - self.fx) + abs(hy - self.fy)
+        if g + h > limit:
+            return g + h
+        if seen.get(self.hash, _WALL) <= g:
+            return None
+        seen[self.hash] = g
+
+        next_limit = None
+        leave, t = self.leave, self.t
+        for direc in _order(self.direc):
+            nxt = head + self.steps[direc]
+            if leave[nxt] > t:
+                continue  # A wall or still body at the end of this move
+            nodes_left[0] -= 1
+            if nodes_left[0] < 0:
+                raise _OutOfNodes
+            if not nodes_left[0] & 255 and self.expired is not None and self.expired():
+                raise _OutOfNodes
+            if nxt == self.food:
+                if self._safe_after_eating():
+                    moves.append(direc)
+                    return 0
+                continue
+            moves.append(direc)
+            undo = self._move(nxt, direc)
+            f = self.search(g + 1, limit, moves, seen, nodes_left)
+            self._undo(nxt, undo)
+            if f == 0:
+                return 0
+            moves.pop()
+            if f is not None and (next_limit is None or f < next_limit):
+                next_limit = f
+        return next_limit
+
+    def _move(self, nxt, direc):
+        """Move the head into nxt without eating; return what to undo."""
+        tail = self.body[self.t]
+        undo = (self.leave[nxt], self.direc, self.hash)
+        self.t += 1
+        self.body.append(nxt)
+        self.leave[nxt] = self.t + self.length
+        self.direc = direc
+        # Drop the tail from the hash, then append the new head
+        self.hash = ((self.hash - tail * self.power) * _BASE + nxt) % _MOD
+        return undo
+
+    def _undo(self, nxt, undo):
+        self.leave[nxt], self.direc, self.hash = undo
+        self.body.pop()
+        self.t -= 1
+
+    def _safe_after_eating(self):
+        """Check the state after the head moves into the food (the tail
+        stays): the map is full, or a path of two moves or more leads from
+        the food to the tail through the cells left by the moves made."""
+        if self.length + 1 >= self.capacity:
+            return True
+        leave, t, food = self.leave, self.t, self.food
+        steps = self.steps[1:]
+        tail_adj = {self.tail() + s for s in steps}
+        stack = [food + s for s in steps if leave[food + s] <= t]
+        seen = set(stack)
+        while stack:
+            cur = stack.pop()
+            if cur in tail_adj:
+                return True
+            for s in steps:
+                nxt = cur + s
+                if nxt not in seen and leave[nxt] <= t and nxt != food:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return False
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+def _order(direc):
+    """Return the direction values to try, straight ahead first."""
+    return (direc,) + tuple(d for d in (1, 2, 3, 4) if d != direc)
@@ -0,0 +1,244 @@
+import sys
+from collections import deque
+from heapq import heappop, heappush
+
+from snake.base import Direc, Path, Pos
+from snake.base.direc import STRAIGHT_FIRST
+
+INF = sys.maxsize
+
+
+class MoveTracker:
+    """Base class of planners that follow the snake's moves between calls.
+
+    sync() rebuilds the planner when the snake, its map or the target
+    changed, or when the snake grew or was reset. Otherwise it replays the
+    moves made since the last call: each move, the head enters one cell and
+    the tail leaves one.
+
+    Only the changes made by the snake's moves are tracked; anything else
+    that edits the map (other than eating the food) needs a new target or a
+    new planner.
+
+    Subclasses implement _rebuild(snake, target) and _on_move(entered, left).
+    """
+
+    def __init__(self):
+        self._snake = None
+        self._map = None
+        self._target = None
+        self._steps = 0
+        self._bodies = ()
+        self.num_rebuilds = 0
+        self.num_updates = 0
+
+    def sync(self, snake, target):
+        """Bring the planner up to date with the snake's current state."""
+        delta = snake.steps - self._steps
+        bodies = snake.bodies
+        if (
+            snake is not self._snake
+            or snake.map is not self._map
+            or target != self._target
+            or len(bodies) != len(self._bodies)
+            or delta < 0
+            or delta >= len(bodies)
+            or bodies[delta] != self._bodies[0]
+        ):
+            self._snake, self._map, self._target = snake, snake.map, target
+            self._steps = snake.steps
+            self._bodies = tuple(bodies)
+            self.num_rebuilds += 1
+            self._rebuild(snake, target)
+            return
+
+        old = self._bodies
+        for t in range(1, delta + 1):
+            self._on_move(bodies[delta - t], old[-t])
+        self._steps = snake.steps
+        self._bodies = tuple(bodies)
+        self.num_updates += delta
+
+    def _rebuild(self, snake, target):
+        raise NotImplementedError
+
+    def _on_move(self, entered, left):
+        raise NotImplementedError
+
+
+class DistanceField(MoveTracker):
+    """BFS distances from a target cell (the food) to every free cell.
+
+    The field is built once per target and then kept exact while the snake
+    moves: the cell taken by the new head is blocked and the cell left by the
+    tail is freed, each repaired locally. A shortest path from the head to
+    the target is then a descent along decreasing distances, which costs
+    O(path length) instead of a search over the whole map.
+
+    Cells are addressed by flat index x * num_cols + y. The map border is
+    made of walls, so the four neighbors of a free cell are always in range.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._num_cols = 0
+        self._offsets = {}
+        self._free = bytearray()
+        self._dist = []
+
+    def dist(self, pos):
+        """Return the distance from a position to the target (INF if unreachable)."""
+        return self._dist[pos.x * self._num_cols + pos.y]
+
+    def path_from(self, head, direc):
+        """Return a shortest path from a cell to the target.
+
+        The start cell itself need not be free (it is usually the head).
+        Among equally short continuations, going straight is preferred.
+
+        Args:
+            head (snake.base.pos.Pos): Start position.
+            direc (snake.base.direc.Direc): Current moving direction.
+
+        Returns:
+            A snake.base.path.Path, empty if the
+            target cannot be reached.
+        """
+        dist, free, offsets = self._dist, self._free, self._offsets
+        cur = head.x * self._num_cols + head.y
+        path = Path()
+
+        # First step: the free neighbor closest to the target
+        best, best_direc = INF, Direc.NONE
+        for d in STRAIGHT_FIRST[direc]:
+            nxt = cur + offsets[d]
+            if free[nxt] and dist[nxt] < best:
+                best, best_direc = dist[nxt], d
+        if best == INF:
+            return path
+
+        while True:
+            cur += offsets[best_direc]
+            path.append(best_direc)
+            cur_dist = dist[cur]
+            if cur_dist == 0:
+                return path
+            for d in STRAIGHT_FIRST[best_direc]:
+                nxt = cur + offsets[d]
+                if free[nxt] and dist[nxt] == cur_dist - 1:
+                    best_direc = d
+                    break
+
+    def _rebuild(self, snake, target):
+        num_rows, num_cols = snake.map.num_rows, snake.map.num_cols
+        self._num_cols = num_cols
+        self._offsets = offsets(num_cols)
+        self._free = free_cells(snake.map)
+
+        dist = self._dist = [INF] * (num_rows * num_cols)
+        src = target.x * num_cols + target.y
+        if not self._free[src]:
+            return
+        dist[src] = 0
+        self._propagate(deque((src,)))
+
+    def _propagate(self, queue):
+        """Lower distances outwards from the cells in the queue (BFS)."""
+        dist, free = self._dist, self._free
+        steps = tuple(self._offsets.values())
+        while queue:
+            cur = queue.popleft()
+            nxt_dist = dist[cur] + 1
+            for step in steps:
+                nxt = cur + step
+                if free[nxt] and dist[nxt] > nxt_dist:
+                    dist[nxt] = nxt_dist
+                    queue.append(nxt)
+
+    def _on_move(self, entered, left):
+        self._block(entered)
+        self._unblock(left)
+
+    def _unblock(self, pos):
+        """A cell became free: its distance can only shorten others'."""
+        dist, free = self._dist, self._free
+        cur = pos.x * self._num_cols + pos.y
+        free[cur] = 1
+        best = INF
+        for step in self._offsets.values():
+            nxt = cur + step
+            if free[nxt] and dist[nxt] < best:
+                best = dist[nxt]
+        if best == INF:
+            return
+        dist[cur] = best + 1
+        self._propagate(deque((cur,)))
+
+    def _block(self, pos):
+        """A cell became occupied: repair the cells whose paths used it."""
+        dist, free = self._dist, self._free
+        steps = tuple(self._offsets.values())
+        cur = pos.x * self._num_cols + pos.y
+        free[cur] = 0
+        cur_dist = dist[cur]
+        if cur_dist == INF:
+            return
+        dist[cur] = INF
+
+        # Find the cells left without any neighbor one step closer to the
+        # target. Candidates are visited in order of distance, so a cell's
+        # possible parents are settled before the cell itself.
+        affected = []
+        queue = deque(
+            (cur + step, cur_dist + 1)
+            for step in steps
+            if free[cur + step] and dist[cur + step] == cur_dist + 1
+        )
+        while queue:
+            u, u_dist = queue.popleft()
+            if dist[u] != u_dist:
+                continue  # Already marked affected
+            if any(free[u + s] and dist[u + s] == u_dist - 1 for s in steps):
+                continue  # Still has a parent
+            dist[u] = INF
+            affected.append(u)
+            for s in steps:
+                if free[u + s] and dist[u + s] == u_dist + 1:
+                    queue.append((u + s, u_dist + 1))
+
+        # Re-seed the affected cells from their unaffected neighbors
+        heap = []
+        for u in affected:
+            best = min((dist[u + s] for s in steps if free[u + s]), default=INF)
+            if best != INF:
+                heappush(heap, (best + 1, u))
+        while heap:
+            u_dist, u = heappop(heap)
+            if u_dist >= dist[u]:
+                continue
+            dist[u] = u_dist
+            for s in steps:
+                nxt = u + s
+                if free[nxt] and dist[nxt] > u_dist + 1:
+                    heappush(heap, (u_dist + 1, nxt))
+
+
+def offsets(num_cols):
+    """Return {direction: flat index offset} on a map with num_cols columns."""
+    return {
+        Direc.LEFT: -1,
+        Direc.UP: -num_cols,
+        Direc.RIGHT: 1,
+        Direc.DOWN: num_cols,
+    }
+
+
+def free_cells(game_map):
+    """Return a flat bytearray with 1 for every empty or food cell."""
+    num_rows, num_cols = game_map.num_rows, game_map.num_cols
+    free = bytearray(num_rows * num_cols)
+    for i in range(1, num_rows - 1):
+        for j in range(1, num_cols - 1):
+            if game_map.is_safe(Pos(i, j)):
+                free[i * num_cols + j] = 1
+    return free
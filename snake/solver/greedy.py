@@ -1,46 +1,318 @@
+from array import array
+from collections import OrderedDict
+
+from snake.base.path import Path
 from snake.base.pos import Pos
 from snake.solver.base import BaseSolver
+from snake.solver.endgame import EndgameSearch
 from snake.solver.path import PathSolver
 
 
 class GreedySolver(BaseSolver):
-    def __init__(self, snake, short_algr="bfs", long_algr="heuristic"):
-        super().__init__(snake)
+    def __init__(
+        self,
+        snake,
+        short_algr="bfs",
+        long_algr="heuristic",
+        commit=False,
+        table_size=0,
+        deadline=None,
+        endgame=0,
+    ):
+        """Initialize a GreedySolver.
+
+        Args:
+            snake (snake.base.snake.Snake): The snake to direct.
+            short_algr (str): Shortest path algorithm.
+            long_algr (str): Longest path algorithm.
+            commit (bool): Keep following the last path to the food found
+                safe instead of planning again every step, until the food
+                moves, the snake strays from the path or a cell of the path
+                is taken.
+            table_size (int): Remember the direction chosen in up to this
+                many states (body, heading and food) and reuse it when a
+                state recurs, evicting the least recently used. 0 disables
+                the table.
+            deadline (float): Seconds per move, None for no limit. When the
+                time is up, the searches stop and the move heads for the food
+                as far as step 1 got, or else follows a path to the tail
+                found so far, or else falls back to step 5.
+            endgame (int): When no more cells than this are free, search
+                move sequences for a safe route to the food (see
+                snake.solver.endgame) before steps 1-3, which only look at
+                the current free space. The search is exact up to its node
+                budget. 0 disables it.
+        """
+        super().__init__(snake, deadline)
         self._path_solver = PathSolver(snake, short_algr, long_algr)
+        self._path_solver.deadline = self.deadline
+        # Connectivity answers "can the head still reach the tail" without a
+        # search, so hopeless longest-path searches are skipped
+        self.map.enable_connectivity()
+        # The virtual snake of step 2 moves many cells at once, so its map is
+        # checked with a bitboard, updated in O(1) per move and filled in a
+        # few big-int operations per ring
+        self.map.enable_bitboard()
+        # With BFS for both searches, the food and the tail are searched
+        # together in step 1 and step 4 only extends the path to the tail.
+        self._shared_search = short_algr == "bfs" and long_algr == "bfs"
+
+        # Virtual snake and map for lookahead, overwritten on every use
+        self._scratch = None
+
+        self._commit = commit
+        self._plan = Path()
+        self._plan_food = None
+        self._plan_head = None
+        self.num_plans = 0
+        self.num_committed = 0
+
+        if table_size < 0:
+            raise ValueError(f"table_size must be non-negative, got {table_size}")
+        self._table = OrderedDict() if table_size else None
+        self._table_size = table_size
+        self.num_table_hits = 0
+        self.num_table_misses = 0
+
+        self._endgame = EndgameSearch() if endgame else None
+        self._endgame_free = endgame
+        self._endgame_failed = None  # Food the search found no route to
+        # Searches cut short for the current food, and the step before
+        # which it is not searched again
+        self._endgame_cuts = 0
+        self._endgame_retry = 0
+        self._route = Path()
+        self._route_food = None
+        self._route_head = None
+        self.num_endgame_searches = 0
+        self.num_endgame_routes = 0
+
+    def counters(self):
+        counters = super().counters()
+        counters.update(
+            plans=self.num_plans,
+            committed=self.num_committed,
+            table_hits=self.num_table_hits,
+            table_misses=self.num_table_misses,
+        )
+        if self._endgame is not None:
+            counters.update(
+                endgame_searches=self.num_endgame_searches,
+                endgame_routes=self.num_endgame_routes,
+                endgame_nodes=self._endgame.num_nodes,
+            )
+        return counters
 
     def next_direc(self):
-        # Create a virtual snake
-        s_copy, m_copy = self.snake.copy()
+        self.deadline.start()
+        if self._commit:
+            direc = self._follow_plan()
+            if direc is not None:
+                self.num_committed += 1
+                return direc
+            self._plan = Path()
+        if self._route:
+            direc = self._follow_route()
+            if direc is not None:
+                return direc
+
+        if self._table is None or self.map.food is None:
+            return self._decide()
+        key = self._state_key()
+        direc = self._table.get(key)
+        if direc is not None:
+            self._table.move_to_end(key)
+            self.num_table_hits += 1
+            return direc
+        self.num_table_misses += 1
+        direc = self._decide()
+        if self.deadline.tripped:
+            return direc  # A fallback, not worth remembering
+        self._table[key] = direc
+        if len(self._table) > self._table_size:
+            self._table.popitem(last=False)
+        return direc
+
+    def _state_key(self):
+        """Return the state the decision depends on as bytes: the food, the
+        heading and the body cells from the head, as 16-bit flat indices.
+        The walls never change, so they are left out."""
+        num_cols = self.map.num_cols
+        food = self.map.food
+        cells = array("H", (food.x * num_cols + food.y, self.snake.direc.value))
+        cells.extend(p.x * num_cols + p.y for p in self.snake.bodies)
+        return cells.tobytes()
+
+    def _decide(self):
+        # Endgame: few cells left, search move sequences for a safe route
+        if self._endgame is not None and not self.deadline.expired():
+            direc = self._endgame_direc()
+            if direc is not None:
+                return direc
 
         # Step 1
+        self.num_plans += 1
         self._path_solver.snake = self.snake
-        path_to_food = self._path_solver.shortest_path_to_food()
+        base_to_tail = None
+        if self._shared_search:
+            food, tail = self.map.food, self.snake.tail()
+            paths = self._path_solver.search_from_head((food, tail))
+            path_to_food = paths.get(food, Path())
+            base_to_tail = paths.get(tail, Path())
+        else:
+            path_to_food = self._path_solver.shortest_path_to_food()
 
+        # Move towards the food in case time runs out below, taken now while
+        # the BFS table still holds step 1's search
         if path_to_food:
-            # Step 2
+            food_direc = path_to_food[0]
+        elif self.deadline.expired():
+            food_direc = self._partial_direc()
+        else:
+            food_direc = None
+
+        if path_to_food and not self.deadline.expired():
+            # Step 2: move a virtual snake along the path
+            s_copy, m_copy = self._virtual_snake()
             s_copy.move_path(path_to_food)
             if m_copy.is_full():
-                return path_to_food[0]
+                return self._start_plan(path_to_food)
 
             # Step 3
-            self._path_solver.snake = s_copy
-            path_to_tail = self._path_solver.longest_path_to_tail()
-            if len(path_to_tail) > 1:
-                return path_to_food[0]
+            if m_copy.bitboard.can_reach(s_copy.head(), s_copy.tail()):
+                self._path_solver.snake = s_copy
+                path_to_tail = self._path_solver.longest_path_to_tail()
+                self._path_solver.snake = self.snake
+                if len(path_to_tail) > 1:
+                    return self._start_plan(path_to_food)
+            if not self.deadline.expired():
+                food_direc = None  # Step 3 found the food unsafe
 
         # Step 4
-        self._path_solver.snake = self.snake
-        path_to_tail = self._path_solver.longest_path_to_tail()
-        if len(path_to_tail) > 1:
+        conn = self.map.connectivity
+        path_to_tail = None
+        if self.deadline.expired():
+            # Out of time: head for the food as far as step 1 got if there
+            # is room for the snake there, or else follow a path to the
+            # tail found in step 1
+            if food_direc is not None:
+                nxt = self.snake.head().adj(food_direc)
+                if conn.component_size(nxt) > self.snake.len():
+                    return food_direc
+            path_to_tail = base_to_tail
+        elif conn.can_reach(self.snake.head(), self.snake.tail()):
+            self._path_solver.snake = self.snake
+            path_to_tail = self._path_solver.longest_path_to_tail(base_to_tail)
+        if path_to_tail is not None and len(path_to_tail) > 1:
             return path_to_tail[0]
 
-        # Step 5
+        # Step 5: the largest free space, then the farthest from the food
         head = self.snake.head()
-        direc, max_dist = self.snake.direc, -1
+        direc, max_key = self.snake.direc, None
         for adj in head.all_adj():
             if self.map.is_safe(adj):
-                dist = Pos.manhattan_dist(adj, self.map.food)
-                if dist > max_dist:
-                    max_dist = dist
+                key = (conn.component_size(adj), Pos.manhattan_dist(adj, self.map.food))
+                if max_key is None or key > max_key:
+                    max_key = key
                     direc = head.direc_to(adj)
         return direc
+
+    def _partial_direc(self):
+        """Return the first move towards the food of a step 1 search cut
+        short by the deadline, or None."""
+        if self._path_solver.short_algr != "bfs" or self.map.food is None:
+            return None  # The BFS table does not hold step 1's search
+        path = self._path_solver.path_toward(self.map.food)
+        return path[0] if path else None
+
+    def _endgame_direc(self):
+        """Return the first move of a safe route to the food found by the
+        endgame search, keeping the rest of it, or None."""
+        if self.map.food is None or (
+            self.map.capacity - self.snake.len() > self._endgame_free
+        ):
+            return None
+        if self.map.food != self._route_food:
+            self._endgame_cuts = self._endgame_retry = 0
+        if self.map.food == self._endgame_failed:
+            return None
+        if self.snake.steps < self._endgame_retry:
+            return None
+
+        self.num_endgame_searches += 1
+        route, exhausted = self._endgame.route(self.snake, self.deadline.expired)
+        self._route_food = self.map.food
+        if route is None:
+            # Any route from a later state, after the moves made meanwhile,
+            # would have been one from this state, so once every sequence
+            # was tried the search is not repeated for this food. A search
+            # cut short is retried later, after twice as many moves each
+            # time, since the next states are likely just as hard.
+            if exhausted:
+                self._endgame_failed = self.map.food
+            else:
+                self._endgame_retry = self.snake.steps + (1 << self._endgame_cuts)
+                self._endgame_cuts += 1
+            return None
+        self.num_endgame_routes += 1
+        self._route = route
+        self._route_head = self.snake.head()
+        return self._follow_route()
+
+    def _follow_route(self):
+        """Return the next move of the endgame route, or None if the snake
+        or the food is not where the route expects."""
+        if self.snake.head() != self._route_head or self.map.food != self._route_food:
+            self._route = Path()
+            return None
+        direc = self._route.popleft()
+        self._route_head = self._route_head.adj(direc)
+        return direc
+
+    def _virtual_snake(self):
+        """Return (snake, map), a copy of the current snake and map made in
+        the solver's scratch pair."""
+        scratch = self._scratch
+        if scratch is None or (scratch.map.num_rows, scratch.map.num_cols) != (
+            self.map.num_rows,
+            self.map.num_cols,
+        ):
+            s_copy, m_copy = self.snake.copy(connectivity=False)
+            self._scratch = s_copy
+            return s_copy, m_copy
+        # Step 3 checks the virtual map with its bitboard, so the oracle is
+        # left out rather than copied and kept up to date along the path
+        return self.snake.copy_into(scratch, connectivity=False)
+
+    def _start_plan(self, path_to_food):
+        """Return the first move of a safe path to the food, keeping the
+        rest of it if plans are committed to."""
+        if self._commit:
+            self._plan = path_to_food
+            self._plan_food = self.map.food
+            self._plan_head = self.snake.head()
+            return self._pop_plan()
+        return path_to_food[0]
+
+    def _follow_plan(self):
+        """Return the next move of the committed plan, or None if it has to
+        be made again."""
+        if (
+            not self._plan
+            or self.map.food != self._plan_food
+            or self.snake.head() != self._plan_head
+        ):
+            return None
+        # The moves were checked against the snake's own body when planned;
+        # anything else taking a cell of the path needs a new plan
+        cur = self._plan_head
+        for direc in self._plan:
+            cur = cur.adj(direc)
+            if not self.map.is_safe(cur):
+                return None
+        return self._pop_plan()
+
+    def _pop_plan(self):
+        direc = self._plan.popleft()
+        self._plan_head = self._plan_head.adj(direc)
+        return direc
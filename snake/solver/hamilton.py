@@ -1,91 +1,434 @@
-from snake.base import Direc
+import hashlib
+import os
+import sys
+from array import array
+
+from snake.base import Direc, Pos
 from snake.solver.base import BaseSolver
 from snake.solver.path import PathSolver
 
+# Bump when build_cycle() changes, so cached cycles are not reused
+BUILDER_VERSION = 1
+DIR_CYCLES = os.path.join("logs", "cycles")
 
-class _TableCell:
-    def __init__(self):
-        self.reset()
+_cache = {}  # Cache key -> array of flat cell indices along the cycle
+_cache_dir = None
 
-    def __str__(self):
-        return f"{{ idx: {self.idx}  direc: {self.direc} }}"
+# Cycle files hold 32-bit little-endian cells, whatever the platform's ints
+_CELL_TYPE = next(t for t in "IL" if array(t).itemsize == 4)
+_SWAP_BYTES = sys.byteorder != "little"
 
-    __repr__ = __str__
 
-    def reset(self):
-        self.idx = None
-        self.direc = Direc.NONE
+class HamiltonSolver(BaseSolver):
+    SHORTCUTS = ("path", "index", "none")
+    REPAIR_BUDGET = 8  # Squares checked per repair, times the capacity
 
+    def __init__(
+        self,
+        snake,
+        short_algr="bfs",
+        long_algr="heuristic",
+        shortcuts=True,
+        repair=False,
+        deadline=None,
+    ):
+        """Initialize a HamiltonSolver.
 
-class HamiltonSolver(BaseSolver):
-    def __init__(self, snake, short_algr="bfs", long_algr="heuristic", shortcuts=True):
+        Args:
+            snake (snake.base.snake.Snake): The snake to direct.
+            short_algr (str): Shortest path algorithm of 'path' shortcuts.
+            long_algr (str): Longest path algorithm, used when the cycle
+                cannot be built directly.
+            shortcuts (bool or str): How to leave the cycle towards the food
+                while the snake is short: 'path' (or True) follows the first
+                step of a shortest path to the food, 'index' picks the
+                neighbor that skips the most of the cycle without a search,
+                'none' (or False) always follows the cycle.
+            repair (bool): Re-route the cycle each time a new food appears so
+                that the food comes sooner along it (see _repair_cycle()).
+            deadline (float): Seconds per move, None for no limit. A 'path'
+                shortcut search that runs out of time falls back to an
+                'index' shortcut.
+        """
         if snake.map.num_rows % 2 != 0 or snake.map.num_cols % 2 != 0:
             raise ValueError("num_rows and num_cols must be even.")
-        super().__init__(snake)
-
-        # A* for longest path is not supported in Hamilton solver
-        if long_algr == "astar":
-            raise ValueError("A* algorithm is not supported for longest path in Hamilton solver. Use 'bfs' or 'dfs' instead.")
+        super().__init__(snake, deadline)
 
+        if shortcuts is True:
+            shortcuts = "path"
+        elif not shortcuts:
+            shortcuts = "none"
+        if shortcuts not in HamiltonSolver.SHORTCUTS:
+            raise ValueError(f"Unsupported shortcuts: {shortcuts}. Use 'path', 'index' or 'none'.")
         self._shortcuts = shortcuts
         self._path_solver = PathSolver(snake, short_algr, long_algr)
-        self._table = [
-            [_TableCell() for _ in range(snake.map.num_cols)]
-            for _ in range(snake.map.num_rows)
-        ]
+        self._path_solver.deadline = self.deadline
+        # Flat cell index (x * num_cols + y) -> position on the cycle and
+        # direction to the next cell, None/NONE for the walls
+        num_cells = snake.map.num_rows * snake.map.num_cols
+        self._num_cols = num_cols = snake.map.num_cols
+        self._idx = [None] * num_cells
+        self._direc = [Direc.NONE] * num_cells
+        self._cells = []  # Position on the cycle -> flat cell index
+        self._steps_to_direc = {
+            -1: Direc.LEFT, -num_cols: Direc.UP, 1: Direc.RIGHT, num_cols: Direc.DOWN
+        }
         self._build_cycle()
 
-    @property
-    def table(self):
-        return self._table
+        self._repair = repair
+        self._repaired_food = None
+        self._steps = snake.steps
+        self._budget = 0
+        # Flat offsets perpendicular to a move
+        self._perps = {
+            -1: (-num_cols, num_cols), 1: (-num_cols, num_cols),
+            -num_cols: (-1, 1), num_cols: (-1, 1),
+        }
+        self.num_splices = 0
+
+    def cycle_idx(self, pos):
+        """Return the position of a cell on the cycle, 0 at the initial head."""
+        return self._idx[pos.x * self._num_cols + pos.y]
+
+    def cycle_direc(self, pos):
+        """Return the direction from a cell to the next one on the cycle."""
+        return self._direc[pos.x * self._num_cols + pos.y]
 
     def next_direc(self):
+        self.deadline.start()
+        if self._repair:
+            if self.snake.steps < self._steps:
+                # A new episode starts from the initial cycle
+                self._build_cycle()
+                self._repaired_food = None
+            self._steps = self.snake.steps
+            if self.map.food is not None and self.map.food != self._repaired_food:
+                self._repaired_food = self.map.food
+                self._repair_cycle()
+
         head = self.snake.head()
-        nxt_direc = self._table[head.x][head.y].direc
+        nxt_direc = self.cycle_direc(head)
 
         # Take shorcuts when the snake is not too long
-        if self._shortcuts and self.snake.len() < 0.5 * self.map.capacity:
-            path = self._path_solver.shortest_path_to_food()
-            if path:
-                tail, nxt, food = self.snake.tail(), head.adj(path[0]), self.map.food
-                tail_idx = self._table[tail.x][tail.y].idx
-                head_idx = self._table[head.x][head.y].idx
-                nxt_idx = self._table[nxt.x][nxt.y].idx
-                food_idx = self._table[food.x][food.y].idx
-                # Exclude one exception
-                if not (len(path) == 1 and abs(food_idx - tail_idx) == 1):
-                    head_idx_rel = self._relative_dist(
-                        tail_idx, head_idx, self.map.capacity
-                    )
-                    nxt_idx_rel = self._relative_dist(
-                        tail_idx, nxt_idx, self.map.capacity
-                    )
-                    food_idx_rel = self._relative_dist(
-                        tail_idx, food_idx, self.map.capacity
-                    )
-                    if nxt_idx_rel > head_idx_rel and nxt_idx_rel <= food_idx_rel:
-                        nxt_direc = path[0]
+        if self._shortcuts == "none" or self.snake.len() >= 0.5 * self.map.capacity:
+            return nxt_direc
+        if self._shortcuts == "index":
+            return self._index_shortcut(head, nxt_direc)
+
+        path = self._path_solver.shortest_path_to_food()
+        if not path and self.deadline.tripped:
+            return self._index_shortcut(head, nxt_direc)
+        if path:
+            tail, nxt, food = self.snake.tail(), head.adj(path[0]), self.map.food
+            tail_idx = self.cycle_idx(tail)
+            head_idx = self.cycle_idx(head)
+            nxt_idx = self.cycle_idx(nxt)
+            food_idx = self.cycle_idx(food)
+            # Exclude one exception
+            if not (len(path) == 1 and abs(food_idx - tail_idx) == 1):
+                head_idx_rel = self._relative_dist(
+                    tail_idx, head_idx, self.map.capacity
+                )
+                nxt_idx_rel = self._relative_dist(
+                    tail_idx, nxt_idx, self.map.capacity
+                )
+                food_idx_rel = self._relative_dist(
+                    tail_idx, food_idx, self.map.capacity
+                )
+                if nxt_idx_rel > head_idx_rel and nxt_idx_rel <= food_idx_rel:
+                    nxt_direc = path[0]
 
         return nxt_direc
 
+    def _index_shortcut(self, head, direc):
+        """Return the move to the neighbor that skips the most of the cycle
+        without passing the food.
+
+        The body always covers the cycle from the tail to the head, so the
+        cells after the head up to the food are free; a neighbor whose index
+        relative to the tail lies in that range is safe, as for 'path'
+        shortcuts. Only cycle indices are read, so this takes O(1).
+        """
+        food = self.map.food
+        if food is None:
+            return direc
+        size = self.map.capacity
+        tail_idx, food_idx = self.cycle_idx(self.snake.tail()), self.cycle_idx(food)
+        head_rel = self._relative_dist(tail_idx, self.cycle_idx(head), size)
+        food_rel = self._relative_dist(tail_idx, food_idx, size)
+        best_rel = head_rel
+        for adj_direc in (Direc.LEFT, Direc.UP, Direc.RIGHT, Direc.DOWN):
+            adj = head.adj(adj_direc)
+            adj_idx = self.cycle_idx(adj)
+            if adj_idx is None:
+                continue  # Wall
+            # Same exception as 'path' shortcuts
+            if adj == food and abs(food_idx - tail_idx) == 1:
+                continue
+            adj_rel = self._relative_dist(tail_idx, adj_idx, size)
+            if best_rel < adj_rel <= food_rel:
+                best_rel, direc = adj_rel, adj_direc
+        return direc
+
     def _build_cycle(self):
         """Build a hamiltonian cycle on the map."""
-        path = self._path_solver.longest_path_to_tail()
-        cur, cnt = self.snake.head(), 0
-        for direc in path:
-            self._table[cur.x][cur.y].idx = cnt
-            self._table[cur.x][cur.y].direc = direc
+        num_cols = self._num_cols
+        cycle = cached_cycle(self.map.num_rows, num_cols, self.snake.bodies)
+        if cycle is None:
+            cycle = [p.x * num_cols + p.y for p in self._search_cycle()]
+        if len(cycle) != self.map.capacity:
+            raise ValueError("Cannot build a hamiltonian cycle through the snake.")
+        steps = self._steps_to_direc
+        self._cells = list(cycle)
+        for cnt, cur in enumerate(cycle):
+            self._idx[cur] = cnt
+            self._direc[cur] = steps[cycle[(cnt + 1) % len(cycle)] - cur]
+
+    def _repair_cycle(self):
+        """Move loops of the cycle from before the food to after it.
+
+        Where the cycle runs through a 2x2 square in opposite directions
+        (a -> b and d -> c), the loop b ... d can be cut off by linking a -> c.
+        It is spliced in again at another such square made of one of its
+        edges e -> g and an edge p -> q at or after the food, as p -> g ... e
+        -> q. The food then comes as many steps sooner as the loop has cells.
+
+        Only cells after the head move along the cycle, so the body keeps
+        its order, and only the positions from the loop to p are rewritten.
+        The number of squares checked is bounded by REPAIR_BUDGET times the
+        capacity.
+        """
+        food = self.map.food
+        n = len(self._cells)
+        num_cols = self._num_cols
+        cells, idx = self._cells, self._idx
+        tail = self.snake.tail()
+        tail_pos = idx[tail.x * num_cols + tail.y]
+
+        def rel(cell):
+            pos = idx[cell]
+            return None if pos is None else (pos - tail_pos) % n
+
+        head_rel = rel(self.snake.head().x * num_cols + self.snake.head().y)
+        food_rel = rel(food.x * num_cols + food.y)
+        self._budget = HamiltonSolver.REPAIR_BUDGET * n
+        r = head_rel
+        while r < food_rel - 1 and self._budget > 0:
+            a, b = cells[(tail_pos + r) % n], cells[(tail_pos + r + 1) % n]
+            for perp in self._perps[b - a]:
+                self._budget -= 1
+                d_rel = rel(b + perp)
+                if d_rel is None or not r + 1 < d_rel < food_rel:
+                    continue
+                if rel(a + perp) != d_rel + 1:
+                    continue
+                moved = self._splice(tail_pos, r + 1, d_rel, food_rel, rel)
+                if moved:
+                    food_rel -= moved
+                    break
+            else:
+                r += 1
+
+    def _splice(self, tail_pos, lo, hi, food_rel, rel):
+        """Move the loop at relative positions lo to hi after the food.
+
+        Returns:
+            The number of cells moved, 0 if there is nowhere to put the loop.
+        """
+        n = len(self._cells)
+        cells, idx = self._cells, self._idx
+        loop = [cells[(tail_pos + r) % n] for r in range(lo, hi + 1)]
+        for k, e in enumerate(loop):
+            g = loop[(k + 1) % len(loop)]
+            for perp in self._perps[g - e]:
+                self._budget -= 1
+                p_rel = rel(g + perp)
+                if p_rel is None or p_rel < food_rel:
+                    continue
+                if rel(e + perp) != (p_rel + 1) % n:
+                    continue
+                # Rewrite lo..p: the cells after the loop, then the loop
+                # entered at g and left at e
+                seg = [cells[(tail_pos + r) % n] for r in range(hi + 1, p_rel + 1)]
+                seg += loop[k + 1:] + loop[:k + 1]
+                for i, cell in enumerate(seg):
+                    pos = (tail_pos + lo + i) % n
+                    cells[pos] = cell
+                    idx[cell] = pos
+                for r in range(lo - 1, p_rel + 1):
+                    cur = cells[(tail_pos + r) % n]
+                    nxt = cells[(tail_pos + r + 1) % n]
+                    self._direc[cur] = self._steps_to_direc[nxt - cur]
+                self.num_splices += 1
+                return len(loop)
+            if self._budget <= 0:
+                break
+        return 0
+
+    def _search_cycle(self):
+        """Walk the longest path from the head to the tail, then the snake's
+        body, which must be straight."""
+        cells, cur = [], self.snake.head()
+        for direc in self._path_solver.longest_path_to_tail():
+            cells.append(cur)
             cur = cur.adj(direc)
-            cnt += 1
-        # Process snake bodies
         cur = self.snake.tail()
         for _ in range(self.snake.len() - 1):
-            self._table[cur.x][cur.y].idx = cnt
-            self._table[cur.x][cur.y].direc = self.snake.direc
+            cells.append(cur)
             cur = cur.adj(self.snake.direc)
-            cnt += 1
+        return cells
 
     def _relative_dist(self, ori, x, size):
         if ori > x:
             x += size
         return x - ori
+
+
+def enable_disk_cache(path=DIR_CYCLES):
+    """Also keep the cycles built by cached_cycle() as files in a directory."""
+    global _cache_dir
+    _cache_dir = path
+
+
+def disable_disk_cache():
+    global _cache_dir
+    _cache_dir = None
+
+
+def clear_cache():
+    """Forget the cycles kept in memory (files are kept)."""
+    _cache.clear()
+
+
+def cycle_key(num_rows, num_cols, bodies):
+    """Return the cache key of a map size, a snake and the builder version."""
+    text = f"v{BUILDER_VERSION}|{num_rows}x{num_cols}|" + ",".join(
+        f"{p.x}.{p.y}" for p in bodies
+    )
+    return hashlib.sha1(text.encode("ascii")).hexdigest()
+
+
+def cached_cycle(num_rows, num_cols, bodies):
+    """Return the cycle of build_cycle() from the cache, building it if needed.
+
+    Cycles are looked up in memory, then in the disk cache directory if
+    enabled, where each one is a file of 32-bit little-endian flat cell
+    indices (x * num_cols + y) in cycle order. A file that does not hold a
+    hamiltonian cycle of the map is rebuilt.
+
+    Returns:
+        An array of the flat indices of the cells along the cycle starting
+        at the head, or None if build_cycle() cannot fit the snake.
+    """
+    key = cycle_key(num_rows, num_cols, bodies)
+    cycle = _cache.get(key)
+    if cycle is not None:
+        return cycle
+
+    file_path = os.path.join(_cache_dir, f"{key}.cycle") if _cache_dir else None
+    if file_path and os.path.exists(file_path):
+        cycle = _read_cycle(file_path, num_rows, num_cols, bodies)
+
+    if cycle is None:
+        cells = build_cycle(num_rows, num_cols, bodies)
+        if cells is None:
+            return None
+        cycle = array(_CELL_TYPE, (p.x * num_cols + p.y for p in cells))
+        if file_path:
+            # Write then rename, so parallel workers never read half a file
+            os.makedirs(_cache_dir, exist_ok=True)
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            data = cycle
+            if _SWAP_BYTES:
+                data = array(_CELL_TYPE, cycle)
+                data.byteswap()
+            with open(tmp_path, "wb") as f:
+                f.write(data.tobytes())
+            os.replace(tmp_path, file_path)
+
+    _cache[key] = cycle
+    return cycle
+
+
+def _read_cycle(file_path, num_rows, num_cols, bodies):
+    """Return the cycle in a cache file, or None if the file does not hold
+    a hamiltonian cycle of the map that runs back from the head along the
+    bodies (truncated, corrupt or foreign)."""
+    with open(file_path, "rb") as f:
+        data = f.read()
+    size = (num_rows - 2) * (num_cols - 2)
+    if len(data) != 4 * size:
+        return None
+    cycle = array(_CELL_TYPE)
+    cycle.frombytes(data)
+    if _SWAP_BYTES:
+        cycle.byteswap()
+
+    # Every inner cell once, each one next to the one before
+    inner = {
+        i * num_cols + j for i in range(1, num_rows - 1) for j in range(1, num_cols - 1)
+    }
+    if set(cycle) != inner:
+        return None
+    steps = (1, num_cols)
+    for prev, cur in zip(cycle, cycle[1:] + cycle[:1]):
+        if abs(cur - prev) not in steps:
+            return None
+    for k, p in enumerate(bodies):
+        if cycle[-k] != p.x * num_cols + p.y:
+            return None
+    return cycle
+
+
+def build_cycle(num_rows, num_cols, bodies):
+    """Build a hamiltonian cycle of the inside of a map through a snake.
+
+    The inside of the map (num_rows - 2 by num_cols - 2 cells, both even) is
+    covered by a comb: a zigzag over the rows or columns plus one line to
+    come back. Its mirror images, transposes and reversals are tried until
+    the snake's bodies lie on the cycle from the tail to the head. Runs in
+    O(num_rows * num_cols).
+
+    Args:
+        num_rows (int): Rows of the map, walls included.
+        num_cols (int): Columns of the map, walls included.
+        bodies (sequence of snake.base.pos.Pos): The snake, head first.
+
+    Returns:
+        The list of positions along the cycle starting at the head, or None
+        if the snake does not fit on any of the combs.
+    """
+    rows, cols = num_rows - 2, num_cols - 2
+    size = rows * cols
+    combs = (
+        _comb(rows, cols),
+        [(r, cols - 1 - c) for r, c in _comb(rows, cols)],
+        [(r, c) for c, r in _comb(cols, rows)],
+        [(rows - 1 - r, c) for c, r in _comb(cols, rows)],
+    )
+    bodies = [(p.x - 1) * cols + p.y - 1 for p in bodies]
+    for comb in combs:
+        for cycle in (comb, comb[::-1]):
+            order = [0] * size
+            for i, (r, c) in enumerate(cycle):
+                order[r * cols + c] = i
+            start = order[bodies[0]]
+            # Every body is just before the one closer to the head
+            if all(
+                order[bodies[i + 1]] == (order[bodies[i]] - 1) % size
+                for i in range(len(bodies) - 1)
+            ):
+                cycle = cycle[start:] + cycle[:start]
+                return [Pos(r + 1, c + 1) for r, c in cycle]
+    return None
+
+
+def _comb(rows, cols):
+    """Cycle over a rows x cols grid (rows even): zigzag over the rows in
+    columns 1 to cols - 1, then back up column 0."""
+    cells = [(0, 0)]
+    for r in range(rows):
+        cs = range(1, cols) if r % 2 == 0 else range(cols - 1, 0, -1)
+        cells.extend((r, c) for c in cs)
+    cells.extend((r, 0) for r in range(rows - 1, 0, -1))
+    return cells
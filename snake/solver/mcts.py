@@ -0,0 +1,414 @@
+"""Monte Carlo Tree Search over the snake's three relative moves.
+
+Playouts run on Simulator, a flat copy of the game state (a bytearray of
+blocked cells and a deque of flat cell indices for the body) that is much
+cheaper to copy and step than a Snake and its Map. The tree is open-loop:
+nodes are sequences of moves, and a food eaten during a playout respawns at
+a random free cell, as in the game.
+"""
+
+import math
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from snake.base import Direc, PointType, Pos
+from snake.solver.base import BaseSolver
+
+# Relative moves
+TURN_LEFT, FORWARD, TURN_RIGHT = 0, 1, 2
+ACTIONS = (TURN_LEFT, FORWARD, TURN_RIGHT)
+
+# Direction values (see Direc) after each relative move, by direction value
+_TURNS = (
+    None,
+    (4, 1, 2),  # LEFT
+    (1, 2, 3),  # UP
+    (2, 3, 4),  # RIGHT
+    (3, 4, 1),  # DOWN
+)
+
+
+class Simulator:
+    """Game state for playouts, following the rules of Snake.move().
+
+    Cells are flat indices (x * num_cols + y). A move into a wall or a body
+    cell, the tail included, kills the snake; a move onto the food grows it
+    and respawns the food at a random free cell.
+    """
+
+    __slots__ = (
+        "num_cols", "blocked", "body", "direc", "food", "capacity", "dead", "_steps",
+    )
+
+    def __init__(self, num_cols, blocked, body, direc, food, capacity):
+        self.num_cols = num_cols
+        self.blocked = blocked  # bytearray, 1 for walls and bodies
+        self.body = body  # deque of cells, head first
+        self.direc = direc  # Direction value
+        self.food = food  # Cell, -1 if none
+        self.capacity = capacity
+        self.dead = False
+        self._steps = (0, -1, -num_cols, 1, num_cols)  # By direction value
+
+    @classmethod
+    def from_snake(cls, snake):
+        game_map = snake.map
+        num_rows, num_cols = game_map.num_rows, game_map.num_cols
+        blocked = bytearray(num_rows * num_cols)
+        free_types = (PointType.EMPTY, PointType.FOOD)
+        for i in range(num_rows):
+            for j in range(num_cols):
+                if game_map.point(Pos(i, j)).type not in free_types:
+                    blocked[i * num_cols + j] = 1
+        body = deque(p.x * num_cols + p.y for p in snake.bodies)
+        food = game_map.food
+        food = food.x * num_cols + food.y if food is not None else -1
+        return cls(
+            num_cols, blocked, body, snake.direc.value, food, game_map.capacity
+        )
+
+    def copy(self):
+        sim = Simulator(
+            self.num_cols,
+            bytearray(self.blocked),
+            deque(self.body),
+            self.direc,
+            self.food,
+            self.capacity,
+        )
+        sim.dead = self.dead
+        return sim
+
+    def is_full(self):
+        return len(self.body) == self.capacity
+
+    def target(self, action):
+        """Return the direction value and the cell entered by an action."""
+        direc = _TURNS[self.direc][action]
+        return direc, self.body[0] + self._steps[direc]
+
+    def legal_actions(self):
+        """Return the actions that do not kill the snake at once."""
+        head, steps, blocked = self.body[0], self._steps, self.blocked
+        return [
+            a for a, d in enumerate(_TURNS[self.direc]) if not blocked[head + steps[d]]
+        ]
+
+    def step(self, action, rng):
+        """Apply an action and return True if the snake ate the food."""
+        direc, cell = self.target(action)
+        self.direc = direc
+        if self.blocked[cell]:
+            self.dead = True
+            return False
+        self.body.appendleft(cell)
+        self.blocked[cell] = 1
+        if cell == self.food:
+            self._respawn_food(rng)
+            return True
+        self.blocked[self.body.pop()] = 0
+        return False
+
+    def _respawn_food(self, rng):
+        self.food = -1
+        if self.is_full():
+            return
+        blocked = self.blocked
+        for _ in range(16):
+            cell = rng.randrange(len(blocked))
+            if not blocked[cell]:
+                self.food = cell
+                return
+        free = [c for c, b in enumerate(blocked) if not b]
+        self.food = rng.choice(free)
+
+
+class Node:
+    """Statistics of a sequence of moves from the root."""
+
+    __slots__ = ("children", "visits", "total")
+
+    def __init__(self):
+        self.children = [None, None, None]  # By action
+        self.visits = 0
+        self.total = 0.0
+
+
+class MCTSSolver(BaseSolver):
+    """UCT search over the three relative moves.
+
+    Each playout walks down the tree by UCB1, adds one node, then finishes
+    with a rollout of at most max_depth moves. A playout is scored with
+    FOOD_REWARD for each food eaten and -DEATH_PENALTY for dying, both
+    discounted by GAMMA per move, plus FULL_REWARD for filling the map.
+    The most visited move of the root is played.
+    """
+
+    FOOD_REWARD = 0.5
+    DEATH_PENALTY = 1.0
+    FULL_REWARD = 1.0
+    GAMMA = 0.98
+    ROLLOUTS = ("greedy", "random")
+
+    def __init__(
+        self,
+        snake,
+        playouts=200,
+        time_limit=None,
+        workers=0,
+        rollout="greedy",
+        max_depth=None,
+        exploration=1.0,
+        reuse=True,
+        seed=None,
+        deadline=None,
+    ):
+        """Initialize an MCTSSolver.
+
+        Args:
+            snake (snake.base.snake.Snake): The snake to direct.
+            playouts (int): Playouts per move, None for no limit.
+            time_limit (float): Seconds of search per move, None for no limit.
+                With both limits set, the first one reached ends the search.
+            workers (int): Worker processes running playouts in parallel,
+                each on its own tree from the same root (root
+                parallelization). 0 searches in this process only.
+            rollout (str): 'greedy' moves towards the food most of the time,
+                'random' picks any move that does not die at once.
+            max_depth (int): Moves per rollout, the map's capacity by default.
+            exploration (float): UCB1 exploration constant.
+            reuse (bool): Keep the subtree of the move played for the next
+                move, when the snake ends up where the tree expected.
+            seed (int): Seed of the search's random numbers.
+            deadline (float): Seconds per move, None for no limit. Like
+                time_limit, but set the same way as for the other solvers.
+        """
+        super().__init__(snake, deadline)
+        if playouts is None and time_limit is None and deadline is None:
+            raise ValueError("playouts, time_limit and deadline cannot all be None")
+        if rollout not in MCTSSolver.ROLLOUTS:
+            raise ValueError(f"Unsupported rollout: {rollout}. Use 'greedy' or 'random'.")
+        self._playouts = playouts
+        self._time_limit = time_limit
+        self._workers = workers
+        self._rollout = rollout
+        self._max_depth = max_depth or snake.map.capacity
+        self._exploration = exploration
+        self._reuse = reuse
+        self._rng = random.Random(seed)
+        self._pool = None
+
+        # Tree kept for the next move, valid if the snake's head and the food
+        # are the expected ones
+        self._root = None
+        self._root_head = None
+        self._root_food = None
+
+        self.num_playouts = 0
+        self.num_reused = 0
+
+    def counters(self):
+        counters = super().counters()
+        counters.update(playouts=self.num_playouts, reused_trees=self.num_reused)
+        return counters
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def next_direc(self):
+        self.deadline.start()
+        sim = Simulator.from_snake(self.snake)
+        if not sim.legal_actions():
+            return self.snake.direc
+
+        root = None
+        if self._workers > 0:
+            stats = self._parallel_search(sim)
+        else:
+            root = self._reused_root()
+            self.num_playouts += search(
+                root,
+                sim,
+                self._rng,
+                self._playouts,
+                self._expired(),
+                self._rollout,
+                self._max_depth,
+                self._exploration,
+            )
+            stats = [(c.visits, c.total) if c else (0, 0.0) for c in root.children]
+
+        action = max(sim.legal_actions(), key=lambda a: stats[a])
+        direc, cell = sim.target(action)
+        self._keep_subtree(root, action, cell, sim)
+        return Direc(direc)
+
+    def _time_budget(self):
+        """Return the seconds of search left for this move, None for no
+        limit. The deadline's reserve is left for choosing the move."""
+        limits = [t for t in (self._time_limit, self.deadline.remaining()) if t is not None]
+        return min(limits) if limits else None
+
+    def _expired(self):
+        """Return a callable telling whether this move's search is over."""
+        deadline = self.deadline
+        if self._time_limit is None:
+            return deadline.expired
+        end = time.perf_counter() + self._time_limit
+        return lambda: time.perf_counter() >= end or deadline.expired()
+
+    def _reused_root(self):
+        num_cols = self.map.num_cols
+        head, food = self.snake.head(), self.map.food
+        if (
+            self._reuse
+            and self._root is not None
+            and head.x * num_cols + head.y == self._root_head
+            and food == self._root_food
+        ):
+            self.num_reused += 1
+            return self._root
+        return Node()
+
+    def _keep_subtree(self, root, action, cell, sim):
+        """Keep the subtree of the move played, unless it eats the food:
+        the tree's later food positions were only guesses."""
+        self._root = None
+        if root is None or not self._reuse or cell == sim.food:
+            return
+        self._root = root.children[action]
+        self._root_head = cell
+        self._root_food = self.map.food
+
+    def _parallel_search(self, sim):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        playouts = self._playouts
+        if playouts is not None:
+            playouts = -(-playouts // self._workers)
+        args = (
+            sim,
+            playouts,
+            self._time_budget(),
+            self._rollout,
+            self._max_depth,
+            self._exploration,
+        )
+        futures = [
+            self._pool.submit(_search_worker, *args, self._rng.getrandbits(32))
+            for _ in range(self._workers)
+        ]
+        stats = [[0, 0.0] for _ in ACTIONS]
+        for future in futures:
+            num_playouts, child_stats = future.result()
+            self.num_playouts += num_playouts
+            for a, (visits, total) in enumerate(child_stats):
+                stats[a][0] += visits
+                stats[a][1] += total
+        self.deadline.expired()  # Count the move if the workers ran out of time
+        return stats
+
+
+def search(root, sim, rng, playouts, expired, rollout, max_depth, exploration):
+    """Run playouts from root, whose state is sim, and return their number.
+
+    The search stops after the given number of playouts (None for no limit)
+    or once expired() returns True (expired None for no time limit),
+    whichever comes first, after at least one playout.
+    """
+    done = 0
+    while True:
+        _playout(root, sim.copy(), rng, rollout, max_depth, exploration)
+        done += 1
+        if playouts is not None and done >= playouts:
+            return done
+        if expired is not None and expired():
+            return done
+
+
+def _search_worker(sim, playouts, time_limit, rollout, max_depth, exploration, seed):
+    """Search from a fresh root in a worker process; return the number of
+    playouts and the (visits, total) of the root's children."""
+    expired = None
+    if time_limit is not None:
+        end = time.perf_counter() + time_limit
+
+        def expired():
+            return time.perf_counter() >= end
+
+    root = Node()
+    done = search(
+        root, sim, random.Random(seed), playouts, expired, rollout, max_depth, exploration
+    )
+    return done, [(c.visits, c.total) if c else (0, 0.0) for c in root.children]
+
+
+def _playout(root, sim, rng, rollout, max_depth, exploration):
+    gamma = MCTSSolver.GAMMA
+    node, path = root, [root]
+    reward, discount = 0.0, 1.0
+
+    # Selection and expansion
+    while True:
+        legal = sim.legal_actions()
+        if not legal:
+            reward -= MCTSSolver.DEATH_PENALTY * discount
+            break
+        children = node.children
+        untried = [a for a in legal if children[a] is None]
+        if untried:
+            action = rng.choice(untried)
+            children[action] = Node()
+        else:
+            log_n = math.log(node.visits)
+            action = max(
+                legal,
+                key=lambda a: children[a].total / children[a].visits
+                + exploration * math.sqrt(log_n / children[a].visits),
+            )
+        node = children[action]
+        path.append(node)
+        if sim.step(action, rng):
+            reward += MCTSSolver.FOOD_REWARD * discount
+        discount *= gamma
+        if sim.is_full():
+            reward += MCTSSolver.FULL_REWARD * discount
+            break
+        if untried:
+            reward += _rollout(sim, rng, rollout, max_depth) * discount
+            break
+
+    for n in path:
+        n.visits += 1
+        n.total += reward
+
+
+def _rollout(sim, rng, policy, max_depth):
+    """Play at most max_depth moves and return their discounted reward."""
+    gamma = MCTSSolver.GAMMA
+    num_cols = sim.num_cols
+    reward, discount = 0.0, 1.0
+    for _ in range(max_depth):
+        legal = sim.legal_actions()
+        if not legal:
+            return reward - MCTSSolver.DEATH_PENALTY * discount
+        if policy == "greedy" and sim.food >= 0 and rng.random() < 0.8:
+            fx, fy = divmod(sim.food, num_cols)
+
+            def dist(a):
+                x, y = divmod(sim.target(a)[1], num_cols)
+                return abs(x - fx) + abs(y - fy)
+
+            action = min(legal, key=dist)
+        else:
+            action = rng.choice(legal)
+        if sim.step(action, rng):
+            reward += MCTSSolver.FOOD_REWARD * discount
+        discount *= gamma
+        if sim.is_full():
+            return reward + MCTSSolver.FULL_REWARD * discount
+    return reward
@@ -3,8 +3,15 @@ import sys
 from collections import deque
 from heapq import heappop, heappush
 
-from snake.base import Direc, PointType
+from snake.base import Direc, Path, PointType, Pos
+from snake.base.direc import STRAIGHT_FIRST
 from snake.solver.base import BaseSolver
+from snake.solver.cost import SafetyCost
+from snake.solver.dstar import DStarLite
+from snake.solver.field import DistanceField
+
+# Searches check their deadline once every _POLL_MASK + 1 expansions
+_POLL_MASK = 15
 
 
 class _TableCell:
@@ -58,10 +65,21 @@ class _DijkstraCell:
 
 
 class PathSolver(BaseSolver):
-    def __init__(self, snake, short_algr="bfs", long_algr="heuristic"):
+    def __init__(self, snake, short_algr="bfs", long_algr="heuristic", cost_model=None):
+        """Initialize a PathSolver object.
+
+        Args:
+            snake (base.snake.Snake): The snake to find paths for.
+            short_algr (str): Algorithm for shortest paths.
+            long_algr (str): Base algorithm for longest paths.
+            cost_model: Cost of moving into a cell for the "dijkstra"
+                algorithm, see snake.solver.cost (default: SafetyCost()).
+
+        """
         super().__init__(snake)
         self.short_algr = short_algr
         self.long_algr = long_algr
+        self.cost_model = cost_model if cost_model is not None else SafetyCost()
         self._table = [
             [_TableCell() for _ in range(snake.map.num_cols)]
             for _ in range(snake.map.num_rows)
@@ -74,24 +92,49 @@ class PathSolver(BaseSolver):
             [_DijkstraCell() for _ in range(snake.map.num_cols)]
             for _ in range(snake.map.num_rows)
         ]
+        # Distance field from the food, reused until the food is eaten
+        self._field = DistanceField()
+        # Incremental A* state for paths to the food, kept across calls
+        self._dstar = DStarLite()
 
     @property
     def table(self):
         return self._table
 
+    @property
+    def field(self):
+        return self._field
+
+    @property
+    def dstar(self):
+        return self._dstar
+
     def shortest_path_to_food(self):
+        if self.short_algr == "field":
+            self._field.sync(self.snake, self.map.food)
+            return self._field.path_from(self.snake.head(), self.snake.direc)
+        if self.short_algr == "astar":
+            self._dstar.sync(self.snake, self.map.food)
+            return self._dstar.path_from(self.snake.head(), self.snake.direc)
         return self.path_to(self.map.food, "shortest")
 
-    def longest_path_to_tail(self):
-        return self.path_to(self.snake.tail(), "longest")
+    def longest_path_to_tail(self, base_path=None):
+        """Find the longest path from the snake's head to its tail.
 
-    def path_to(self, des, path_type):
+        Args:
+            base_path (snake.base.path.Path): Optional shortest path to the tail
+                found beforehand, e.g. by search_from_head(). It is extended
+                instead of running the long_algr search again.
+        """
+        return self.path_to(self.snake.tail(), "longest", base_path)
+
+    def path_to(self, des, path_type, base_path=None):
         ori_type = self.map.point(des).type
         self.map.point(des).type = PointType.EMPTY
         if path_type == "shortest":
             path = self._find_shortest_path(des)
         elif path_type == "longest":
-            path = self._find_longest_path(des)
+            path = self._find_longest_path(des, base_path)
         self.map.point(des).type = ori_type  # Restore origin type
         return path
 
@@ -101,17 +144,22 @@ class PathSolver(BaseSolver):
             return self._astar_search(des)
         elif self.short_algr == "dfs":
             return self._dfs_path_to(des)
-        elif self.short_algr == "bfs":
+        elif self.short_algr in ("bfs", "field"):
+            # The distance field only serves paths to the food
             return self._bfs_shortest_path(des)
+        elif self.short_algr == "bibfs":
+            return self._bibfs_shortest_path(des)
         elif self.short_algr == "dijkstra":
             return self._dijkstra_search(des)
         else:
-            raise ValueError(f"Unsupported shortest path algorithm: {self.short_algr}. Use 'bfs', 'astar', 'dijkstra' or 'dfs'.")
+            raise ValueError(f"Unsupported shortest path algorithm: {self.short_algr}. Use 'bfs', 'bibfs', 'field', 'astar', 'dijkstra' or 'dfs'.")
 
-    def _find_longest_path(self, des):
+    def _find_longest_path(self, des, base_path=None):
         """Route longest path finding based on algorithm selection, using base algorithm + heuristic extension."""
         # Select base path finder based on long_algr
-        if self.long_algr == "astar":
+        if base_path is not None:
+            pass  # Already searched by the caller
+        elif self.long_algr == "astar":
             base_path = self._astar_search(des)
         elif self.long_algr == "dfs":
             base_path = self._dfs_path_to(des)
@@ -133,7 +181,7 @@ class PathSolver(BaseSolver):
             des (snake.base.pos.Pos): The destination position on the map.
 
         Returns:
-            A collections.deque of snake.base.direc.Direc indicating the path directions.
+            A snake.base.path.Path indicating the path directions.
         """
         return self._bfs_shortest_path(des)
 
@@ -144,19 +192,52 @@ class PathSolver(BaseSolver):
             des (snake.base.pos.Pos): The destination position on the map.
 
         Returns:
-            A collections.deque of snake.base.direc.Direc indicating the path directions.
+            A snake.base.path.Path indicating the path directions.
+        """
+        if des != self.snake.head() and not self._is_safe(des):
+            return Path()
+        return self.search_from_head((des,)).get(des, Path())
+
+    def search_from_head(self, targets):
+        """Find the shortest paths from the snake's head to several targets in one BFS.
+
+        The search stops as soon as every target is reached. Targets may be
+        occupied cells (e.g. the tail): they can be reached, but the search
+        never goes through an occupied target. Distances and parents are left
+        in self.table until the next search.
+
+        Args:
+            targets (iterable of snake.base.pos.Pos): The destinations.
+
+        Returns:
+            A dict mapping every reachable target to a snake.base.path.Path
+            indicating the path directions. If the deadline expires, only
+            the targets reached so far are in it.
         """
         self._reset_table()
+        expired = self.deadline.expired
+        expanded = 0
 
         head = self.snake.head()
+        targets = set(targets)
+        remaining = set(targets)
+        reached = []
         self._table[head.x][head.y].dist = 0
         queue = deque()
         queue.append(head)
 
         while queue:
+            expanded += 1
+            if not expanded & _POLL_MASK and expired():
+                break
             cur = queue.popleft()
-            if cur == des:
-                return self._build_path(head, des)
+            if cur in remaining:
+                remaining.discard(cur)
+                reached.append(cur)
+                if not remaining:
+                    break
+                if cur != head and not self._is_safe(cur):
+                    continue
 
             # Arrange the order of traverse to make the path as straight as possible
             if cur == head:
@@ -172,14 +253,100 @@ class PathSolver(BaseSolver):
 
             # Traverse adjacent positions
             for pos in adjs:
-                if self._is_valid(pos):
+                if self._is_valid(pos) or pos in targets:
                     adj_cell = self._table[pos.x][pos.y]
                     if adj_cell.dist == sys.maxsize:
                         adj_cell.parent = cur
                         adj_cell.dist = self._table[cur.x][cur.y].dist + 1
                         queue.append(pos)
 
-        return deque()
+        return {t: self._build_path(head, t) for t in reached}
+
+    def path_toward(self, des):
+        """Return the shortest path to the cell nearest to des (Manhattan
+        distance, then path length) among the cells reached by the last
+        search_from_head(), e.g. one cut short by the deadline.
+        """
+        head = self.snake.head()
+        best, best_key = head, (Pos.manhattan_dist(head, des), 0)
+        for i, row in enumerate(self._table):
+            dx = abs(i - des.x)
+            for j, cell in enumerate(row):
+                dist = cell.dist
+                if dist == sys.maxsize or (dx + abs(j - des.y), dist) >= best_key:
+                    continue
+                pos = Pos(i, j)
+                if pos == des or self._is_safe(pos):  # Not a target never entered
+                    best, best_key = pos, (dx + abs(j - des.y), dist)
+        return self._build_path(head, best)
+
+    def _bibfs_shortest_path(self, des):
+        """Find the shortest path with a bidirectional BFS.
+
+        Whole layers are expanded alternately from the head and from the
+        destination (the smaller frontier first) until the searches meet, so
+        on open boards far fewer cells are touched than by a one-sided BFS.
+        Path lengths are the same as _bfs_shortest_path().
+
+        Args:
+            des (snake.base.pos.Pos): The destination position on the map.
+
+        Returns:
+            A snake.base.path.Path indicating the path directions.
+        """
+        head = self.snake.head()
+        if head == des:
+            return Path()
+
+        # Cell -> (parent cell, direction from parent to cell, distance)
+        fwd = {head: (None, self.snake.direc, 0)}
+        bwd = {des: (None, Direc.NONE, 0)}
+        fwd_frontier, bwd_frontier = [head], [des]
+
+        while fwd_frontier and bwd_frontier:
+            if self.deadline.expired():
+                break
+            if len(fwd_frontier) <= len(bwd_frontier):
+                fwd_frontier, meet = self._bibfs_expand(fwd_frontier, fwd, bwd)
+            else:
+                bwd_frontier, meet = self._bibfs_expand(bwd_frontier, bwd, fwd)
+            if meet is not None:
+                return self._build_bibfs_path(meet, fwd, bwd)
+
+        return Path()
+
+    def _bibfs_expand(self, frontier, seen, other):
+        """Expand one BFS layer and return (next frontier, meeting cell)."""
+        nxt_frontier, meet, best = [], None, sys.maxsize
+        for cur in frontier:
+            _, cur_direc, cur_dist = seen[cur]
+            for direc in STRAIGHT_FIRST[cur_direc]:
+                pos = cur.adj(direc)
+                if pos in seen or not self.map.is_safe(pos):
+                    continue
+                seen[pos] = (cur, direc, cur_dist + 1)
+                if pos in other:
+                    # Keep the layer's shortest meeting; the first one on ties
+                    dist = cur_dist + 1 + other[pos][2]
+                    if dist < best:
+                        meet, best = pos, dist
+                else:
+                    nxt_frontier.append(pos)
+        return nxt_frontier, meet
+
+    def _build_bibfs_path(self, meet, fwd, bwd):
+        path = Path()
+        cur = meet
+        while fwd[cur][0] is not None:
+            parent, direc, _ = fwd[cur]
+            path.appendleft(direc)
+            cur = parent
+        cur = meet
+        while bwd[cur][0] is not None:
+            parent, direc, _ = bwd[cur]
+            path.append(Direc.opposite(direc))
+            cur = parent
+        return path
 
     def longest_path_to(self, des):
         """Find the longest path from the snake's head to the destination.
@@ -188,14 +355,20 @@ class PathSolver(BaseSolver):
             des (snake.base.pos.Pos): The destination position on the map.
 
         Returns:
-            A collections.deque of snake.base.direc.Direc indicating the path directions.
+            A snake.base.path.Path indicating the path directions.
         """
         return self._find_longest_path(des)
 
     def _extend_path(self, path, des):
-        """Apply heuristic extension to a base path to make it longer."""
+        """Apply heuristic extension to a base path to make it longer.
+
+        Every move is replaced by a detour through the two cells beside it
+        when both are free, and the detour's moves are tried again in turn.
+        The moves left to try are kept on a stack, so the longer path is
+        built in one pass instead of by insertions in the middle.
+        """
         if not path:
-            return deque()
+            return Path()
 
         self._reset_table()
         cur = head = self.snake.head()
@@ -207,9 +380,20 @@ class PathSolver(BaseSolver):
             self._table[cur.x][cur.y].visit = True
 
         # Extend the path between each pair of the positions
-        idx, cur = 0, head
-        while idx < len(path):
-            cur_direc = path[idx]
+        extended = Path()
+        pending = list(path)
+        pending.reverse()
+        cur = head
+        expired = self.deadline.expired
+        expanded = 0
+        while pending:
+            expanded += 1
+            if not expanded & _POLL_MASK and expired():
+                # Out of time: keep the rest of the path as it is
+                while pending:
+                    extended.append(pending.pop())
+                break
+            cur_direc = pending.pop()
             nxt = cur.adj(cur_direc)
 
             if cur_direc == Direc.LEFT or cur_direc == Direc.RIGHT:
@@ -217,23 +401,21 @@ class PathSolver(BaseSolver):
             elif cur_direc == Direc.UP or cur_direc == Direc.DOWN:
                 tests = [Direc.LEFT, Direc.RIGHT]
 
-            extended = False
             for test_direc in tests:
                 cur_test = cur.adj(test_direc)
                 nxt_test = nxt.adj(test_direc)
                 if self._is_valid(cur_test) and self._is_valid(nxt_test):
                     self._table[cur_test.x][cur_test.y].visit = True
                     self._table[nxt_test.x][nxt_test.y].visit = True
-                    path.insert(idx, test_direc)
-                    path.insert(idx + 2, Direc.opposite(test_direc))
-                    extended = True
+                    pending.append(Direc.opposite(test_direc))
+                    pending.append(cur_direc)
+                    pending.append(test_direc)
                     break
-
-            if not extended:
+            else:
+                extended.append(cur_direc)
                 cur = nxt
-                idx += 1
 
-        return path
+        return extended
 
     def _reset_table(self):
         for row in self._table:
@@ -246,7 +428,7 @@ class PathSolver(BaseSolver):
                 col.reset()
 
     def _build_path(self, src, des):
-        path = deque()
+        path = Path()
         tmp = des
         while tmp != src:
             parent = self._table[tmp.x][tmp.y].parent
@@ -255,12 +437,12 @@ class PathSolver(BaseSolver):
         return path
 
     def _build_astar_path(self, src, des):
-        path = deque()
+        path = Path()
         current = des
         while current != src:
             parent = self._astar_table[current.x][current.y].parent
             if parent is None:
-                return deque()
+                return Path()
             path.appendleft(parent.direc_to(current))
             current = parent
         return path
@@ -278,7 +460,12 @@ class PathSolver(BaseSolver):
         heappush(open_set, (start_cell.f, counter, head))
         start_cell.in_open = True
 
+        expired = self.deadline.expired
+        expanded = 0
         while open_set:
+            expanded += 1
+            if not expanded & _POLL_MASK and expired():
+                break
             _, _, current = heappop(open_set)
             current_cell = self._astar_table[current.x][current.y]
             current_cell.in_open = False
@@ -303,84 +490,116 @@ class PathSolver(BaseSolver):
                         counter += 1
                         heappush(open_set, (neighbor_cell.f, counter, neighbor))
                         neighbor_cell.in_open = True
-        return deque()
+        return Path()
     
     def _dijkstra_search(self, destination):
-        """Find path using Dijkstra's algorithm."""
+        """Find the cheapest path using Dial's algorithm.
+
+        Moving into a cell costs self.cost_model(map, pos), a small integer,
+        so the priority queue is a ring of max_cost + 1 FIFO buckets indexed
+        by distance and the search runs in O(V + E). Neighbors are queued
+        straight ahead first.
+        """
         self._reset_dijkstra_table()
+        cost_model = self.cost_model
+        costs = {}  # A cell is reached from up to 4 sides, score it once
+        num_buckets = cost_model.max_cost + 1
+        buckets = [deque() for _ in range(num_buckets)]
 
         head = self.snake.head()
-        start_cell = self._dijkstra_table[head.x][head.y]
-        start_cell.dist = 0
+        self._dijkstra_table[head.x][head.y].dist = 0
+        buckets[0].append((head, self.snake.direc))
+        pending, current_dist = 1, 0
+
+        while pending:
+            if self.deadline.expired():
+                break
+            bucket = buckets[current_dist % num_buckets]
+            while bucket:
+                current_pos, current_direc = bucket.popleft()
+                pending -= 1
+                current_cell = self._dijkstra_table[current_pos.x][current_pos.y]
+                if current_cell.processed or current_cell.dist != current_dist:
+                    continue  # Stale entry
+                current_cell.processed = True
+
+                if current_pos == destination:
+                    return self._build_dijkstra_path(head, destination)
+
+                for direc in STRAIGHT_FIRST[current_direc]:
+                    neighbor_pos = current_pos.adj(direc)
+                    if not self._is_valid_dijkstra(neighbor_pos):
+                        continue
+                    neighbor_cell = self._dijkstra_table[neighbor_pos.x][neighbor_pos.y]
+                    cost = costs.get(neighbor_pos)
+                    if cost is None:
+                        cost = costs[neighbor_pos] = cost_model(self.map, neighbor_pos)
+                    new_dist = current_dist + cost
+                    if new_dist < neighbor_cell.dist:
+                        neighbor_cell.dist = new_dist
+                        neighbor_cell.parent = current_pos
+                        buckets[new_dist % num_buckets].append((neighbor_pos, direc))
+                        pending += 1
+            current_dist += 1
+        return Path()
 
-        priority_queue = []
-        heappush(priority_queue, (start_cell.dist, head))
-
-        while priority_queue:
-            current_dist, current_pos = heappop(priority_queue)
-            current_cell = self._dijkstra_table[current_pos.x][current_pos.y]
-
-            if current_cell.processed:
-                continue
-            current_cell.processed = True
-
-            if current_pos == destination:
-                return self._build_dijkstra_path(head, destination)
-            
-            if current_dist > current_cell.dist:
-                continue
-
-            for neighbor_pos in current_pos.all_adj():
-                if not self._is_valid_dijkstra(neighbor_pos):
-                    continue
-
-                new_dist = current_dist + 1
-                neighbor_cell = self._dijkstra_table[neighbor_pos.x][neighbor_pos.y]
-
-                if new_dist < neighbor_cell.dist:
-                    neighbor_cell.dist = new_dist
-                    neighbor_cell.parent = current_pos
-                    heappush(priority_queue, (new_dist, neighbor_pos))
-        return deque()
-    
-    
     def _reset_dijkstra_table(self):
         for row in self._dijkstra_table:
             for cell in row:
                 cell.reset()
 
     def _build_dijkstra_path(self, src, des):
-        path = deque()
+        path = Path()
         current = des
         while current != src:
             parent = self._dijkstra_table[current.x][current.y].parent
             if parent is None:
-                return deque()
+                return Path()
             path.appendleft(parent.direc_to(current))
             current = parent
         return path
 
     def _dfs_path_to(self, destination):
-        """Find path using DFS algorithm."""
-        visited = set()
-        path = deque()
-
-        def dfs(current):
-            if current == destination:
-                return True
-            visited.add(current)
-
-            for next_pos in current.all_adj():
-                if self.map.is_safe(next_pos) and next_pos not in visited:
-                    if dfs(next_pos):
-                        path.appendleft(current.direc_to(next_pos))
-                        return True
-            return False
+        """Find path using DFS algorithm.
 
+        The search uses an explicit stack and a flat visited bitmap, so its
+        depth is not bounded by the recursion limit. Neighbors are tried
+        straight ahead first, as in the BFS.
+        """
         head = self.snake.head()
-        if dfs(head):
-            return path
-        return deque()
+        if head == destination:
+            return Path()
+
+        num_cols = self.map.num_cols
+        visited = bytearray(self.map.num_rows * num_cols)
+        visited[head.x * num_cols + head.y] = 1
+
+        path = Path()
+        stack = [(head, iter(STRAIGHT_FIRST[self.snake.direc]))]
+        expired = self.deadline.expired
+        expanded = 0
+        while stack:
+            expanded += 1
+            if not expanded & _POLL_MASK and expired():
+                break
+            cur, direcs = stack[-1]
+            for direc in direcs:
+                nxt = cur.adj(direc)
+                idx = nxt.x * num_cols + nxt.y
+                if visited[idx] or not self.map.is_safe(nxt):
+                    continue
+                path.append(direc)
+                if nxt == destination:
+                    return path
+                visited[idx] = 1
+                stack.append((nxt, iter(STRAIGHT_FIRST[direc])))
+                break
+            else:
+                # All the neighbors are explored, backtrack
+                stack.pop()
+                if path:
+                    path.pop()
+        return Path()
 
     def _heuristic(self, pos, goal):
         """Manhattan distance heuristic for A*."""
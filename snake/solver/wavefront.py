@@ -0,0 +1,79 @@
+"""Whole-map BFS distances computed with NumPy wavefronts.
+
+The frontier is grown one ring per iteration by shifting a boolean array
+one cell in each of the four directions, so the cost of an iteration is a
+few array operations over the whole map instead of Python work per cell.
+Any number of leading batch axes is accepted: distance fields for many
+boards, or for many sources on one board, are computed in one call.
+"""
+
+import numpy as np
+
+from snake.base import PointType, Pos
+
+UNREACHABLE = -1
+
+
+def free_mask(game_map):
+    """Return a (num_rows, num_cols) bool array, True on empty and food cells."""
+    safe = (PointType.EMPTY, PointType.FOOD)
+    return np.array(
+        [
+            [game_map.point(Pos(i, j)).type in safe for j in range(game_map.num_cols)]
+            for i in range(game_map.num_rows)
+        ],
+        dtype=bool,
+    )
+
+
+def point_sources(shape, positions):
+    """Return a (len(positions), *shape) bool array with one source per layer.
+
+    Use it with a free mask of the given shape to get the distance fields of
+    several cells of the same board in one distance_transform() call.
+    """
+    sources = np.zeros((len(positions),) + tuple(shape), dtype=bool)
+    for k, pos in enumerate(positions):
+        sources[k, pos.x, pos.y] = True
+    return sources
+
+
+def distance_transform(free, sources, max_dist=None):
+    """Return the BFS distances from the sources to every cell.
+
+    Moves go to the four neighbors and only enter free cells. Sources are at
+    distance 0 whether they are free or not (e.g. the snake's head).
+
+    Args:
+        free (array-like of bool): Free-space mask, shape (..., rows, cols).
+        sources (array-like of bool): Source cells, broadcastable with free.
+        max_dist (int): Stop growing the frontier after this many rings.
+
+    Returns:
+        An int32 array of the broadcast shape, UNREACHABLE (-1) for the cells
+        that cannot be reached (or are farther than max_dist).
+
+    """
+    free, sources = np.broadcast_arrays(
+        np.asarray(free, dtype=bool), np.asarray(sources, dtype=bool)
+    )
+    dist = np.full(free.shape, UNREACHABLE, dtype=np.int32)
+    dist[sources] = 0
+    unvisited = free & ~sources
+    frontier = sources.copy()
+    grown = np.empty_like(frontier)
+
+    d = 0
+    while max_dist is None or d < max_dist:
+        grown[...] = False
+        grown[..., 1:, :] |= frontier[..., :-1, :]
+        grown[..., :-1, :] |= frontier[..., 1:, :]
+        grown[..., :, 1:] |= frontier[..., :, :-1]
+        grown[..., :, :-1] |= frontier[..., :, 1:]
+        np.logical_and(grown, unvisited, out=frontier)
+        if not frontier.any():
+            break
+        d += 1
+        dist[frontier] = d
+        unvisited &= ~frontier
+    return dist
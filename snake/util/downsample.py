@@ -0,0 +1,128 @@
+import numpy as np
+
+
+def minmax(x, y, num_buckets):
+    """Downsample a series by keeping the min and max point of each bucket.
+
+    Spikes survive the reduction, so the plotted envelope looks the same as
+    the full series at screen resolution. Works on memory-mapped arrays
+    without loading them: only one bucket-sized view is touched at a time.
+
+    Args:
+        x (array-like): X coordinates, same length as y.
+        y (array-like): Y values.
+        num_buckets (int): Number of buckets. Output has at most
+            2 * num_buckets points.
+
+    Returns:
+        A tuple (x_out, y_out) of numpy arrays, ordered by x.
+
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = y.shape[0]
+    if num_buckets <= 0 or n <= 2 * num_buckets:
+        return np.array(x, dtype=np.float64), np.array(y, dtype=np.float64)
+
+    idx = []
+    bounds = np.linspace(0, n, num_buckets + 1).astype(np.int64)
+    for beg, end in zip(bounds[:-1], bounds[1:]):
+        if beg == end:
+            continue
+        chunk = y[beg:end]
+        lo, hi = beg + int(np.argmin(chunk)), beg + int(np.argmax(chunk))
+        idx.extend(sorted({lo, hi}))
+    idx = np.asarray(idx, dtype=np.int64)
+    return np.asarray(x[idx], dtype=np.float64), np.asarray(y[idx], dtype=np.float64)
+
+
+def envelope(y_min, y_max, num_buckets):
+    """Reduce a min/max band to one (min, max) pair per bucket.
+
+    Args:
+        y_min (array-like): Lower edge of the band.
+        y_max (array-like): Upper edge of the band, same length as y_min.
+        num_buckets (int): Number of buckets.
+
+    Returns:
+        A tuple (idx, lo, hi) where idx is the first index of every bucket and
+        lo/hi are the bucket-wise minimum of y_min and maximum of y_max.
+
+    """
+    y_min, y_max = np.asarray(y_min), np.asarray(y_max)
+    n = y_min.shape[0]
+    if num_buckets <= 0 or n <= num_buckets:
+        idx = np.arange(n)
+        return idx, np.array(y_min, dtype=np.float64), np.array(y_max, dtype=np.float64)
+
+    bounds = np.linspace(0, n, num_buckets + 1).astype(np.int64)
+    idx, lo, hi = [], [], []
+    for beg, end in zip(bounds[:-1], bounds[1:]):
+        if beg == end:
+            continue
+        idx.append(beg)
+        lo.append(np.min(y_min[beg:end]))
+        hi.append(np.max(y_max[beg:end]))
+    return (
+        np.asarray(idx, dtype=np.int64),
+        np.asarray(lo, dtype=np.float64),
+        np.asarray(hi, dtype=np.float64),
+    )
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, for every bucket in between, the point
+    forming the largest triangle with the previously selected point and the
+    average of the next bucket. Preserves the visual shape of the series.
+
+    Args:
+        x (array-like): X coordinates, same length as y. None for the
+            indices of y, which are then never built as a whole array, so a
+            memory-mapped y is read one bucket at a time.
+        y (array-like): Y values.
+        threshold (int): Number of points in the output (>= 3).
+
+    Returns:
+        A tuple (x_out, y_out) of numpy arrays, ordered by x.
+
+    """
+    y = np.asarray(y)
+    n = y.shape[0]
+    if x is None:
+        x = _Indices()
+    else:
+        x = np.asarray(x)
+    if threshold < 3 or n <= threshold:
+        x_out = np.arange(n, dtype=np.float64) if isinstance(x, _Indices) else x
+        return np.array(x_out, dtype=np.float64), np.array(y, dtype=np.float64)
+
+    bounds = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        beg, end = bounds[i], bounds[i + 1]
+        nxt_beg, nxt_end = bounds[i + 1], bounds[i + 2] if i + 2 < len(bounds) else n
+        if nxt_end <= nxt_beg:
+            nxt_end = nxt_beg + 1
+        avg_x = np.mean(x[nxt_beg:nxt_end], dtype=np.float64)
+        avg_y = np.mean(y[nxt_beg:nxt_end], dtype=np.float64)
+        bx = np.asarray(x[beg:end], dtype=np.float64)
+        by = np.asarray(y[beg:end], dtype=np.float64)
+        ax, ay = float(x[a]), float(y[a])
+        area = np.abs((ax - avg_x) * (by - ay) - (ax - bx) * (avg_y - ay))
+        a = beg + int(np.argmax(area))
+        idx[i + 1] = a
+    return np.asarray(x[idx], dtype=np.float64), np.asarray(y[idx], dtype=np.float64)
+
+
+class _Indices:
+    """Stand-in for np.arange(n) that builds only the parts indexed."""
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return np.arange(key.start, key.stop, dtype=np.float64)
+        if isinstance(key, np.ndarray):
+            return key.astype(np.float64)
+        return float(key)
@@ -0,0 +1,137 @@
+import cProfile
+import os
+import pstats
+
+DIR_PROFILE = os.path.join("logs", "profile")
+
+
+class EpisodeProfiler:
+    """cProfile wrapper for the episode loop of benchmarks.
+
+    Only the code run inside the `with` block is profiled, so imports, GUI
+    setup and solver construction do not show up in the results.
+
+    Usage:
+        profiler = EpisodeProfiler()
+        with profiler:
+            ...  # play episodes
+        profiler.save("logs/profile", "greedy-bfs-bfs")
+        print("\\n".join(profiler.format_top(15)))
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._stats = None
+
+    def __enter__(self):
+        self._stats = None
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profile.disable()
+        return False
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._profile.create_stats()
+            self._stats = pstats.Stats(self._profile)
+        return self._stats
+
+    def save(self, out_dir, label):
+        """Write <label>.pstats and <label>.collapsed to out_dir.
+
+        The .collapsed file uses the "frame;frame;frame value" format read
+        by flamegraph.pl, speedscope and inferno, with values in microseconds.
+
+        Returns:
+            A tuple of the two file paths.
+
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        path_stats = os.path.join(out_dir, f"{label}.pstats")
+        path_collapsed = os.path.join(out_dir, f"{label}.collapsed")
+        self.stats.dump_stats(path_stats)
+        with open(path_collapsed, "w", encoding="utf-8") as f:
+            for stack, value in collapse(self.stats.stats):
+                f.write(f"{';'.join(stack)} {value}\n")
+        return path_stats, path_collapsed
+
+    def top(self, n):
+        """Return the n functions with the highest self time.
+
+        Returns:
+            A list of (function label, ncalls, tottime, cumtime) tuples,
+            times in seconds.
+
+        """
+        rows = []
+        for func, (_, nc, tt, ct, _) in self.stats.stats.items():
+            rows.append((_label(func), nc, tt, ct))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows[:n]
+
+    def format_top(self, n):
+        lines = [f"{'tottime s':>10}{'cumtime s':>11}{'ncalls':>10}  function"]
+        for name, nc, tt, ct in self.top(n):
+            lines.append(f"{tt:>10.3f}{ct:>11.3f}{nc:>10}  {name}")
+        return lines
+
+
+def collapse(raw_stats):
+    """Turn cProfile caller/callee data into collapsed stacks.
+
+    cProfile only records caller -> callee edges, not whole stacks. Every
+    stack is rebuilt by walking the call graph from the roots, splitting a
+    function's self time among its call sites in proportion to the time each
+    call site spent in it (the same approximation used by gprof2dot and
+    flameprof). Recursive edges are cut to keep the stacks finite.
+
+    Args:
+        raw_stats (dict): pstats.Stats.stats.
+
+    Returns:
+        A list of (tuple of frame labels, microseconds) pairs.
+
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in raw_stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [
+        func
+        for func, (_, _, _, _, callers) in raw_stats.items()
+        if not any(c in raw_stats for c in callers)
+    ]
+
+    result = []
+
+    def walk(func, stack, on_stack, share):
+        _, _, tt, ct, _ = raw_stats[func]
+        if max(tt, ct) * share < 1e-6:
+            return  # Below the 1us resolution of the output
+        stack = stack + (_label(func),)
+        self_us = int(round(tt * share * 1e6))
+        if self_us > 0:
+            result.append((stack, self_us))
+        for callee, edge_ct in callees.get(func, []):
+            if callee in on_stack or callee not in raw_stats:
+                continue
+            callee_ct = raw_stats[callee][3]
+            if callee_ct <= 0:
+                continue
+            # Fraction of the callee's total time spent under this call site
+            callee_share = share * min(1.0, edge_ct / callee_ct)
+            walk(callee, stack, on_stack | {callee}, callee_share)
+
+    for root in roots:
+        walk(root, (), frozenset((root,)), 1.0)
+    return result
+
+
+def _label(func):
+    file_name, line, name = func
+    if file_name == "~":
+        return name  # Built-in functions
+    return f"{name} ({os.path.basename(file_name)}:{line})"
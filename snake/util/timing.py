@@ -0,0 +1,127 @@
+import json
+import math
+from time import perf_counter_ns
+
+
+class PhaseTimer:
+    """Collect per-call latencies of named phases (e.g. next_direc, move).
+
+    Usage:
+        timer = PhaseTimer()
+        t = timer.start()
+        ...  # work
+        timer.stop("next_direc", t)
+
+    Samples are kept as raw nanosecond integers, so recording costs one clock
+    read and one list append per call.
+    """
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self._samples = {}
+
+    @staticmethod
+    def start():
+        return perf_counter_ns()
+
+    def stop(self, phase, start_ns):
+        elapsed = perf_counter_ns() - start_ns
+        samples = self._samples.get(phase)
+        if samples is None:
+            samples = self._samples[phase] = []
+        samples.append(elapsed)
+        return elapsed
+
+    def phases(self):
+        return list(self._samples)
+
+    def samples(self, phase):
+        return self._samples.get(phase, [])
+
+    def merge(self, other):
+        for phase, samples in other._samples.items():
+            self._samples.setdefault(phase, []).extend(samples)
+
+    def reset(self):
+        self._samples.clear()
+
+    def count_over(self, phase, seconds):
+        """Return the number of calls of a phase that took longer than
+        the given time."""
+        limit_ns = seconds * 1e9
+        return sum(1 for ns in self._samples.get(phase, []) if ns > limit_ns)
+
+    def summary(self):
+        """Return {phase: stats} with times in microseconds.
+
+        Stats contain count, total (ms), p50, p90, p99 and max (us).
+        """
+        result = {}
+        for phase, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats = {"count": len(ordered), "total_ms": sum(ordered) / 1e6}
+            for p in PhaseTimer.PERCENTILES:
+                stats[f"p{p}"] = _percentile(ordered, p) / 1e3
+            stats["max"] = ordered[-1] / 1e3
+            result[phase] = stats
+        return result
+
+    def histogram(self, phase):
+        """Return a log2 histogram of a phase as {upper bound (us): count}."""
+        hist = {}
+        for ns in self._samples.get(phase, []):
+            bound = 2 ** max(0, math.ceil(math.log2(max(ns, 1) / 1e3)))
+            hist[bound] = hist.get(bound, 0) + 1
+        return dict(sorted(hist.items()))
+
+    def dump(self, path, label=None):
+        """Append the summary and histograms of all the phases to a JSON file.
+
+        The file holds one object per label, so several solvers or algorithm
+        combinations can share the same dump.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data[label or "default"] = {
+            "summary": self.summary(),
+            "histogram_us": {
+                phase: {str(k): v for k, v in self.histogram(phase).items()}
+                for phase in self._samples
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def _percentile(ordered, p):
+    """Nearest-rank percentile of a sorted list."""
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def format_summary(summary):
+    """Format the output of PhaseTimer.summary() as table lines."""
+    lines = [
+        f"{'Phase':<12}{'calls':>9}{'total ms':>11}"
+        f"{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>11}"
+    ]
+    for phase, s in summary.items():
+        lines.append(
+            f"{phase:<12}{s['count']:>9}{s['total_ms']:>11.1f}"
+            f"{s['p50']:>10.1f}{s['p90']:>10.1f}{s['p99']:>10.1f}{s['max']:>11.1f}"
+        )
+    return lines
+
+
+def format_counters(counters):
+    """Format the output of BaseSolver.counters() as table lines."""
+    lines = [f"{'Counter':<16}{'count':>12}"]
+    for name, count in counters.items():
+        lines.append(f"{name:<16}{count:>12}")
+    return lines
@@ -0,0 +1,98 @@
+import random
+
+from snake.base import Bitboard, Direc, Map, PointType, Pos, Snake
+from snake.base.bitboard import count
+
+
+def _snake(m):
+    return Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(2, 4), Pos(2, 3), Pos(2, 2), Pos(2, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+
+
+def test_from_map():
+    m = Map(6, 7)
+    m.create_food(Pos(4, 4))
+    s = _snake(m)
+    b = Bitboard.from_map(m)
+    for i in range(m.num_rows):
+        for j in range(m.num_cols):
+            assert b.is_free(Pos(i, j)) == m.is_safe(Pos(i, j))
+    assert count(b.free) == 4 * 5 - s.len()
+
+    b.set_free(Pos(4, 4), False)
+    assert not b.is_free(Pos(4, 4))
+    b.set_free(Pos(4, 4))
+    assert b.is_free(Pos(4, 4))
+
+
+def test_move():
+    random.seed(0)
+    m = Map(8, 8)
+    m.create_food(Pos(6, 6))
+    s = _snake(m)
+    b = Bitboard.from_map(m)
+    for direc in [Direc.RIGHT, Direc.DOWN, Direc.DOWN, Direc.LEFT]:
+        tail = s.tail()
+        s.move(direc)
+        b.move(s.head(), tail)
+        assert b.free == Bitboard.from_map(m).free
+
+
+def test_component_size():
+    m = Map(7, 7)
+    s = _snake(m)
+    # Close the top-left corner (1, 1) with the body and a wall
+    m.point(Pos(1, 2)).type = PointType.WALL
+    b = Bitboard.from_map(m)
+    assert b.component_size(Pos(1, 1)) == 1
+    assert b.component_size(s.head()) == 25 - s.len() - 2
+    assert b.component_size(Pos(1, 3)) == b.component_size(s.head())
+    assert b.component_size(Pos(0, 0)) == 0
+    assert b.flood_fill(b.bit(Pos(1, 1))) == b.bit(Pos(1, 1))
+
+
+def test_can_reach():
+    m = Map(7, 7)
+    s = _snake(m)
+    b = Bitboard.from_map(m)
+    assert b.head_can_reach_tail(s)
+    assert b.can_reach(Pos(5, 5), Pos(1, 1))
+
+    # Wall off the tail: only the head's side is left
+    m.point(Pos(1, 1)).type = PointType.WALL
+    m.point(Pos(3, 1)).type = PointType.WALL
+    b = Bitboard.from_map(m)
+    assert not b.head_can_reach_tail(s)
+    assert b.can_reach(s.head(), Pos(5, 1))
+    m.point(Pos(1, 2)).type = PointType.WALL
+    b = Bitboard.from_map(m)
+    assert not b.can_reach(s.head(), Pos(1, 1))
+
+
+def test_enable_bitboard():
+    random.seed(0)
+    m = Map(8, 8)
+    b = m.enable_bitboard()
+    assert m.enable_bitboard() is b
+    s = Snake(m)
+    m.create_rand_food()
+    for _ in range(200):
+        if s.dead or m.is_full():
+            s.reset()
+            m.create_rand_food()
+        safe = [d for d in Direc if d != Direc.NONE and m.is_safe(s.head().adj(d))]
+        s.move(random.choice(safe) if safe else s.direc)
+        if not m.has_food():
+            m.create_rand_food()
+        assert b.free == Bitboard.from_map(m).free
+
+    # Copies carry their own view
+    s_copy, m_copy = s.copy()
+    assert m_copy.bitboard is not b and m_copy.bitboard.free == b.free
+    s_copy.reset()
+    assert m_copy.bitboard.free == Bitboard.from_map(m_copy).free
+    assert b.free == Bitboard.from_map(m).free != m_copy.bitboard.free
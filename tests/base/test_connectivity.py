@@ -0,0 +1,63 @@
+import random
+
+from snake.base import Bitboard, Direc, Map, PointType, Pos, Snake
+
+
+def _check(m, s):
+    conn, b = m.connectivity, Bitboard.from_map(m)
+    cells = [Pos(i, j) for i in range(m.num_rows) for j in range(m.num_cols)]
+    for pos in cells:
+        assert conn.component_size(pos) == b.component_size(pos)
+    assert conn.can_reach(s.head(), s.tail()) == b.head_can_reach_tail(s)
+    free = [pos for pos in cells if b.is_free(pos)]
+    for a, c in zip(free, reversed(free)):
+        assert conn.same_component(a, c) == b.can_reach(a, c)
+
+
+def test_random_walk():
+    random.seed(0)
+    m = Map(9, 9)
+    conn = m.enable_connectivity()
+    assert m.enable_connectivity() is conn
+    s = Snake(m)
+    m.create_rand_food()
+    for _ in range(300):
+        if s.dead or m.is_full():
+            s.reset()
+            m.create_rand_food()
+        safe = [d for d in Direc if d != Direc.NONE and m.is_safe(s.head().adj(d))]
+        s.move(random.choice(safe) if safe else s.direc)
+        if not m.has_food():
+            m.create_rand_food()
+        _check(m, s)
+
+        # Copies follow their own snake
+        s_copy, m_copy = s.copy()
+        assert m_copy.connectivity is not conn
+        for d in (Direc.LEFT, Direc.UP):
+            if m_copy.is_safe(s_copy.head().adj(d)):
+                s_copy.move(d)
+        _check(m_copy, s_copy)
+    assert conn.num_rebuilds < 300
+
+
+def test_split():
+    m = Map(7, 7)
+    conn = m.enable_connectivity()
+    # A vertical snake cuts the board in two
+    s = Snake(
+        m,
+        Direc.DOWN,
+        [Pos(4, 3), Pos(3, 3), Pos(2, 3), Pos(1, 3)],
+        [PointType.HEAD_D, PointType.BODY_VER, PointType.BODY_VER, PointType.BODY_VER],
+    )
+    assert conn.component_size(Pos(1, 1)) == 25 - 4
+    assert conn.same_component(Pos(1, 1), Pos(1, 5))
+    m.create_food(Pos(5, 3))
+    s.move(Direc.DOWN)  # Eats, so the body now spans the whole column
+    assert not conn.same_component(Pos(5, 1), Pos(5, 5))
+    assert not conn.same_component(Pos(1, 1), Pos(1, 5))
+    assert conn.component_size(Pos(5, 1)) == 10
+    assert conn.component_size(s.head()) == 20
+    assert conn.can_reach(s.head(), s.tail())
+    assert not conn.same_component(Pos(1, 3), Pos(1, 2))
@@ -30,6 +30,44 @@ def test_copy():
             assert m.point(Pos(i, j)).type == m_copy.point(Pos(i, j)).type
 
 
+def test_copy_into():
+    m = Map(6, 6)
+    m.enable_connectivity()
+    m.create_food(Pos(1, 1))
+    m.point(Pos(2, 1)).type = PointType.WALL
+    m.point(Pos(2, 2)).type = PointType.WALL
+    m.connectivity.invalidate()
+    scratch = Map(6, 6)
+    scratch.point(Pos(4, 4)).type = PointType.WALL
+    points = [scratch.point(Pos(i, j)) for i in range(6) for j in range(6)]
+    assert m.copy_into(scratch) is scratch
+    for i in range(m.num_rows):
+        for j in range(m.num_cols):
+            assert scratch.point(Pos(i, j)).type == m.point(Pos(i, j)).type
+            assert scratch.point(Pos(i, j)) is points[i * 6 + j]
+    assert scratch.food == Pos(1, 1)
+    assert scratch.connectivity.can_reach(Pos(1, 1), Pos(4, 4))
+
+    # The second copy reuses the scratch oracle
+    conn = scratch.connectivity
+    m.point(Pos(2, 3)).type = PointType.WALL
+    m.point(Pos(2, 4)).type = PointType.WALL
+    m.connectivity.invalidate()
+    m.copy_into(scratch)
+    assert scratch.connectivity is conn
+    assert not scratch.connectivity.can_reach(Pos(1, 1), Pos(4, 4))
+
+    # Without the oracle: the source's is not brought up to date either
+    m.connectivity.invalidate()
+    rebuilds = m.connectivity.num_rebuilds
+    m.copy_into(scratch, connectivity=False)
+    assert scratch.connectivity is None
+    assert m.connectivity.num_rebuilds == rebuilds
+
+    with pytest.raises(ValueError):
+        m.copy_into(Map(6, 7))
+
+
 def test_predicate():
     m = Map(5, 5)
     assert not m.is_full()
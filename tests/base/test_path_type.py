@@ -0,0 +1,64 @@
+from collections import deque
+
+import pytest
+
+from snake.base import Direc, Path, Pos
+
+
+def test_init():
+    p = Path()
+    assert len(p) == 0
+    assert not p
+    p = Path([Direc.LEFT, Direc.UP])
+    assert len(p) == 2
+    assert p
+    assert list(p) == [Direc.LEFT, Direc.UP]
+
+
+def test_both_ends():
+    p = Path()
+    p.append(Direc.RIGHT)
+    p.appendleft(Direc.UP)
+    p.appendleft(Direc.LEFT)
+    p.extend([Direc.DOWN, Direc.DOWN])
+    expect = [Direc.LEFT, Direc.UP, Direc.RIGHT, Direc.DOWN, Direc.DOWN]
+    assert p == expect
+    assert p == deque(expect)
+    assert p != expect[1:]
+    for i, direc in enumerate(expect):
+        assert p[i] == direc
+        assert p[i - len(expect)] == direc
+    with pytest.raises(IndexError):
+        p[len(expect)]
+
+    assert p.pop() == Direc.DOWN
+    assert p.popleft() == Direc.LEFT
+    assert p.popleft() == Direc.UP
+    assert p.popleft() == Direc.RIGHT
+    assert p.pop() == Direc.DOWN
+    assert not p
+    with pytest.raises(IndexError):
+        p.pop()
+
+    p.appendleft(Direc.UP)
+    assert p.pop() == Direc.UP
+    p.extend([Direc.UP, Direc.LEFT])
+    p.clear()
+    assert not p
+
+
+def test_cells():
+    p = Path([Direc.RIGHT, Direc.DOWN, Direc.LEFT, Direc.UP])
+    assert p.values() == bytes([3, 4, 1, 2])
+    assert p.cells(Pos(2, 3), 10) == [24, 34, 33, 23]
+    assert p.to_deque() == deque([Direc.RIGHT, Direc.DOWN, Direc.LEFT, Direc.UP])
+
+
+def test_alternating_pops():
+    expect = deque(Direc(1 + i % 4) for i in range(1001))
+    p = Path(expect)
+    while expect:
+        assert p.pop() == expect.pop()
+        if expect:
+            assert p.popleft() == expect.popleft()
+        assert p == expect
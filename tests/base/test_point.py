@@ -6,3 +6,11 @@ def test_init():
     assert p.type == PointType.EMPTY
     p.type = PointType.FOOD
     assert p.type == PointType.FOOD
+
+
+def test_view():
+    types = [PointType.EMPTY, PointType.WALL]
+    p = Point(types, 1)
+    assert p.type == PointType.WALL
+    p.type = PointType.FOOD
+    assert types == [PointType.EMPTY, PointType.FOOD]
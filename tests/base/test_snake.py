@@ -201,3 +201,29 @@ def test_copy():
     assert s.direc_next == Direc.LEFT and s.direc_next == s_copy.direc_next
     for i, body in enumerate(s.bodies):
         assert body == s_copy.bodies[i]
+
+
+def test_copy_into():
+    m = Map(5, 5)
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    scratch, scratch_map = s.copy()
+    bodies = scratch.bodies
+    s.move(Direc.DOWN)
+    s.move(Direc.LEFT)
+    s_copy, m_copy = s.copy_into(scratch)
+    assert s_copy is scratch and m_copy is scratch_map
+    assert scratch.bodies is bodies
+    assert list(scratch.bodies) == list(s.bodies)
+    assert scratch.steps == 2 and scratch.direc == Direc.LEFT
+    assert m_copy.point(Pos(1, 1)).type == PointType.EMPTY
+    assert m_copy.point(Pos(2, 2)).type == PointType.HEAD_L
+
+    # Moving the copy leaves the original alone
+    s_copy.move(Direc.LEFT)
+    assert s.head() == Pos(2, 2)
+    assert m.point(Pos(2, 1)).type == PointType.EMPTY
@@ -0,0 +1,73 @@
+import random
+
+from snake.base import Direc, Map, PointType, Pos, Snake
+from snake.solver import PathSolver
+from snake.solver.cost import SafetyCost, UnitCost
+
+
+def _new_snake(size):
+    m = Map(size + 2, size + 2)
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    return s, m
+
+
+def _path_cost(cost, m, head, path):
+    total, cur = 0, head
+    for direc in path:
+        cur = cur.adj(direc)
+        assert m.is_safe(cur)
+        total += cost(m, cur)
+    return total, cur
+
+
+def test_safety_cost():
+    m = Map(7, 7)
+    cost = SafetyCost(adjacent_weight=1, split_weight=3)
+    assert cost(m, Pos(3, 3)) == 1
+    assert cost(m, Pos(1, 3)) == 2  # Next to the top wall
+    assert cost(m, Pos(1, 1)) == 3  # Corner
+    # Vertical corridor through (3, 3): free above and below only
+    for y in (2, 4):
+        for x in (2, 3, 4):
+            m.point(Pos(x, y)).type = PointType.WALL
+    assert cost(m, Pos(3, 3)) == 1 + 2 + 3
+    assert cost.max_cost == 8
+
+
+def test_unit_cost_matches_bfs():
+    random.seed(3)
+    for _ in range(20):
+        s, m = _new_snake(10)
+        for _ in range(20):
+            pos = Pos(random.randrange(2, 11), random.randrange(1, 11))
+            if m.is_empty(pos):
+                m.point(pos).type = PointType.WALL
+        m.create_rand_food()
+        bfs = PathSolver(s, "bfs").shortest_path_to_food()
+        dijkstra = PathSolver(s, "dijkstra", cost_model=UnitCost())
+        path = dijkstra.shortest_path_to_food()
+        assert len(path) == len(bfs)
+
+
+def test_safety_path_is_cheapest():
+    random.seed(4)
+    cost = SafetyCost()
+    for _ in range(20):
+        s, m = _new_snake(10)
+        for _ in range(15):
+            pos = Pos(random.randrange(2, 11), random.randrange(1, 11))
+            if m.is_empty(pos):
+                m.point(pos).type = PointType.WALL
+        m.create_rand_food()
+        bfs = PathSolver(s, "bfs").shortest_path_to_food()
+        path = PathSolver(s, "dijkstra").shortest_path_to_food()
+        assert bool(path) == bool(bfs)
+        if path:
+            total, end = _path_cost(cost, m, s.head(), path)
+            assert end == m.food
+            assert total <= _path_cost(cost, m, s.head(), bfs)[0]
@@ -0,0 +1,73 @@
+import random
+
+from snake.base import Direc, Map, PointType, Pos, Snake
+from snake.solver import GreedySolver, PathSolver
+from snake.solver.dstar import DStarLite
+
+
+def _new_snake(size):
+    m = Map(size + 2, size + 2)
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    return s, m
+
+
+def _check_path(s, m, path):
+    cur = s.head()
+    for direc in path:
+        cur = cur.adj(direc)
+        assert m.is_safe(cur)
+    assert cur == m.food
+
+
+def test_matches_bfs():
+    random.seed(2)
+    for size in (6, 10):
+        s, m = _new_snake(size)
+        greedy = GreedySolver(s)
+        bfs = PathSolver(s, "bfs")
+        astar = PathSolver(s, "astar")
+        for _ in range(300):
+            if not m.has_food():
+                m.create_rand_food()
+            if s.dead or m.is_full():
+                break
+            expect = bfs.shortest_path_to_food()
+            path = astar.shortest_path_to_food()
+            assert len(path) == len(expect)
+            if path:
+                _check_path(s, m, path)
+            s.move(greedy.next_direc())
+        assert astar.dstar.num_updates > astar.dstar.num_rebuilds
+
+
+def test_skipped_steps():
+    s, m = _new_snake(10)
+    m.create_food(Pos(9, 9))
+    planner = DStarLite()
+    planner.sync(s, m.food)
+    assert len(planner.path_from(s.head(), s.direc)) == 14
+    for direc in (Direc.DOWN, Direc.DOWN):
+        s.move(direc)
+    planner.sync(s, m.food)
+    path = planner.path_from(s.head(), s.direc)
+    assert len(path) == 12
+    _check_path(s, m, path)
+    assert planner.num_rebuilds == 1 and planner.num_updates == 2
+
+
+def test_incremental_cost():
+    s, m = _new_snake(30)
+    m.create_food(Pos(28, 28))
+    planner = DStarLite()
+    planner.sync(s, m.food)
+    planner.path_from(s.head(), s.direc)
+    first = planner.num_expanded
+    s.move(Direc.DOWN)
+    planner.sync(s, m.food)
+    planner.path_from(s.head(), s.direc)
+    assert planner.num_expanded - first < first / 4
@@ -0,0 +1,86 @@
+from snake.base import Map, PointType, Pos, Snake
+from snake.solver import GreedySolver
+from snake.solver.endgame import EndgameSearch
+from snake.solver.path import PathSolver
+
+
+def _snake(m, bodies):
+    """Return a snake on m with the given bodies, head first."""
+    types = [PointType.HEAD_D] + [PointType.BODY_HOR] * (len(bodies) - 1)
+    return Snake(m, bodies[1].direc_to(bodies[0]), bodies, types)
+
+
+def _walled_off():
+    # The body cuts the food off, but leaves the way open in time
+    m = Map(5, 5)
+    s = _snake(m, [Pos(3, 1), Pos(2, 1), Pos(2, 2), Pos(2, 3), Pos(1, 3)])
+    m.create_food(Pos(1, 1))
+    return s, m
+
+
+def test_route():
+    s, m = _walled_off()
+    assert not PathSolver(s).shortest_path_to_food()
+    search = EndgameSearch()
+    path, exhausted = search.route(s)
+    assert exhausted
+    assert len(path) == 6 and search.num_nodes > 0
+
+    # The moves are legal and end on the food
+    for direc in path:
+        s.move(direc)
+        assert not s.dead
+    assert s.len() == 6 and s.head() == Pos(1, 1)
+
+
+def test_route_unsafe():
+    # The food can be reached, but only into a dead end
+    m = Map(5, 5)
+    bodies = [Pos(2, 1), Pos(2, 2), Pos(2, 3), Pos(1, 3), Pos(1, 2), Pos(1, 1)]
+    s = _snake(m, bodies)
+    m.create_food(Pos(3, 3))
+    assert PathSolver(s).shortest_path_to_food()
+    assert EndgameSearch().route(s) == (None, True)
+
+
+def test_route_gives_up():
+    s, m = _walled_off()
+    assert EndgameSearch(max_nodes=3).route(s) == (None, False)
+    assert EndgameSearch().route(s, expired=lambda: True) == (None, False)
+
+
+def test_greedy_endgame():
+    s, m = _walled_off()
+    solver = GreedySolver(s, endgame=4)  # 4 cells are free
+    while m.has_food():
+        s.move(solver.next_direc())
+        assert not s.dead
+    counters = solver.counters()
+    assert counters["endgame_searches"] == 1 and counters["endgame_routes"] == 1
+    assert s.steps == 6
+
+    # No route to this food: searched once, not at every move
+    m = Map(5, 5)
+    bodies = [Pos(2, 1), Pos(2, 2), Pos(2, 3), Pos(1, 3), Pos(1, 2), Pos(1, 1)]
+    s = _snake(m, bodies)
+    m.create_food(Pos(3, 3))
+    solver = GreedySolver(s, endgame=4)
+    for _ in range(2):
+        s.move(solver.next_direc())
+    assert solver.counters()["endgame_searches"] == 1
+    assert solver.counters()["endgame_routes"] == 0
+
+    # A search cut short by its node budget is retried
+    s, m = _walled_off()
+    solver = GreedySolver(s, endgame=4)
+    solver._endgame.max_nodes = 3
+    s.move(solver.next_direc())
+    solver._endgame.max_nodes = 5000
+    while m.has_food():
+        s.move(solver.next_direc())
+        assert not s.dead
+    assert solver.counters()["endgame_searches"] == 2
+    assert solver.counters()["endgame_routes"] == 1
+
+    # Off by default
+    assert "endgame_searches" not in GreedySolver(_walled_off()[0]).counters()
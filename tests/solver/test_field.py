@@ -0,0 +1,66 @@
+import random
+
+from snake.base import Direc, Map, PointType, Pos, Snake
+from snake.solver import GreedySolver, PathSolver
+from snake.solver.field import INF, DistanceField
+
+
+def _new_snake(size):
+    m = Map(size + 2, size + 2)
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    return s, m
+
+
+def test_incremental_matches_rebuild():
+    random.seed(1)
+    s, m = _new_snake(10)
+    greedy = GreedySolver(s)
+    field = DistanceField()
+    bfs = PathSolver(s, "bfs")
+    for _ in range(400):
+        if not m.has_food():
+            m.create_rand_food()
+        if s.dead or m.is_full():
+            break
+        field.sync(s, m.food)
+        fresh = DistanceField()
+        fresh.sync(s, m.food)
+        for i in range(m.num_rows):
+            for j in range(m.num_cols):
+                assert field.dist(Pos(i, j)) == fresh.dist(Pos(i, j))
+        path = field.path_from(s.head(), s.direc)
+        assert len(path) == len(bfs.shortest_path_to_food())
+        s.move(greedy.next_direc())
+    assert field.num_updates > field.num_rebuilds
+
+
+def test_path_solver_field():
+    s, m = _new_snake(8)
+    m.create_food(Pos(6, 6))
+    solver = PathSolver(s, "field")
+    path = solver.shortest_path_to_food()
+    assert len(path) == 8
+    assert path[0] == Direc.RIGHT
+    cur = s.head()
+    for direc in path:
+        cur = cur.adj(direc)
+    assert cur == m.food
+    assert solver.field.dist(m.food) == 0
+
+
+def test_unreachable():
+    s, m = _new_snake(8)
+    m.create_food(Pos(6, 6))
+    for pos in (Pos(5, 6), Pos(6, 5), Pos(7, 6), Pos(6, 7)):
+        m.point(pos).type = PointType.WALL
+    solver = PathSolver(s, "field")
+    assert not solver.shortest_path_to_food()
+    s.move(Direc.DOWN)
+    assert not solver.shortest_path_to_food()
+    assert solver.field.dist(Pos(1, 4)) == INF
+    assert solver.field.num_updates == 1
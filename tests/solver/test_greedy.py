@@ -0,0 +1,116 @@
+from snake.base import Direc, Map, Path, PointType, Pos, Snake
+from snake.solver import GreedySolver
+
+
+def _snake(m):
+    return Snake(
+        m, Direc.RIGHT, [Pos(1, 2), Pos(1, 1)], [PointType.HEAD_R, PointType.BODY_HOR]
+    )
+
+
+def test_plan_commit():
+    m = Map(8, 8)
+    s = _snake(m)
+    m.create_food(Pos(5, 5))
+    solver = GreedySolver(s, commit=True)
+    while m.has_food():
+        s.move(solver.next_direc())
+    # One plan to the food, followed to the end
+    assert solver.num_plans == 1
+    assert solver.num_committed == s.steps - 1
+
+    # Same moves as planning every step
+    m2 = Map(8, 8)
+    s2 = _snake(m2)
+    m2.create_food(Pos(5, 5))
+    solver2 = GreedySolver(s2)
+    while m2.has_food():
+        s2.move(solver2.next_direc())
+    assert s2.steps == s.steps and s2.head() == s.head()
+
+
+def test_plan_commit_replan():
+    m = Map(8, 8)
+    s = _snake(m)
+    m.create_food(Pos(5, 5))
+    solver = GreedySolver(s, commit=True)
+    s.move(solver.next_direc())
+    assert solver.num_plans == 1
+
+    # The food moved
+    m.rm_food()
+    m.create_food(Pos(5, 2))
+    s.move(solver.next_direc())
+    assert solver.num_plans == 2
+
+    # A cell of the plan is taken
+    direcs = list(solver._plan)
+    assert len(direcs) > 1
+    cur = s.head()
+    for direc in direcs[:-1]:
+        cur = cur.adj(direc)
+    m.point(cur).type = PointType.WALL
+    m.connectivity.invalidate()
+    s.move(solver.next_direc())
+    assert solver.num_plans == 3
+    assert solver.num_committed == 0
+
+
+def test_table():
+    m = Map(8, 8)
+    s = _snake(m)
+    m.create_food(Pos(5, 5))
+    solver = GreedySolver(s, table_size=2)
+    direc = solver.next_direc()
+    assert (solver.num_table_hits, solver.num_table_misses) == (0, 1)
+    # Same state again
+    assert solver.next_direc() == direc
+    assert (solver.num_table_hits, solver.num_table_misses) == (1, 1)
+    assert solver.num_plans == 1
+
+    # Two other states evict the least recently used one
+    for pos in (Pos(5, 2), Pos(2, 5)):
+        m.rm_food()
+        m.create_food(pos)
+        solver.next_direc()
+    m.rm_food()
+    m.create_food(Pos(5, 5))
+    solver.next_direc()
+    assert (solver.num_table_hits, solver.num_table_misses) == (1, 4)
+    assert solver.counters()["table_hits"] == 1
+
+
+def test_deadline():
+    m = Map(66, 66)
+    s = _snake(m)
+    m.create_food(Pos(60, 60))
+    solver = GreedySolver(s, "bfs", "bfs", table_size=8, deadline=0)
+    direc = solver.next_direc()
+    # Step 5: a safe neighbor, not remembered in the table
+    assert m.is_safe(s.head().adj(direc))
+    assert solver.deadline.tripped
+    assert not solver._table
+    assert solver.counters()["deadline_cuts"] == 1
+
+    solver.deadline.seconds = None
+    assert solver.next_direc() in (Direc.RIGHT, Direc.DOWN)
+    assert not solver.deadline.tripped
+    assert "deadline_cuts" not in solver.counters()
+
+
+def test_deadline_in_step_3(monkeypatch):
+    m = Map(12, 12)
+    s = _snake(m)
+    m.create_food(Pos(1, 8))
+    solver = GreedySolver(s, "bfs", "bfs", deadline=60)
+    path_solver = solver._path_solver
+
+    def longest_path_to_tail(*args):
+        # Time runs out in step 3's search, on the virtual snake
+        solver.deadline.tripped = True
+        return Path()
+
+    monkeypatch.setattr(path_solver, "longest_path_to_tail", longest_path_to_tail)
+    # Still heads for the food along step 1's path, not away from it (step 5)
+    assert solver.next_direc() == Direc.RIGHT
+    assert path_solver.snake is s
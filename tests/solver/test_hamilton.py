@@ -1,5 +1,9 @@
+import random
+import time
+
 from snake.base import Direc, Map, PointType, Pos, Snake
-from snake.solver import HamiltonSolver
+from snake.solver import HamiltonSolver, hamilton
+from snake.solver.hamilton import build_cycle
 
 
 def test_cycle():
@@ -7,15 +11,189 @@ def test_cycle():
     s = Snake(
         m, Direc.RIGHT, [Pos(1, 2), Pos(1, 1)], [PointType.HEAD_R, PointType.BODY_HOR]
     )
-    solver = HamiltonSolver(s, False)
-    table = solver.table
+    solver = HamiltonSolver(s, shortcuts=False)
     cnt = 0
     ori_head = s.head()
     while True:
         head = s.head()
-        assert cnt == table[head.x][head.y].idx
+        assert cnt == solver.cycle_idx(head)
         s.move(solver.next_direc())
         cnt += 1
         if s.head() == ori_head:
             break
     assert cnt == m.capacity
+
+
+def _check_cycle(m, bodies, cells):
+    assert len(cells) == m.capacity
+    assert len(set((p.x, p.y) for p in cells)) == m.capacity
+    for i, cur in enumerate(cells):
+        assert m.is_inside(cur)
+        assert Pos.manhattan_dist(cur, cells[(i + 1) % len(cells)]) == 1
+    # The snake lies on the cycle, head first
+    assert cells[0] == bodies[0]
+    for i, body in enumerate(bodies[1:], 1):
+        assert cells[-i] == body
+
+
+def test_build_cycle():
+    random.seed(0)
+    for num_rows, num_cols in [(6, 6), (6, 10), (12, 8)]:
+        m = Map(num_rows, num_cols)
+        for _ in range(30):
+            s = Snake(m)
+            _check_cycle(m, list(s.bodies), build_cycle(num_rows, num_cols, s.bodies))
+            m.reset()
+
+    # A bent body
+    m = Map(8, 8)
+    bodies = [Pos(2, 5), Pos(2, 6), Pos(1, 6), Pos(1, 5)]
+    _check_cycle(m, bodies, build_cycle(8, 8, bodies))
+    assert build_cycle(8, 8, [Pos(2, 2), Pos(1, 2), Pos(1, 3), Pos(1, 4)]) is None
+
+
+def test_large_map():
+    m = Map(66, 66)
+    s = Snake(
+        m, Direc.DOWN, [Pos(30, 20), Pos(29, 20)], [PointType.HEAD_D, PointType.BODY_VER]
+    )
+    start = time.perf_counter()
+    solver = HamiltonSolver(s, "bfs", "astar")
+    assert time.perf_counter() - start < 1
+    assert solver.cycle_idx(s.head()) == 0
+    assert solver.cycle_idx(s.tail()) == m.capacity - 1
+    assert solver.cycle_direc(s.tail()) == Direc.DOWN
+
+
+def test_cycle_cache(tmp_path, monkeypatch):
+    bodies = [Pos(3, 4), Pos(3, 3)]
+    hamilton.clear_cache()
+    hamilton.enable_disk_cache(str(tmp_path))
+    try:
+        cycle = hamilton.cached_cycle(10, 10, bodies)
+        assert [p.x * 10 + p.y for p in build_cycle(10, 10, bodies)] == list(cycle)
+        assert hamilton.cached_cycle(10, 10, bodies) is cycle
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        assert files[0].name == hamilton.cycle_key(10, 10, bodies) + ".cycle"
+
+        # A cold process reads the file instead of building the cycle
+        hamilton.clear_cache()
+        with monkeypatch.context() as mp:
+            mp.setattr(hamilton, "build_cycle", None)
+            assert hamilton.cached_cycle(10, 10, bodies) == cycle
+
+        # Keys depend on the map and the snake
+        assert hamilton.cycle_key(10, 10, bodies) != hamilton.cycle_key(10, 12, bodies)
+        assert hamilton.cycle_key(10, 10, bodies) != hamilton.cycle_key(
+            10, 10, bodies[::-1]
+        )
+        assert hamilton.cached_cycle(8, 8, [Pos(2, 2), Pos(1, 2), Pos(1, 3)]) is None
+    finally:
+        hamilton.disable_disk_cache()
+        hamilton.clear_cache()
+
+
+def test_cycle_cache_corrupt(tmp_path):
+    bodies = [Pos(3, 4), Pos(3, 3)]
+    hamilton.clear_cache()
+    hamilton.enable_disk_cache(str(tmp_path))
+    try:
+        cycle = hamilton.cached_cycle(10, 10, bodies)
+        file_path = tmp_path / (hamilton.cycle_key(10, 10, bodies) + ".cycle")
+        good = file_path.read_bytes()
+        assert len(good) == 4 * 64
+        swapped = good[:40] + good[44:48] + good[40:44] + good[48:]
+
+        # Truncated, not cells of the map, not a cycle, not through the snake
+        for data in (good[:3], bytes(len(good)), swapped, good[4:] + good[:4]):
+            hamilton.clear_cache()
+            file_path.write_bytes(data)
+            assert hamilton.cached_cycle(10, 10, bodies) == cycle
+            assert file_path.read_bytes() == good  # Rewritten
+
+        hamilton.clear_cache()
+        file_path.write_bytes(bytes(len(good)))
+        m = Map(10, 10)
+        s = Snake(m, Direc.RIGHT, bodies, [PointType.HEAD_R, PointType.BODY_HOR])
+        assert HamiltonSolver(s).cycle_idx(s.tail()) == m.capacity - 1
+    finally:
+        hamilton.disable_disk_cache()
+        hamilton.clear_cache()
+
+
+def test_index_shortcuts():
+    random.seed(0)
+    m = Map(10, 10)
+    s = Snake(m)
+    solver = HamiltonSolver(s, shortcuts="index")
+    m.create_rand_food()
+    steps = 0
+    while not m.is_full():
+        s.move(solver.next_direc())
+        assert not s.dead
+        if not m.has_food():
+            m.create_rand_food()
+        steps += 1
+        assert steps < 50 * m.capacity
+    # Shortcuts ate the first foods faster than following the whole cycle
+    assert steps < m.capacity * m.capacity / 2
+
+
+def _play(m, s, solver, max_steps):
+    m.create_rand_food()
+    steps = 0
+    while not m.is_full() and steps < max_steps:
+        s.move(solver.next_direc())
+        assert not s.dead
+        if not m.has_food():
+            m.create_rand_food()
+        steps += 1
+    return steps
+
+
+def test_repair():
+    def new_game():
+        m = Map(12, 12)
+        s = Snake(
+            m, Direc.RIGHT, [Pos(1, 2), Pos(1, 1)], [PointType.HEAD_R, PointType.BODY_HOR]
+        )
+        return m, s
+
+    random.seed(0)
+    m, s = new_game()
+    fixed = _play(m, s, HamiltonSolver(s, shortcuts=False), 10**6)
+    random.seed(0)
+    m, s = new_game()
+    solver = HamiltonSolver(s, shortcuts=False, repair=True)
+    repaired = _play(m, s, solver, 10**6)
+    assert m.is_full()
+    assert solver.num_splices > 0
+    assert repaired < 0.8 * fixed
+
+    # The cycle is still a hamiltonian cycle
+    cells = [p for p in (Pos(i, j) for i in range(12) for j in range(12)) if m.is_inside(p)]
+    assert sorted(solver.cycle_idx(p) for p in cells) == list(range(m.capacity))
+    for p in cells:
+        nxt = p.adj(solver.cycle_direc(p))
+        assert solver.cycle_idx(nxt) == (solver.cycle_idx(p) + 1) % m.capacity
+
+    # A new episode starts from the initial cycle again
+    s.reset()
+    solver.next_direc()
+    assert solver.cycle_idx(s.head()) == 0
+    assert solver.cycle_idx(s.tail()) == m.capacity - 1
+    assert _play(m, s, solver, 200) == 200
+
+
+def test_deadline():
+    m = Map(66, 66)
+    s = Snake(
+        m, Direc.RIGHT, [Pos(1, 2), Pos(1, 1)], [PointType.HEAD_R, PointType.BODY_HOR]
+    )
+    m.create_food(Pos(60, 60))
+    solver = HamiltonSolver(s, deadline=0)
+    index_solver = HamiltonSolver(s, shortcuts="index")
+    # The search to the food runs out of time: an index shortcut instead
+    assert solver.next_direc() == index_solver.next_direc()
+    assert solver.deadline.tripped
@@ -0,0 +1,135 @@
+import random
+import time
+
+import pytest
+
+from snake.base import Direc, Map, PointType, Pos, Snake
+from snake.solver import MCTSSolver
+from snake.solver.mcts import FORWARD, TURN_LEFT, TURN_RIGHT, Simulator
+
+
+def _snake(m):
+    return Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(2, 3), Pos(2, 2), Pos(2, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+
+
+def test_simulator():
+    m = Map(6, 6)
+    s = _snake(m)
+    m.create_food(Pos(2, 4))
+    sim = Simulator.from_snake(s)
+    rng = random.Random(0)
+    assert sim.legal_actions() == [TURN_LEFT, FORWARD, TURN_RIGHT]
+
+    # Eat the food: the snake grows and the food respawns on a free cell
+    assert sim.step(FORWARD, rng)
+    assert len(sim.body) == 4 and sim.body[0] == 2 * 6 + 4
+    assert sim.food >= 0 and not sim.blocked[sim.food]
+    assert sim.legal_actions() == [TURN_LEFT, TURN_RIGHT]
+
+    # The copy is independent of the original
+    copy = sim.copy()
+    copy.step(TURN_RIGHT, rng)
+    assert sim.body[0] == 2 * 6 + 4 and copy.body[0] == 3 * 6 + 4
+
+    # Into the wall
+    assert not sim.step(FORWARD, rng)
+    assert sim.dead
+
+
+def test_simulator_tail():
+    # Like Snake.move(), moving into the tail's cell kills the snake
+    m = Map(6, 6)
+    s = Snake(
+        m,
+        Direc.UP,
+        [Pos(2, 2), Pos(3, 2), Pos(3, 3), Pos(2, 3)],
+        [PointType.HEAD_U, PointType.BODY_UR, PointType.BODY_DL, PointType.BODY_VER],
+    )
+    sim = Simulator.from_snake(s)
+    assert TURN_RIGHT not in sim.legal_actions()
+    s.move(Direc.RIGHT)
+    assert s.dead
+
+
+def test_solver():
+    random.seed(0)
+    m = Map(8, 8)
+    s = _snake(m)
+    m.create_rand_food()
+    solver = MCTSSolver(s, playouts=100, seed=0)
+    while not s.dead and not m.is_full() and s.steps < 1000:
+        s.move(solver.next_direc())
+        if not m.has_food():
+            m.create_rand_food()
+    assert m.is_full()
+    assert solver.num_playouts == 100 * s.steps
+    # The subtree is kept between moves that do not eat the food
+    assert s.steps - s.len() < solver.num_reused < s.steps
+
+
+def test_escape():
+    # Turning left or going on enters a pocket of three cells that a snake
+    # of length 5 cannot leave; only a right turn survives
+    m = Map(7, 7)
+    m.point(Pos(1, 3)).type = PointType.WALL
+    m.point(Pos(3, 1)).type = PointType.WALL
+    s = Snake(
+        m,
+        Direc.UP,
+        [Pos(2, 2), Pos(3, 2), Pos(4, 2), Pos(5, 2), Pos(5, 3)],
+        [
+            PointType.HEAD_U,
+            PointType.BODY_VER,
+            PointType.BODY_VER,
+            PointType.BODY_UR,
+            PointType.BODY_HOR,
+        ],
+    )
+    m.create_food(Pos(1, 1))
+    solver = MCTSSolver(s, playouts=300, seed=1)
+    assert solver.next_direc() == Direc.RIGHT
+
+
+def test_parallel():
+    m = Map(8, 8)
+    s = _snake(m)
+    m.create_food(Pos(2, 5))
+    solver = MCTSSolver(s, playouts=40, workers=2, seed=0)
+    try:
+        assert solver.next_direc() == Direc.RIGHT
+        assert solver.num_playouts == 40
+    finally:
+        solver.close()
+
+
+def test_budget():
+    m = Map(8, 8)
+    s = _snake(m)
+    with pytest.raises(ValueError):
+        MCTSSolver(s, playouts=None)
+    with pytest.raises(ValueError):
+        MCTSSolver(s, rollout="none")
+    m.create_food(Pos(5, 5))
+    solver = MCTSSolver(s, playouts=None, time_limit=0.01, seed=0)
+    solver.next_direc()
+    assert solver.num_playouts > 0
+
+
+def test_deadline():
+    m = Map(12, 12)
+    s = _snake(m)
+    m.create_food(Pos(8, 8))
+    solver = MCTSSolver(s, playouts=None, deadline=0.01, seed=0)
+    over = 0
+    for _ in range(10):
+        start = time.perf_counter()
+        solver.next_direc()
+        over += time.perf_counter() - start >= 0.01
+    assert over <= 1  # The reserve covers choosing the move
+    assert solver.counters()["deadline_cuts"] == 10
+    assert solver.counters()["playouts"] == solver.num_playouts > 0
@@ -1,3 +1,5 @@
+import random
+
 from snake.base import Direc, Map, PointType, Pos, Snake
 from snake.solver import PathSolver
 
@@ -58,3 +60,137 @@ def test_longest():
         assert direc == expect_path[i]
     # Empty path
     assert not solver.longest_path_to(s.tail())
+
+
+def _walk(head, path):
+    cur = head
+    for direc in path:
+        cur = cur.adj(direc)
+    return cur
+
+
+def test_dfs_large_map():
+    m = Map(66, 66)
+    m.create_food(Pos(64, 64))
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    solver = PathSolver(s, "dfs", "dfs")
+    path = solver.shortest_path_to_food()
+    assert path and _walk(s.head(), path) == m.food
+    assert path[0] == Direc.RIGHT  # Straight ahead first
+    visited = set()
+    cur = s.head()
+    for direc in path:
+        cur = cur.adj(direc)
+        assert m.is_safe(cur) and cur not in visited
+        visited.add(cur)
+    assert len(solver.longest_path_to_tail()) > 1
+
+
+def test_bibfs():
+    random.seed(0)
+    for _ in range(30):
+        m = Map(12, 12)
+        s = Snake(
+            m,
+            Direc.RIGHT,
+            [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+            [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+        )
+        for _ in range(25):  # Random obstacles
+            pos = Pos(random.randrange(2, 11), random.randrange(1, 11))
+            if m.is_empty(pos):
+                m.point(pos).type = PointType.WALL
+        m.create_rand_food()
+        bfs = PathSolver(s, "bfs").shortest_path_to_food()
+        bibfs = PathSolver(s, "bibfs").shortest_path_to_food()
+        assert len(bfs) == len(bibfs)
+        if bibfs:
+            assert _walk(s.head(), bibfs) == m.food
+            cur = s.head()
+            for direc in bibfs:
+                cur = cur.adj(direc)
+                assert m.is_safe(cur)
+
+
+def test_bibfs_straight():
+    m = Map(12, 12)
+    m.create_food(Pos(1, 10))
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(1, 3), Pos(1, 2), Pos(1, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    path = PathSolver(s, "bibfs").shortest_path_to_food()
+    assert list(path) == [Direc.RIGHT] * 7
+
+
+def test_search_from_head():
+    m = Map(8, 8)
+    m.create_food(Pos(5, 5))
+    s = Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(2, 4), Pos(2, 3), Pos(2, 2), Pos(2, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+    solver = PathSolver(s)
+    m.point(Pos(5, 6)).type = PointType.WALL
+    m.point(Pos(6, 5)).type = PointType.WALL
+    paths = solver.search_from_head((m.food, s.tail(), Pos(1, 1), Pos(6, 6)))
+
+    # Occupied targets can be reached but walls and bodies are not crossed
+    assert set(paths) == {m.food, s.tail(), Pos(1, 1)}
+    for target, path in paths.items():
+        assert _walk(s.head(), path) == target
+        assert len(path) == solver.table[target.x][target.y].dist
+    assert len(paths[m.food]) == 4
+    assert len(paths[s.tail()]) == 5
+    assert len(paths[Pos(1, 1)]) == 4
+
+    # Same lengths as one search per target
+    assert len(solver.shortest_path_to(m.food)) == 4
+    assert len(solver.longest_path_to_tail(paths[s.tail()])) > 5
+    assert m.point(s.tail()).type == PointType.BODY_HOR
+
+
+def test_deadline():
+    m = Map(66, 66)
+    s = Snake(
+        m, Direc.RIGHT, [Pos(1, 2), Pos(1, 1)], [PointType.HEAD_R, PointType.BODY_HOR]
+    )
+    solver = PathSolver(s, "bfs", "bfs")
+    solver.deadline.seconds = 0
+    far = Pos(64, 64)
+    for algr in ("bfs", "bibfs", "astar", "dfs", "dijkstra"):
+        solver.short_algr = algr
+        solver.deadline.start()
+        assert not solver.path_to(far, "shortest")
+        assert solver.deadline.tripped
+
+    # Targets reached before the deadline keep their paths
+    solver.deadline.start()
+    paths = solver.search_from_head((Pos(1, 4), far))
+    assert paths == {Pos(1, 4): [Direc.RIGHT, Direc.RIGHT]}
+
+    # An extension cut short is still a path to the destination
+    solver.short_algr = "bfs"
+    solver.deadline.seconds = None
+    solver.deadline.start()
+    base = solver.path_to(Pos(20, 20), "shortest")
+    assert len(base) == 37
+    solver.deadline.seconds = 0
+    solver.deadline.start()
+    path = solver._extend_path(base, Pos(20, 20))
+    assert len(base) <= len(path)
+    cur = s.head()
+    for direc in path:
+        cur = cur.adj(direc)
+        assert m.is_safe(cur)
+    assert cur == Pos(20, 20)
+    assert solver.deadline.num_tripped == 7
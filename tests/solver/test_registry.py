@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from snake import solver
+from snake.solver.greedy import GreedySolver
+
+
+def test_get():
+    assert solver.get("GreedySolver") is GreedySolver
+    assert solver.GreedySolver is GreedySolver
+    assert "HamiltonSolver" in solver.names()
+    with pytest.raises(ValueError):
+        solver.get("NoSuchSolver")
+    with pytest.raises(AttributeError):
+        solver.NoSuchSolver  # pylint: disable=pointless-statement
+
+
+def test_lazy_import():
+    code = (
+        "import sys\n"
+        "from snake.game import Game, GameConf, GameMode\n"
+        "conf = GameConf()\n"
+        "conf.mode = GameMode.BENCHMARK\n"
+        "Game(conf)\n"
+        "heavy = ('tensorflow', 'tkinter', 'snake.gui', 'snake.solver.dqn')\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+    )
+    assert out.stdout.strip() == ""
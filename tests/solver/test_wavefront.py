@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+
+from snake.base import Direc, Map, PointType, Pos, Snake
+from snake.solver.field import INF, DistanceField
+from snake.solver.wavefront import (
+    UNREACHABLE,
+    distance_transform,
+    free_mask,
+    point_sources,
+)
+
+
+def _snake(m):
+    return Snake(
+        m,
+        Direc.RIGHT,
+        [Pos(3, 4), Pos(3, 3), Pos(3, 2), Pos(3, 1)],
+        [PointType.HEAD_R, PointType.BODY_HOR, PointType.BODY_HOR, PointType.BODY_HOR],
+    )
+
+
+def test_free_mask():
+    m = Map(6, 7)
+    m.create_food(Pos(4, 4))
+    s = _snake(m)
+    free = free_mask(m)
+    assert free.shape == (6, 7)
+    assert free[4, 4] and free[1, 1]
+    assert not free[0, 3] and not free[3, 3]
+    assert free.sum() == 4 * 5 - len(s.bodies)
+
+
+def test_same_as_field():
+    random.seed(0)
+    m = Map(12, 12)
+    s = _snake(m)
+    for _ in range(20):
+        m.point(Pos(random.randint(5, 10), random.randint(1, 10))).type = PointType.WALL
+    m.create_rand_food()
+
+    dist = distance_transform(free_mask(m), point_sources((12, 12), [m.food])[0])
+    field = DistanceField()
+    field.sync(s, m.food)
+    for i in range(12):
+        for j in range(12):
+            expect = field.dist(Pos(i, j))
+            assert dist[i, j] == (UNREACHABLE if expect == INF else expect)
+
+
+def test_batch():
+    m = Map(8, 8)
+    s = _snake(m)
+    free = free_mask(m)
+    sources = point_sources(free.shape, [s.head(), s.tail(), Pos(6, 6)])
+    dist = distance_transform(free, sources)
+    assert dist.shape == (3, 8, 8)
+    # Sources are at distance 0 even on the snake's body
+    assert dist[0, 3, 4] == 0 and dist[1, 3, 1] == 0
+    assert dist[0, 3, 5] == 1 and dist[0, 3, 3] == UNREACHABLE
+    assert dist[1, 1, 1] == 2
+    assert dist[2, 1, 1] == 10
+
+    # Several boards at once give the same fields as one at a time
+    boards = np.stack([free, free[::-1]])
+    one = np.zeros_like(free)
+    one[1, 1] = True
+    batch = distance_transform(boards, one)
+    assert (batch[0] == distance_transform(free, one)).all()
+    assert (batch[1] == distance_transform(free[::-1], one)).all()
+
+    limited = distance_transform(free, one, max_dist=2)
+    assert limited.max() == 2
+    assert (limited[limited >= 0] == batch[0][limited >= 0]).all()
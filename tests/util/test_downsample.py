@@ -0,0 +1,56 @@
+import numpy as np
+
+from snake.util import downsample
+
+
+def test_minmax():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[123], y[777] = 5.0, -3.0
+    x_out, y_out = downsample.minmax(x, y, 10)
+    assert len(x_out) <= 20
+    assert np.all(np.diff(x_out) > 0)
+    assert y_out.max() == 5.0 and y_out.min() == -3.0
+    assert 123 in x_out and 777 in x_out
+    # Short series are returned unchanged
+    x_out, y_out = downsample.minmax(x[:10], y[:10], 10)
+    assert np.array_equal(x_out, x[:10])
+
+
+def test_envelope():
+    y_min = np.arange(100, dtype=np.float64)
+    y_max = y_min + 1
+    idx, lo, hi = downsample.envelope(y_min, y_max, 10)
+    assert len(idx) == len(lo) == len(hi) == 10
+    assert idx[0] == 0 and lo[0] == 0 and hi[0] == 10
+    assert lo[-1] == 90 and hi[-1] == 100
+
+
+def test_lttb():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 100.0)
+    y[5000] = 10.0
+    x_out, y_out = downsample.lttb(x, y, 200)
+    assert len(x_out) == 200
+    assert x_out[0] == 0 and x_out[-1] == 9999
+    assert np.all(np.diff(x_out) > 0)
+    assert 10.0 in y_out
+
+
+def test_mmap(tmp_path):
+    path = tmp_path / "series.npy"
+    np.save(path, np.arange(5000, dtype=np.float64))
+    data = np.load(path, mmap_mode="r")
+    x_out, y_out = downsample.minmax(np.arange(data.size), data, 50)
+    assert y_out[0] == 0 and y_out[-1] == 4999
+
+
+def test_lttb_indices():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 100.0)
+    y[5000] = 10.0
+    x_out, y_out = downsample.lttb(None, y, 200)
+    x_ref, y_ref = downsample.lttb(x, y, 200)
+    assert np.array_equal(x_out, x_ref) and np.array_equal(y_out, y_ref)
+    x_out, _ = downsample.lttb(None, y[:10], 200)
+    assert np.array_equal(x_out, x[:10])
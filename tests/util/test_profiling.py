@@ -0,0 +1,33 @@
+import pstats
+
+from snake.util.profiling import EpisodeProfiler
+
+
+def _leaf(n):
+    return sum(i * i for i in range(n))
+
+
+def _branch():
+    return _leaf(20000) + _leaf(10000)
+
+
+def test_profiler(tmp_path):
+    profiler = EpisodeProfiler()
+    with profiler:
+        for _ in range(5):
+            _branch()
+
+    top = profiler.top(50)
+    names = [row[0] for row in top]
+    assert any(name.startswith("_leaf ") for name in names)
+    assert top == sorted(top, key=lambda r: r[2], reverse=True)
+
+    path_stats, path_collapsed = profiler.save(tmp_path, "test")
+    assert pstats.Stats(path_stats).total_calls > 0
+    lines = open(path_collapsed, encoding="utf-8").read().splitlines()
+    assert lines
+    for line in lines:
+        stack, value = line.rsplit(" ", 1)
+        assert int(value) > 0
+        assert stack
+    assert any("_branch" in line and "_leaf" in line for line in lines)
@@ -0,0 +1,35 @@
+import json
+
+from snake.util.timing import PhaseTimer
+
+
+def test_summary():
+    timer = PhaseTimer()
+    for ns in range(1000, 101000, 1000):  # 1us ... 100us
+        timer._samples.setdefault("next_direc", []).append(ns)
+    t = timer.start()
+    timer.stop("move", t)
+
+    summary = timer.summary()
+    assert set(summary) == {"next_direc", "move"}
+    s = summary["next_direc"]
+    assert s["count"] == 100
+    assert s["p50"] == 50.0 and s["p90"] == 90.0 and s["p99"] == 99.0
+    assert s["max"] == 100.0
+    assert abs(s["total_ms"] - 5.05) < 1e-9
+    assert summary["move"]["count"] == 1
+
+
+def test_histogram_dump(tmp_path):
+    timer = PhaseTimer()
+    timer._samples["food"] = [500, 1000, 1500, 3000, 1000000]
+    hist = timer.histogram("food")
+    assert hist == {1: 2, 2: 1, 4: 1, 1024: 1}
+    assert sum(hist.values()) == 5
+
+    path = tmp_path / "latency.json"
+    timer.dump(path, "a")
+    timer.dump(path, "b")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert set(data) == {"a", "b"}
+    assert data["a"]["histogram_us"]["food"]["1024"] == 1
@@ -0,0 +1,199 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+MODULES = [
+    "snake.base",
+    "snake.solver.path",
+    "snake.solver.greedy",
+    "snake.solver.hamilton",
+    "snake.solver.mcts",
+    "snake.game",
+    "tools.stats_cli",
+]
+
+SOLVERS = {
+    "hamilton": "HamiltonSolver",
+    "greedy": "GreedySolver",
+    "mcts": "MCTSSolver",
+    "dqn": "DQNSolver",
+}
+
+# Each snippet runs in a fresh interpreter and prints one JSON object
+_IMPORT_CODE = """\
+import json, time
+t = time.perf_counter()
+import {module}
+print(json.dumps({{"import": time.perf_counter() - t}}))
+"""
+
+_GAME_CODE = """\
+import json, time
+t = time.perf_counter()
+from snake.game import Game, GameConf, GameMode
+t_import = time.perf_counter() - t
+conf = GameConf()
+conf.mode = GameMode.BENCHMARK
+conf.solver_name = {solver_name!r}
+conf.map_rows = conf.map_cols = {size}
+conf.short_algr = {short_algr!r}
+conf.long_algr = {long_algr!r}
+t = time.perf_counter()
+game = Game(conf)
+t_construct = time.perf_counter() - t
+t = time.perf_counter()
+game._game_main_normal()
+t_first_move = time.perf_counter() - t
+print(json.dumps({{
+    "import": t_import,
+    "construct": t_construct,
+    "first_move": t_first_move,
+}}))
+"""
+
+
+def _run_child(code):
+    """Run a snippet in a cold interpreter and return its JSON output."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    if result.returncode != 0:
+        err = result.stderr.strip().splitlines()
+        raise RuntimeError(err[-1] if err else f"exit code {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+    }
+
+
+def bench_imports(modules, repeat):
+    """Measure the cold import time (seconds) of every module."""
+    results = {}
+    for module in modules:
+        samples = [
+            _run_child(_IMPORT_CODE.format(module=module))["import"]
+            for _ in range(repeat)
+        ]
+        results[module] = _summarize(samples)
+    return results
+
+
+def bench_solvers(solvers, repeat, size, short_algr, long_algr):
+    """Measure Game construction and time to first move of every solver."""
+    results = {}
+    for key in solvers:
+        code = _GAME_CODE.format(
+            solver_name=SOLVERS[key],
+            size=size,
+            short_algr=short_algr,
+            long_algr=long_algr,
+        )
+        try:
+            runs = [_run_child(code) for _ in range(repeat)]
+        except RuntimeError as e:
+            results[key] = {"error": str(e)}
+            continue
+        results[key] = {
+            phase: _summarize([run[phase] for run in runs])
+            for phase in ("import", "construct", "first_move")
+        }
+    return results
+
+
+def display(report):
+    print(f"Python {report['python']} | {report['repeat']} cold runs per entry")
+    print(f"\n{'Module':<28}{'min (ms)':>12}{'median (ms)':>14}")
+    for module, t in report["imports"].items():
+        print(f"{module:<28}{t['min'] * 1e3:>12.1f}{t['median'] * 1e3:>14.1f}")
+
+    print(
+        f"\nSolvers on {report['map_size']}x{report['map_size']} "
+        f"(short={report['short_algr']}, long={report['long_algr']}), median ms"
+    )
+    print(f"{'Solver':<12}{'import':>10}{'construct':>12}{'first move':>12}")
+    for key, data in report["solvers"].items():
+        if "error" in data:
+            print(f"{key:<12}  Error: {data['error'][:60]}")
+            continue
+        print(
+            f"{key:<12}"
+            f"{data['import']['median'] * 1e3:>10.1f}"
+            f"{data['construct']['median'] * 1e3:>12.1f}"
+            f"{data['first_move']['median'] * 1e3:>12.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure cold import time, Game construction time and "
+        "time to first move of the snake solvers."
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="cold interpreter runs per measurement (default: 5)",
+    )
+    parser.add_argument(
+        "-s",
+        "--solvers",
+        nargs="+",
+        choices=SOLVERS.keys(),
+        default=["hamilton", "greedy"],
+        help="solvers to construct (default: hamilton greedy)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=8,
+        help="number of map rows and columns (default: 8)",
+    )
+    parser.add_argument("--shortalgr", default="bfs", help="shortest path algorithm")
+    parser.add_argument("--longalgr", default="bfs", help="longest path algorithm")
+    parser.add_argument(
+        "--json",
+        metavar="file",
+        help="write the machine-readable report to this file ('-' for stdout)",
+    )
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "map_size": args.size,
+        "short_algr": args.shortalgr,
+        "long_algr": args.longalgr,
+        "imports": bench_imports(MODULES, args.repeat),
+        "solvers": bench_solvers(
+            args.solvers, args.repeat, args.size, args.shortalgr, args.longalgr
+        ),
+    }
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+        return
+    display(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
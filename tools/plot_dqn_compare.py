@@ -1,9 +1,15 @@
 import argparse
 import os
+import sys
+from pathlib import Path
 
-import matplotlib.pyplot as plt
+import matplotlib
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from snake.util import downsample
+
 COLOR_LEGEND_EDGE = (0 / 255, 0 / 255, 0 / 255)
 BAR_WIDTH = 0.24
 
@@ -36,8 +42,26 @@ def main():
     )
     parser.add_argument("path", help="Path to history data directory")
     parser.add_argument("-zh", action="store_true", help="use Chinese characters")
+    parser.add_argument(
+        "-o",
+        "--out",
+        metavar="dir",
+        help="write the figures as PNG files to this directory (headless) "
+        "instead of opening windows",
+    )
+    parser.add_argument(
+        "-p",
+        "--points",
+        type=int,
+        default=2000,
+        help="maximum points per line after downsampling (default: 2000)",
+    )
     args = parser.parse_args()
 
+    if args.out:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
     labels = LABELS_EN
 
     if args.zh:
@@ -46,11 +70,11 @@ def main():
         plt.rcParams["font.sans-serif"] = ["SimHei"]
         plt.rcParams["axes.unicode_minus"] = False
 
-    def plot_one(file_path, legend_name, interval=5000):
-        data = np.load(file_path)
-        x = (np.arange(data.size) + 1)[::interval] / 1e4
-        y = data[::interval]
-        plt.plot(x, y, label=legend_name)
+    def plot_one(file_path, legend_name):
+        data = np.load(file_path, mmap_mode="r")
+        # x from the indices kept, not from an array as long as the history
+        x, y = downsample.lttb(None, data, args.points)
+        plt.plot((x + 1) / 1e4, y, label=legend_name)
         return np.max(data)
 
     def add_decorations(y_label):
@@ -122,8 +146,6 @@ def main():
         edgecolor=COLOR_LEGEND_EDGE,
     )
 
-    interval = 100000
-
     legends = [
         "DQN",
         "DQN+Prioritized",
@@ -139,23 +161,19 @@ def main():
     max_len_1 = (
         plot_one(
             os.path.join(args.path, "len-dqn-important-relative.npy"),
-            legends[0],
-            interval,
+            legends[0]
         ),
         plot_one(
             os.path.join(args.path, "len-dqn-pri-important-relative.npy"),
-            legends[1],
-            interval,
+            legends[1]
         ),
         plot_one(
             os.path.join(args.path, "len-dqn-duel-important-relative.npy"),
-            legends[2],
-            interval,
+            legends[2]
         ),
         plot_one(
             os.path.join(args.path, "len-dqn-pri-duel-important-relative.npy"),
-            legends[3],
-            interval,
+            legends[3]
         ),
     )
     add_decorations("snake_len")
@@ -164,23 +182,19 @@ def main():
     max_step_1 = (
         plot_one(
             os.path.join(args.path, "step-dqn-important-relative.npy"),
-            legends[0],
-            interval,
+            legends[0]
         ),
         plot_one(
             os.path.join(args.path, "step-dqn-pri-important-relative.npy"),
-            legends[1],
-            interval,
+            legends[1]
         ),
         plot_one(
             os.path.join(args.path, "step-dqn-duel-important-relative.npy"),
-            legends[2],
-            interval,
+            legends[2]
         ),
         plot_one(
             os.path.join(args.path, "step-dqn-pri-duel-important-relative.npy"),
-            legends[3],
-            interval,
+            legends[3]
         ),
     )
     add_decorations("snake_step")
@@ -189,23 +203,19 @@ def main():
     max_len_2 = (
         plot_one(
             os.path.join(args.path, "len-ddqn-important-relative.npy"),
-            legends[4],
-            interval,
+            legends[4]
         ),
         plot_one(
             os.path.join(args.path, "len-ddqn-pri-important-relative.npy"),
-            legends[5],
-            interval,
+            legends[5]
         ),
         plot_one(
             os.path.join(args.path, "len-ddqn-duel-important-relative.npy"),
-            legends[6],
-            interval,
+            legends[6]
         ),
         plot_one(
             os.path.join(args.path, "len-ddqn-pri-duel-important-relative.npy"),
-            legends[7],
-            interval,
+            legends[7]
         ),
     )
     add_decorations("snake_len")
@@ -214,23 +224,19 @@ def main():
     max_step_2 = (
         plot_one(
             os.path.join(args.path, "step-ddqn-important-relative.npy"),
-            legends[4],
-            interval,
+            legends[4]
         ),
         plot_one(
             os.path.join(args.path, "step-ddqn-pri-important-relative.npy"),
-            legends[5],
-            interval,
+            legends[5]
         ),
         plot_one(
             os.path.join(args.path, "step-ddqn-duel-important-relative.npy"),
-            legends[6],
-            interval,
+            legends[6]
         ),
         plot_one(
             os.path.join(args.path, "step-ddqn-pri-duel-important-relative.npy"),
-            legends[7],
-            interval,
+            legends[7]
         ),
     )
     add_decorations("snake_step")
@@ -249,7 +255,14 @@ def main():
         edgecolor=COLOR_LEGEND_EDGE,
     )
 
-    plt.show()
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for num in plt.get_fignums():
+            path = os.path.join(args.out, f"dqn-compare-{num}.png")
+            plt.figure(num).savefig(path)
+            print(f"Plot saved to {path}")
+    else:
+        plt.show()
 
 
 if __name__ == "__main__":
@@ -2,11 +2,11 @@ import argparse
 import sys
 from pathlib import Path
 
+import matplotlib
+
 # Add parent directory to path so we can import snake module
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from snake.solver.dqn.history import History
-
 
 def main():
     parser = argparse.ArgumentParser(description="Plot history data of dqn training.")
@@ -16,11 +16,31 @@ def main():
     parser.add_argument(
         "end_step", type=int, help="ending learning step of the history data"
     )
+    parser.add_argument(
+        "-o",
+        "--out",
+        metavar="dir",
+        help="write the figures as PNG files to this directory (headless) "
+        "instead of opening a window",
+    )
+    parser.add_argument(
+        "-p",
+        "--points",
+        type=int,
+        default=2000,
+        help="maximum points per line after downsampling, 0 to disable "
+        "(default: 2000)",
+    )
     args = parser.parse_args()
 
+    if args.out:
+        matplotlib.use("Agg")
+
+    from snake.solver.dqn.history import History
+
     his = History(num_avg=0)
-    his.load(args.beg_step, args.end_step)
-    his.plot(args.beg_step)
+    his.load(args.beg_step, args.end_step, mmap_mode="r")
+    his.plot(args.beg_step, max_points=args.points, out_dir=args.out)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,69 @@
 import argparse
+import contextlib
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from snake.game import Game, GameConf, GameMode
+from snake.util.profiling import DIR_PROFILE, EpisodeProfiler
+from snake.util.timing import format_counters, format_summary
+
 try:
     from tabulate import tabulate
     HAS_TABULATE = True
 except ImportError:
     HAS_TABULATE = False
 
-def run_benchmarks(episodes=10, solvers=None):
+def _run_episodes(game, episodes, steps_limit=5000, profiler=None):
+    """Play episodes headlessly and return (avg_length, avg_steps).
+
+    If a profiler is given, only the episode loop runs under it.
+    """
+    total_length = 0
+    total_steps = 0
+    with profiler or contextlib.nullcontext():
+        for _ in range(episodes):
+            while True:
+                game._game_main_normal()
+                if game._map.is_full():
+                    break
+                if game._snake.dead:
+                    break
+                if game._snake.steps >= steps_limit:
+                    break
+
+            total_length += game._snake.len()
+            total_steps += game._snake.steps
+            game._reset()
+
+    avg_length = total_length / episodes if episodes > 0 else 0
+    avg_steps = total_steps / episodes if episodes > 0 else 0
+    return avg_length, avg_steps
+
+
+def _save_profile(profiler, profile_dir, label, profile_top):
+    if profiler is None:
+        return
+    paths = profiler.save(profile_dir, label)
+    print(f"\n[Profile] {label} (saved to {', '.join(paths)})")
+    print("\n".join(profiler.format_top(profile_top)))
+
+
+def run_benchmarks(
+    episodes=10,
+    solvers=None,
+    latency_dump=None,
+    profile_dir=None,
+    profile_top=15,
+    table_size=0,
+    move_deadline=None,
+    endgame=0,
+):
     solvers_available = {
         "hamilton": "HamiltonSolver",
         "greedy": "GreedySolver",
+        "mcts": "MCTSSolver",
         "dqn": "DQNSolver",
     }
     
@@ -32,32 +81,23 @@ def run_benchmarks(episodes=10, solvers=None):
             conf = GameConf()
             conf.solver_name = solver_name
             conf.mode = GameMode.BENCHMARK
+            conf.table_size = table_size
+            conf.move_deadline = move_deadline
+            conf.endgame = endgame
             game = Game(conf)
-            total_length = 0
-            total_steps = 0
-            steps_limit = 5000
-            for ep in range(episodes):
-                while True:
-                    game._game_main_normal()
-                    if game._map.is_full():
-                        break
-                    if game._snake.dead:
-                        break
-                    if game._snake.steps >= steps_limit:
-                        break
-                
-                total_length += game._snake.len()
-                total_steps += game._snake.steps
-                game._reset()
-            
-            avg_length = total_length / episodes if episodes > 0 else 0
-            avg_steps = total_steps / episodes if episodes > 0 else 0
-            
+            profiler = EpisodeProfiler() if profile_dir else None
+            avg_length, avg_steps = _run_episodes(game, episodes, profiler=profiler)
+
             stats[solver_name] = {
                 "avg_length": avg_length,
                 "avg_steps": avg_steps,
                 "episodes": episodes,
+                "latency": game.timer.summary(),
+                "counters": game.solver_counters(),
             }
+            if latency_dump:
+                game.timer.dump(latency_dump, solver_name)
+            _save_profile(profiler, profile_dir, solver_key, profile_top)
             
             print(f"Done! (Avg Length: {avg_length:.2f}, Avg Steps: {avg_steps:.0f})")
             
@@ -71,7 +111,14 @@ def run_benchmarks(episodes=10, solvers=None):
     return stats
 
 def display_table(stats):
-    headers = ["Solver Name", "Average Length", "Average Steps", "Episodes"]
+    headers = [
+        "Solver Name",
+        "Average Length",
+        "Average Steps",
+        "Episodes",
+        "Decision p50 (us)",
+        "Decision p99 (us)",
+    ]
     rows = []
     for solver_name, data in stats.items():
         avg_length = data["avg_length"]
@@ -88,7 +135,10 @@ def display_table(stats):
         else:
             avg_steps_str = f"{avg_steps:.0f}"
         
-        rows.append([solver_name, avg_length_str, avg_steps_str, episodes])
+        p50_str, p99_str = _decision_latency(data)
+        rows.append(
+            [solver_name, avg_length_str, avg_steps_str, episodes, p50_str, p99_str]
+        )
     
     if HAS_TABULATE:
         table = tabulate(rows, headers=headers, tablefmt="grid")
@@ -98,6 +148,29 @@ def display_table(stats):
         _print_table_manual(headers, rows)
         print()
 
+    display_latency(stats)
+
+
+def display_latency(stats):
+    """Print the per-phase latency summary and the counters of every
+    benchmarked solver."""
+    for name, data in stats.items():
+        if not data.get("latency"):
+            continue
+        print(f"[Latency] {name}")
+        print("\n".join(format_summary(data["latency"])) + "\n")
+        if data.get("counters"):
+            print(f"[Solver] {name}")
+            print("\n".join(format_counters(data["counters"])) + "\n")
+
+
+def _decision_latency(data):
+    """Return the (p50, p99) next_direc latency strings of a result."""
+    decision = data.get("latency", {}).get("next_direc")
+    if not decision:
+        return "N/A", "N/A"
+    return f"{decision['p50']:.1f}", f"{decision['p99']:.1f}"
+
 def _print_table_manual(headers, rows):
     col_widths = [len(h) for h in headers]
     for row in rows:
@@ -110,10 +183,12 @@ def _print_table_manual(headers, rows):
         row_str = " | ".join(str(cell).ljust(col_widths[i]) for i, cell in enumerate(row))
         print(row_str)
 
-def run_pathfinder_benchmarks(episodes=5):
+def run_pathfinder_benchmarks(
+    episodes=5, latency_dump=None, profile_dir=None, profile_top=15
+):
     """Benchmark all solvers with different pathfinder algorithm combinations."""
     solvers = ["hamilton", "greedy"]  # Only path-based solvers support custom algorithms
-    short_algorithms = ["bfs", "astar", "dfs", "dijkstra"]
+    short_algorithms = ["bfs", "bibfs", "field", "astar", "dfs", "dijkstra"]
     long_algorithms = ["bfs", "astar", "dfs"]
     
     results = {}
@@ -134,27 +209,11 @@ def run_pathfinder_benchmarks(episodes=5):
                     conf.mode = GameMode.BENCHMARK
                     
                     game = Game(conf)
-                    total_length = 0
-                    total_steps = 0
-                    steps_limit = 5000
-                    
-                    for ep in range(episodes):
-                        while True:
-                            game._game_main_normal()
-                            if game._map.is_full():
-                                break
-                            if game._snake.dead:
-                                break
-                            if game._snake.steps >= steps_limit:
-                                break
-                        
-                        total_length += game._snake.len()
-                        total_steps += game._snake.steps
-                        game._reset()
-                    
-                    avg_length = total_length / episodes if episodes > 0 else 0
-                    avg_steps = total_steps / episodes if episodes > 0 else 0
-                    
+                    profiler = EpisodeProfiler() if profile_dir else None
+                    avg_length, avg_steps = _run_episodes(
+                        game, episodes, profiler=profiler
+                    )
+
                     key = f"{solver_name}|{short_alg}|{long_alg}"
                     results[key] = {
                         "solver": solver_name.capitalize(),
@@ -162,7 +221,16 @@ def run_pathfinder_benchmarks(episodes=5):
                         "long_alg": long_alg,
                         "avg_length": avg_length,
                         "avg_steps": avg_steps,
+                        "latency": game.timer.summary(),
                     }
+                    if latency_dump:
+                        game.timer.dump(latency_dump, key)
+                    _save_profile(
+                        profiler,
+                        profile_dir,
+                        f"{solver_name}-{short_alg}-{long_alg}",
+                        profile_top,
+                    )
                     
                     print(f"✓ (Len: {avg_length:.1f}, Steps: {avg_steps:.0f})")
                     
@@ -199,14 +267,17 @@ def display_pathfinder_table(results):
         print(f"{solver} Solver - Path Finder Algorithm Comparison")
         print(f"{'='*90}")
         
-        headers = ["Shortest Alg", "Longest Alg", "Avg Length", "Avg Steps"]
+        headers = [
+            "Shortest Alg",
+            "Longest Alg",
+            "Avg Length",
+            "Avg Steps",
+            "p50 (us)",
+            "p99 (us)",
+        ]
         rows = []
         
         for data in sorted(by_solver[solver], key=lambda x: (x["short_alg"], x["long_alg"])):
-            # Skip A* for longest path (not supported in Hamilton solver)
-            if data["long_alg"] == "astar" and solver == "Hamilton":
-                continue
-            
             avg_length = data["avg_length"]
             avg_steps = data["avg_steps"]
             
@@ -217,11 +288,14 @@ def display_pathfinder_table(results):
                 avg_length_str = f"{avg_length:.2f}"
                 avg_steps_str = f"{avg_steps:.0f}"
             
+            p50_str, p99_str = _decision_latency(data)
             rows.append([
                 data["short_alg"],
                 data["long_alg"],
                 avg_length_str,
                 avg_steps_str,
+                p50_str,
+                p99_str,
             ])
         
         if HAS_TABULATE:
@@ -245,7 +319,7 @@ def main():
         "-s",
         "--solvers",
         nargs="+",
-        choices=["hamilton", "greedy", "astar", "astar_safe", "dqn"],
+        choices=["hamilton", "greedy", "mcts", "astar", "astar_safe", "dqn"],
         help="Specific solvers to benchmark (for standard mode only)",
     )
     parser.add_argument(
@@ -253,8 +327,63 @@ def main():
         action="store_true",
         help="Test all algorithm combinations across solvers"
     )
+    parser.add_argument(
+        "--latency-dump",
+        metavar="FILE",
+        help="Write per-phase latency summaries and histograms to a JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DIR_PROFILE,
+        metavar="DIR",
+        help=f"Profile the episode loops and write .pstats/.collapsed files "
+        f"(default dir: {DIR_PROFILE})",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=15,
+        metavar="N",
+        help="Number of hot functions to print per profile (default: 15)",
+    )
+    parser.add_argument(
+        "--cycle-cache",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Keep built Hamilton cycles as files so later runs skip building "
+        "them (default dir: logs/cycles)",
+    )
+    parser.add_argument(
+        "--table-size",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Let the greedy solver remember its decisions in up to N states "
+        "(default: 0, off)",
+    )
+    parser.add_argument(
+        "--endgame",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Let the greedy solver search move sequences for a safe route "
+        "to the food once N cells or fewer are free (default: 0, off)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SEC",
+        help="Time budget per move of the solvers; moves over it are counted "
+        "as deadline misses (default: no limit)",
+    )
     
     args = parser.parse_args()
+
+    if args.cycle_cache is not None:
+        from snake.solver import hamilton
+        hamilton.enable_disk_cache(args.cycle_cache or hamilton.DIR_CYCLES)
     
     if args.all:
         episodes = args.episodes if args.episodes is not None else 5
@@ -263,7 +392,12 @@ def main():
         print(f"Testing all algorithm combinations across solvers ({episodes} episodes each)")
         print("="*90)
         print("\nProgress:")
-        results = run_pathfinder_benchmarks(episodes=episodes)
+        results = run_pathfinder_benchmarks(
+            episodes=episodes,
+            latency_dump=args.latency_dump,
+            profile_dir=args.profile,
+            profile_top=args.profile_top,
+        )
         display_pathfinder_table(results)
         print(f"\n{'='*90}")
         print("Benchmark Complete!")
@@ -271,7 +405,16 @@ def main():
     else:
         episodes = args.episodes if args.episodes is not None else 10
         print(f"Running benchmarks with {episodes} episodes per solver...\n")
-        stats = run_benchmarks(episodes=episodes, solvers=args.solvers)
+        stats = run_benchmarks(
+            episodes=episodes,
+            solvers=args.solvers,
+            latency_dump=args.latency_dump,
+            profile_dir=args.profile,
+            profile_top=args.profile_top,
+            table_size=args.table_size,
+            move_deadline=args.deadline,
+            endgame=args.endgame,
+        )
         print("\n" + "="*60)
         print("SNAKE SOLVER STATISTICS")
         print("="*60)